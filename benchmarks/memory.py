@@ -0,0 +1,73 @@
+"""Memory benchmark: bytes per live game for each way of storing a game.
+
+    python -m benchmarks.memory --games 100000
+
+Games are created fresh and kept alive while `tracemalloc` measures everything
+they allocate, so the numbers include the board, the instance and its lists.
+"""
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.bitboard import BitboardTicTacToe
+from src.board import TicTacToe
+from src.pool import BoardPool
+
+SIZES = [(3, 3), (7, 5), (19, 5)]
+
+
+def bytes_per_game(factory: Callable[[int], List], games: int) -> float:
+    """Return the bytes allocated per game by `factory(games)`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = factory(games)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / games
+
+
+def factories(board_size: int, win_length: int) -> Dict[str, Callable[[int], List]]:
+    """The storage variants to measure, by name."""
+
+    def pooled(games: int) -> List:
+        pool = BoardPool(games, board_size, win_length)
+        return [pool, [pool.acquire() for _ in range(games)]]
+
+    return {
+        "float64": lambda games: [
+            TicTacToe(board_size, win_length) for _ in range(games)
+        ],
+        "int8": lambda games: [
+            TicTacToe(board_size, win_length, dtype=np.int8) for _ in range(games)
+        ],
+        "int8_pool": pooled,
+        "incremental_int8": lambda games: [
+            TicTacToe(board_size, win_length, "incremental", dtype=np.int8)
+            for _ in range(games)
+        ],
+        "bitboard": lambda games: [
+            BitboardTicTacToe(board_size, win_length) for _ in range(games)
+        ],
+    }
+
+
+def main(argv=None) -> None:
+    """Print the bytes per game of every storage variant and board size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    for board_size, win_length in SIZES:
+        variant = f"{board_size}x{board_size}w{win_length}"
+        for name, factory in factories(board_size, win_length).items():
+            print(
+                f"{name + '/' + variant:<30} "
+                f"{bytes_per_game(factory, args.games):10.0f} bytes/game"
+            )
+
+
+if __name__ == "__main__":
+    main()
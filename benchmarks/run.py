@@ -0,0 +1,296 @@
+"""Benchmarks for move application, win detection and full game throughput.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare results.json --tolerance 0.1
+
+With `--compare` the run fails if any benchmark is slower than the baseline by
+more than the tolerance, so releases can be gated on throughput.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.bitboard import BitboardTicTacToe
+from src.board import ONGOING, WIN_ENGINES, TicTacToe
+from src.flat import FlatTicTacToe
+from src.scan import scan_boards
+
+GRID = [(3, 3), (4, 3), (5, 4), (7, 5), (9, 5), (15, 5), (19, 5)]
+BACKENDS = list(WIN_ENGINES) + ["bitboard", "flat"]
+
+
+def new_game(backend: str, board_size: int, win_length: int) -> TicTacToe:
+    """Create a game with one of the win engines or the bitboard backend."""
+    if backend == "bitboard":
+        return BitboardTicTacToe(board_size, win_length)
+    if backend == "flat":
+        return FlatTicTacToe(board_size, win_length)
+    return TicTacToe(board_size, win_length, win_engine=backend)
+
+
+def measure(function: Callable[[], int], min_time: float, repeats: int) -> float:
+    """Return the best seconds per operation over a few timed runs.
+
+    `function` runs a batch of operations and returns how many it ran.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        operations = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            operations += function()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / operations)
+    return best
+
+
+def random_orders(board_size: int, count: int, seed=0) -> List[List[Tuple]]:
+    """Random orders of all the cells of the board, one per game."""
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(board_size) for y in range(board_size)]
+    orders = []
+    for _ in range(count):
+        rng.shuffle(cells)
+        orders.append(list(cells))
+    return orders
+
+
+def play_game(game: TicTacToe, order: List[Tuple], play: Callable) -> int:
+    """Play the cells of `order` in turn until the game ends, return the moves."""
+    game.reset_board()
+    for step, (x_coord, y_coord) in enumerate(order):
+        if play(step % 2 + 1, x_coord, y_coord):
+            return step + 1
+    return len(order)
+
+
+def worst_case_board(game: TicTacToe) -> Tuple[int, int]:
+    """Fill the board for the most expensive win check that finds no winner.
+
+    The board is full of points of player 2, except the centre and a run of
+    win_length - 2 points of player 1 next to it along every axis, so every line
+    through the centre has a run one short of a win.
+    """
+    # pylint: disable=protected-access
+    size = game.board_size
+    centre = size // 2
+    ones = {(centre, centre)}
+    for x_step, y_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for i in range(1, game.win_length - 1):
+            ones.add((centre + x_step * i, centre + y_step * i))
+    for x_coord in range(size):
+        for y_coord in range(size):
+            if (x_coord, y_coord) not in ones:
+                game._place_point(2, x_coord, y_coord)
+    for x_coord, y_coord in sorted(ones, key=lambda cell: cell == (centre, centre)):
+        game._place_point(1, x_coord, y_coord)
+    return centre, centre
+
+
+def bench_play_one_step(game: TicTacToe, orders: List[List[Tuple]]) -> int:
+    """Play games through `play_one_step`, return the number of moves."""
+
+    def play(player_index, x_coord, y_coord):
+        return game.play_one_step(player_index, x_coord, y_coord, render=False)
+
+    return sum(play_game(game, order, play) for order in orders)
+
+
+def bench_random_games(game: TicTacToe, orders: List[List[Tuple]]) -> int:
+    """Play games through the quiet `place`, return the number of games."""
+    for order in orders:
+        play_game(game, order, game.place)
+    return len(orders)
+
+
+def sequences(orders: List[List[Tuple]]) -> List[Tuple[np.ndarray, ...]]:
+    """The (players, xs, ys) arrays of every order, for `play_sequence`."""
+    arrays = []
+    for order in orders:
+        x_coords, y_coords = np.array(order).T
+        players = np.arange(len(order)) % 2 + 1
+        arrays.append((players, x_coords, y_coords))
+    return arrays
+
+
+def bench_play_sequence(game: TicTacToe, moves: List[Tuple[np.ndarray, ...]]) -> int:
+    """Validate and play whole games with `play_sequence`, return the games."""
+    for players, x_coords, y_coords in moves:
+        game.reset_board()
+        game.play_sequence(players, x_coords, y_coords)
+    return len(moves)
+
+
+def bench_random_playouts(game: TicTacToe, rng: random.Random) -> int:
+    """Play 20 games of random legal moves until they end, return the moves."""
+    moves = 0
+    for _ in range(20):
+        game.reset_board()
+        player_index = 1
+        while game.status() == ONGOING:
+            game.place(player_index, *game.random_legal_move(rng))
+            player_index = 3 - player_index
+            moves += 1
+    return moves
+
+
+def bench_lookahead(game: TicTacToe, order: List[Tuple]) -> int:
+    """Try every reply to the first two moves of `order`, return the moves tried.
+
+    Each reply is placed and taken back with `undo`, as a search would do, so no
+    board is copied.
+    """
+    game.reset_board()
+    game.place(1, *order[0])
+    game.place(2, *order[1])
+    moves = game.legal_moves()
+    for move in moves:
+        game.place(1, *move)
+        game.undo()
+    return len(moves)
+
+
+def bench_get_winner(game: TicTacToe, x_coord: int, y_coord: int) -> int:
+    """Check the winner of the last move 100 times."""
+    for _ in range(100):
+        game.get_winner(x_coord, y_coord)
+    return 100
+
+
+def bench_check_valid_move(game: TicTacToe) -> int:
+    """Validate a legal and an illegal move 100 times each."""
+    for _ in range(100):
+        game.check_valid_move(2, 1, 1)
+        game.check_valid_move(1, 0, 0)
+    return 200
+
+
+def full_boards(orders: List[List[Tuple]], board_size: int) -> np.ndarray:
+    """A stack of the boards filled in turn in the cells of every order."""
+    boards = np.zeros([len(orders), board_size, board_size], dtype=np.int8)
+    for index, order in enumerate(orders):
+        for step, (x_coord, y_coord) in enumerate(order):
+            boards[index, x_coord, y_coord] = step % 2 + 1
+    return boards
+
+
+def bench_scan_boards(boards: np.ndarray, win_length: int) -> int:
+    """Scan a stack of full boards for winners, return the number of boards."""
+    scan_boards(boards, win_length)
+    return len(boards)
+
+
+def run_benchmarks(min_time: float, repeats: int) -> Dict[str, Dict[str, float]]:
+    """Run every benchmark over the grid of board sizes and backends."""
+    results = {}
+
+    def record(name: str, function: Callable[[], int]) -> None:
+        seconds = measure(function, min_time, repeats)
+        results[name] = {"us_per_op": seconds * 1e6, "ops_per_sec": 1 / seconds}
+        print(f"{name:<45} {seconds * 1e6:12.2f} us {1 / seconds:14.0f} /s")
+
+    for board_size, win_length in GRID:
+        variant = f"{board_size}x{board_size}w{win_length}"
+        orders = random_orders(board_size, 20)
+        for backend in BACKENDS:
+            game = new_game(backend, board_size, win_length)
+            record(
+                f"play_one_step/{backend}/{variant}",
+                partial(bench_play_one_step, game, orders),
+            )
+            record(
+                f"random_game/{backend}/{variant}",
+                partial(bench_random_games, game, orders),
+            )
+            record(
+                f"play_sequence/{backend}/{variant}",
+                partial(bench_play_sequence, game, sequences(orders)),
+            )
+            record(
+                f"random_playout/{backend}/{variant}",
+                partial(bench_random_playouts, game, random.Random(0)),
+            )
+            record(
+                f"lookahead/{backend}/{variant}",
+                partial(bench_lookahead, game, orders[0]),
+            )
+            game.reset_board()
+            record(
+                f"get_winner_worst/{backend}/{variant}",
+                partial(bench_get_winner, game, *worst_case_board(game)),
+            )
+
+        game = TicTacToe(board_size, win_length)
+        game.place(1, 0, 0)
+        record(f"check_valid_move/{variant}", partial(bench_check_valid_move, game))
+        record(
+            f"scan_boards/{variant}",
+            partial(bench_scan_boards, full_boards(orders, board_size), win_length),
+        )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Return the benchmarks slower than the baseline by more than the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {ratio:.2f}x of baseline")
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Run the benchmarks, write them as JSON and compare them to a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": run_benchmarks(args.min_time, args.repeats),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(
+                report["results"], json.load(baseline)["results"], args.tolerance
+            )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
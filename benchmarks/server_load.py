@@ -0,0 +1,109 @@
+"""Load test of the game server: moves per second and latency percentiles.
+
+    python -m benchmarks.server_load --clients 2000 --games 5
+
+Without `--port` a server is started in the same event loop, so clients and
+server share one core. Point `--host` and `--port` at a running server to
+measure it on its own, or at one shard of it with `--shard i --shards N`, so
+that only the game ids owned by that shard are played.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from src.server import GameServer, SessionRegistry, shard_for
+
+# A drawn 3x3 game, every move is played and none of them wins.
+DRAWN_GAME = [(1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (2, 0), (2, 1), (2, 2)]
+
+
+def owned_game_ids(
+    client_id: int, games: int, shard: int, num_shards: int
+) -> List[str]:
+    """The ids of the games of a client, all owned by `shard`."""
+    ids = []
+    number = 0
+    while len(ids) < games:
+        game_id = f"c{client_id}g{number}"
+        if shard_for(game_id, num_shards) == shard:
+            ids.append(game_id)
+        number += 1
+    return ids
+
+
+async def client(
+    host: str, port: int, game_ids: List[str], latencies: List[float]
+) -> None:
+    """Play a drawn game per id, recording the latency of every move."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for game_id in game_ids:
+        writer.write(f"NEW {game_id}\n".encode())
+        reply = await reader.readline()
+        if not reply.startswith(b"OK"):
+            raise Exception(reply.decode())
+        for step, (x_coord, y_coord) in enumerate(DRAWN_GAME):
+            start = time.perf_counter()
+            writer.write(
+                f"MOVE {game_id} {step % 2 + 1} {x_coord} {y_coord}\n".encode()
+            )
+            reply = await reader.readline()
+            latencies.append(time.perf_counter() - start)
+            if not reply.startswith(b"OK"):
+                raise Exception(reply.decode())
+        writer.write(f"END {game_id}\n".encode())
+        reply = await reader.readline()
+        if not reply.startswith(b"OK"):
+            raise Exception(reply.decode())
+    writer.close()
+
+
+async def run(
+    host: str, port: Optional[int], clients: int, games: int, shard=0, num_shards=1
+) -> None:
+    """Run the clients against a server, or one of its shards, and print the results."""
+    # pylint: disable=too-many-arguments
+    server = None
+    if port is None:
+        server = GameServer(SessionRegistry(), host, 0)
+        port = await server.start()
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(host, port, owned_game_ids(i, games, shard, num_shards), latencies)
+            for i in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.stop()
+
+    latencies.sort()
+    print(f"clients          {clients}")
+    print(f"moves            {len(latencies)}")
+    print(f"moves/sec        {len(latencies) / elapsed:.0f}")
+    for percentile in (50, 90, 99):
+        index = min(len(latencies) - 1, len(latencies) * percentile // 100)
+        print(f"p{percentile} latency      {latencies[index] * 1e3:.2f} ms")
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(
+        run(args.host, args.port, args.clients, args.games, args.shard, args.shards)
+    )
+
+
+if __name__ == "__main__":
+    main()
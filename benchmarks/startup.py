@@ -0,0 +1,80 @@
+"""Startup benchmark: import time of the game modules in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 10 --budget-ms 40
+
+Every module is imported in a new `python -X importtime` process and its
+cumulative import time, its own and that of everything it imports, is read from
+the report. The wall time of a whole process validating and playing one move is
+measured too. The run fails if `src.flat`, the backend of workers started per
+request, takes longer to import than the budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["src.flat", "src.board", "src.bitboard", "numpy"]
+BUDGET_MODULE = "src.flat"
+
+ONE_MOVE = "from src.flat import FlatTicTacToe\nFlatTicTacToe().place(1, 1, 1)\n"
+
+
+def import_time(module: str) -> float:
+    """Return the cumulative import time of a module in a new process, in ms."""
+    report = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    for line in report.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise Exception(f"No import time reported for {module}.")
+
+
+def process_time(script: str) -> float:
+    """Return the wall time of a new process running `script`, in ms."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_startup(runs: int) -> Dict[str, float]:
+    """The fastest of `runs` import times of every module, and process times."""
+    results = {
+        module: min(import_time(module) for _ in range(runs)) for module in MODULES
+    }
+    results["process/empty"] = min(process_time("pass") for _ in range(runs))
+    results["process/one_move"] = min(process_time(ONE_MOVE) for _ in range(runs))
+    return results
+
+
+def main(argv=None) -> int:
+    """Print the startup times, return 1 if the import budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=40.0)
+    args = parser.parse_args(argv)
+
+    results = run_startup(args.runs)
+    for name, milliseconds in results.items():
+        print(f"{name:<30} {milliseconds:10.1f} ms")
+    if results[BUDGET_MODULE] > args.budget_ms:
+        print(
+            f"{BUDGET_MODULE} imports in {results[BUDGET_MODULE]:.1f} ms, over the "
+            f"budget of {args.budget_ms:.1f} ms"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Module implementing many independent Tic Tac Toe games in one NumPy tensor."""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.board import DRAW, ONGOING, TicTacToe
+
+
+class BatchTicTacToe:  # pylint: disable=too-many-instance-attributes
+    """A batch of games sharing board size and win length, held in one int8 tensor.
+
+    The rules are those of `TicTacToe`: players take turns, a point can only be
+    played once and a game is won by `win_length` consecutive points. Each call to
+    `play` applies one move to every game still in progress. Only two player
+    games on square boards are batched.
+    """
+
+    def __init__(self, num_games: int, board_size=3, win_length=3, num_players=2):
+        """Init for Batch Tic Tac Toe Class."""
+        if num_games <= 0:
+            raise Exception("Number of games must be positive.")
+
+        rules = TicTacToe(
+            board_size=board_size, win_length=win_length, num_players=num_players
+        )
+        if num_players != 2:
+            raise Exception("Batched games are only played by two players.")
+        if rules.rows != rules.cols:
+            raise Exception("Batched games are only played on square boards.")
+        self.num_games = num_games
+        self.board_size = rules.board_size
+        self.win_length = rules.win_length
+        self.player_indexes = np.array(rules.player_indexes, dtype=np.int8)
+        self.boards = np.zeros([num_games, board_size, board_size], dtype=np.int8)
+        self.last_played_by = np.zeros(num_games, dtype=np.int8)
+        self.move_counts = np.zeros(num_games, dtype=np.int32)
+        self.status = np.full(num_games, ONGOING, dtype=np.int8)
+        self._offsets = np.arange(1 - win_length, win_length)
+
+    def reset_board(self):
+        """Resets every board to starting position."""
+        self.boards[...] = 0
+        self.last_played_by[...] = 0
+        self.move_counts[...] = 0
+        self.status[...] = ONGOING
+
+    def invalid_moves(
+        self,
+        player_indexes: np.ndarray,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+    ) -> np.ndarray:
+        """Check a vector of moves against the games still in progress.
+
+        Args:
+            player_indexes (np.ndarray): The player of the move, one per game.
+            x_coordinates (np.ndarray): The x positions, one per game.
+            y_coordinates (np.ndarray): The y positions, one per game.
+
+        Returns:
+            np.ndarray: Boolean mask of the games where the move is illegal.
+        """
+        in_bounds = (
+            (x_coordinates >= 0)
+            & (x_coordinates < self.board_size)
+            & (y_coordinates >= 0)
+            & (y_coordinates < self.board_size)
+        )
+        games = np.arange(self.num_games)
+        occupied = np.zeros(self.num_games, dtype=bool)
+        occupied[in_bounds] = (
+            self.boards[
+                games[in_bounds], x_coordinates[in_bounds], y_coordinates[in_bounds]
+            ]
+            != 0
+        )
+        valid = (
+            np.isin(player_indexes, self.player_indexes)
+            & (player_indexes != self.last_played_by)
+            & in_bounds
+            & ~occupied
+        )
+        return ~valid & (self.status == ONGOING)
+
+    def play(self, player_indexes, x_coordinates, y_coordinates) -> np.ndarray:
+        """Plays one step in every game that is still in progress.
+
+        Moves for games that are already won or drawn are ignored.
+
+        Args:
+            player_indexes (array like): The player of the move, one per game.
+            x_coordinates (array like): The x positions, one per game.
+            y_coordinates (array like): The y positions, one per game.
+
+        Raises:
+            Exception: If a move in a game in progress is invalid
+
+        Returns:
+            np.ndarray: Per game status, the winning player index, ONGOING or DRAW.
+        """
+        player_indexes = np.asarray(player_indexes, dtype=np.int64)
+        x_coordinates = np.asarray(x_coordinates, dtype=np.int64)
+        y_coordinates = np.asarray(y_coordinates, dtype=np.int64)
+
+        invalid = self.invalid_moves(player_indexes, x_coordinates, y_coordinates)
+        if invalid.any():
+            raise Exception(
+                f"The move is illegal in games: {np.flatnonzero(invalid).tolist()}"
+            )
+
+        games = np.flatnonzero(self.status == ONGOING)
+        players = player_indexes[games]
+        x_coordinates = x_coordinates[games]
+        y_coordinates = y_coordinates[games]
+
+        self.boards[games, x_coordinates, y_coordinates] = players
+        self.last_played_by[games] = players
+        self.move_counts[games] += 1
+
+        won = self._is_winning_move(games, players, x_coordinates, y_coordinates)
+        self.status[games[won]] = players[won]
+        full = self.move_counts[games] == self.board_size * self.board_size
+        self.status[games[full & ~won]] = DRAW
+        return self.status.copy()
+
+    def _is_winning_move(
+        self,
+        games: np.ndarray,
+        players: np.ndarray,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+    ) -> np.ndarray:
+        """Check the four lines through the placed points for a run of win_length.
+
+        Only the 2 * win_length - 1 cells of each line centred on the placed point
+        are read, and a sliding window of win_length over them finds the runs.
+        """
+        won = np.zeros(len(games), dtype=bool)
+        for x_step, y_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            line_x = x_coordinates[:, None] + self._offsets * x_step
+            line_y = y_coordinates[:, None] + self._offsets * y_step
+            in_bounds = (
+                (line_x >= 0)
+                & (line_x < self.board_size)
+                & (line_y >= 0)
+                & (line_y < self.board_size)
+            )
+            cells = self.boards[
+                games[:, None],
+                np.clip(line_x, 0, self.board_size - 1),
+                np.clip(line_y, 0, self.board_size - 1),
+            ]
+            owned = in_bounds & (cells == players[:, None])
+            windows = sliding_window_view(owned, self.win_length, axis=1)
+            won |= windows.all(axis=2).any(axis=1)
+        return won
@@ -0,0 +1,141 @@
+"""Module implementing a bitboard backed Tic Tac Toe game."""
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from src.board import TicTacToe
+from src.position import win_lines
+
+
+@lru_cache(maxsize=None)
+def win_masks(board_size: int, win_length: int) -> Tuple[Tuple[int, ...], ...]:
+    """Precompute the winning line masks through every cell of the board.
+
+    Cell (x, y) is bit x * cols + y. A line is a run of win_length cells in
+    one of the four directions, and every cell gets the masks of all lines through
+    it, so checking a move only touches the lines that move can complete.
+
+    Args:
+        board_size (int): size of n x n board, or a (rows, cols) tuple.
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: For each cell, a tuple of the line masks that contain the cell.
+    """
+    lines, lines_through = win_lines(board_size, win_length)
+    line_masks = [sum(1 << cell for cell in cells) for cells in lines]
+    return tuple(
+        tuple(line_masks[line_id] for line_id in line_ids)
+        for line_ids in lines_through
+    )
+
+
+class BitboardTicTacToe(TicTacToe):  # pylint: disable=too-many-instance-attributes
+    """Tic Tac Toe with the state held as one integer bitboard per player.
+
+    Boards up to 8 x 8 fit in a single 64 bit machine word. Occupancy checks are a
+    shift and a mask and a win check is an AND/compare against the precomputed
+    lines through the placed point. `board` is still available as a NumPy array,
+    built from the bitboards when it is read.
+    """
+
+    __slots__ = ("bitboards", "_occupied", "_win_masks")
+
+    _branch_shared = TicTacToe._branch_shared + ("_win_masks", "_occupied")
+
+    def __init__(self, board_size=3, win_length=3, num_players=2):
+        """Init for Bitboard Tic Tac Toe Class."""
+        self.bitboards = {}
+        self._occupied = 0
+        super().__init__(
+            board_size=board_size, win_length=win_length, num_players=num_players
+        )
+        self.win_engine = "bitboard"
+        self._win_masks = win_masks(self.board_size, win_length)
+
+    @property
+    def board(self) -> np.ndarray:
+        """The board as a NumPy array, built from the bitboards."""
+        board = np.zeros(self.rows * self.cols)
+        for player_index, bits in self.bitboards.items():
+            for cell in range(self.rows * self.cols):
+                if bits >> cell & 1:
+                    board[cell] = player_index
+        return board.reshape(self.rows, self.cols)
+
+    @board.setter
+    def board(self, board: np.ndarray) -> None:
+        """Load the bitboards from a NumPy array of player indexes.
+
+        The position loaded has no move history: the Zobrist hashes are
+        recomputed, the move stack is emptied and any player may move next. Use
+        `scan_winner` to find out whether it is already won.
+        """
+        flat = np.asarray(board).ravel()
+        self._clear_board()
+        for cell, value in enumerate(flat.tolist()):
+            if value:
+                bits = self.bitboards.get(int(value), 0)
+                self.bitboards[int(value)] = bits | 1 << cell
+                self._occupied |= 1 << cell
+        self.move_count = bin(self._occupied).count("1")
+        self._empty = self._empty_index = None
+        if hasattr(self, "_symmetries"):  # Not while TicTacToe.__init__ runs.
+            self._forget_moves()
+            for player_index, bits in self.bitboards.items():
+                for cell in range(self.rows * self.cols):
+                    if bits >> cell & 1:
+                        self._hash_point(player_index, *divmod(cell, self.cols))
+
+    def is_grid_occupied(self, x_coordinate: int, y_coordinate: int) -> bool:
+        """Checks if a position on the board is already been played before.
+
+        Args:
+            x_coordinate (int): The x dimension of the board
+            y_coordinate (int): The x dimension of the board
+        Returns:
+            bool: True if its occupied, False otherwise
+        """
+        return bool(self._occupied >> (x_coordinate * self.cols + y_coordinate) & 1)
+
+    def get_winner(self, x_coordinate: int, y_coordinate: int) -> int:
+        """Return the player index of the winner, if there is one. Return 0 otherwise.
+
+        Args:
+            x_coordinate (int): x coordinate of last placed point.
+            y_coordinate (int): y coordinate of last placed point
+        Returns:
+            int: The player index of the winner, if there is one otherwise 0.
+        """
+        bits = self.bitboards.get(self.last_played_by, 0)
+        for mask in self._win_masks[x_coordinate * self.cols + y_coordinate]:
+            if bits & mask == mask:
+                return self.last_played_by
+        return 0
+
+    def _clear_board(self) -> None:
+        """Clear the bitboards."""
+        self.bitboards = {}
+        self._occupied = 0
+
+    def _share_board(self, clone: TicTacToe) -> None:
+        """Give a branch its own bitboards, copying them is O(players)."""
+        # pylint: disable=protected-access
+        clone.bitboards = dict(self.bitboards)
+        clone._board_owners = None
+
+    def _clear_point(self, x_coordinate: int, y_coordinate: int) -> None:
+        """Clear the bit of a point."""
+        bit = 1 << (x_coordinate * self.cols + y_coordinate)
+        for player_index, bits in self.bitboards.items():
+            self.bitboards[player_index] = bits & ~bit
+        self._occupied &= ~bit
+
+    def _set_point(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> None:
+        """Set the bit of a point."""
+        bit = 1 << (x_coordinate * self.cols + y_coordinate)
+        self.bitboards[player_index] = self.bitboards.get(player_index, 0) | bit
+        self._occupied |= bit
@@ -1,51 +1,292 @@
-"""Module implementing Tic Tac Toe game."""
-from typing import List, Tuple
+"""Module implementing Tic Tac Toe game.
+
+NumPy is imported on first use, by the boards of `TicTacToe` and by the
+vectorised `play_sequence` and `scan_winner`, so a subclass keeping its own
+board, like `src.flat.FlatTicTacToe`, starts without it.
+"""
+from __future__ import annotations
+
+import random
+import weakref
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from src.engines import IncrementalWinEngine
+from src.position import DIRECTIONS, board_shape, symmetries, win_lines, zobrist_keys
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from src.scan import WinningLine
+
+WIN_ENGINES = ("recursive", "incremental", "iterative")
+# Engines reading win_length cells per direction on every win check.
+SCANNING_ENGINES = ("recursive", "iterative")
+
+ONGOING = 0
+DRAW = -1
+
+
+def render_move(game, player_index, x_coordinate, y_coordinate, won_player) -> None:
+    """Print the board after a move, and the winner if the move won the game.
+
+    Has the observer signature, so `game.add_observer(render_move)` prints every
+    move made through `TicTacToe.place`.
+    """
+    # pylint: disable=unused-argument
+    print(game)
+    if won_player != 0:
+        print(f"Game won by {won_player}")
+
+
+class TicTacToe:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """The representation of the board and the state.
+
+    Instances have `__slots__` and the direction table is shared by the class, so
+    a game costs little more than its board. Pass `dtype=np.int8` to store the
+    board in one byte per cell, or `board` to keep it in memory owned elsewhere,
+    e.g. a view into the buffer of a `src.pool.BoardPool`.
+
+    With `allow_overline=False` only a run of exactly `win_length` points wins, as
+    in Gomoku, which the `iterative` and `incremental` win engines support.
+
+    `board_size` is n for an n x n board or a (rows, cols) tuple for an m,n,k
+    game, and `num_players` players 1 to num_players take turns in order.
+
+    Moves played with `place` are kept on a stack, so `undo` takes them back and
+    `restore` returns to a `snapshot`. `branch` returns a game to explore that
+    shares the board until one of the two games writes to it.
+    """
+
+    __slots__ = (
+        "board_size",
+        "rows",
+        "cols",
+        "win_length",
+        "board",
+        "player_indexes",
+        "_next_players",
+        "last_played_by",
+        "observers",
+        "win_engine",
+        "allow_overline",
+        "_zobrist_keys",
+        "_symmetries",
+        "_symmetry_hashes",
+        "_run_lengths",
+        "move_count",
+        "winner",
+        "_empty",
+        "_empty_index",
+        "_moves",
+        "_board_owners",
+        "__weakref__",
+    )
+
+    # Attributes a branch shares with its game, they are replaced but not mutated.
+    _branch_shared = (
+        "board_size",
+        "rows",
+        "cols",
+        "win_length",
+        "player_indexes",
+        "_next_players",
+        "last_played_by",
+        "win_engine",
+        "allow_overline",
+        "_zobrist_keys",
+        "_symmetries",
+        "move_count",
+        "winner",
+    )
+
+    _neighbours = (
+        (-1, 1),
+        (-1, 0),
+        (-1, -1),
+        (0, 1),
+        (0, -1),
+        (1, 1),
+        (1, 0),
+        (1, -1),
+    )
+
+    def __init__(
+        self,
+        board_size=3,
+        win_length=3,
+        win_engine="recursive",
+        dtype="float64",
+        board: np.ndarray = None,
+        allow_overline=True,
+        num_players=2,
+    ):
+        """Init for Tic Tac Toe Class."""
+        # pylint: disable=too-many-arguments
+        rows, cols = board_shape(board_size)
+        if min(rows, cols) <= 2:
+            raise Exception("Board size less than 3 is not allowed")
 
-import numpy as np
+        if win_length > max(rows, cols):
+            raise Exception("Win length must be less than board size.")
 
+        if num_players < 2:
+            raise Exception("At least 2 players are needed.")
 
-class TicTacToe:
-    """The representation of the board and the state."""
+        if win_engine not in WIN_ENGINES:
+            raise Exception(
+                f"Unknown win engine: {win_engine}. Must be in {WIN_ENGINES}"
+            )
 
-    def __init__(self, board_size=3, win_length=3):
-        """Init for Tic Tac Toe Class."""
-        if board_size <= 2:
-            raise Exception("Board size less than 3 is not allowed")
+        if not allow_overline and win_engine == "recursive":
+            raise Exception("The recursive win engine always allows overlines.")
 
-        if win_length > board_size:
-            raise Exception("Win length must be less than board size.")
+        board = self._new_board(rows, cols, dtype, board)
 
+        board_size = rows if rows == cols else (rows, cols)
         self.board_size = board_size
+        self.rows = rows
+        self.cols = cols
         self.win_length = win_length
-        self.board = np.zeros([board_size, board_size])
-        self.player_indexes = [1, 2]
+        self.board = board
+        self.player_indexes = list(range(1, num_players + 1))
+        self._next_players = {
+            player_index: self.player_indexes[slot % num_players]
+            for slot, player_index in enumerate(self.player_indexes, 1)
+        }
         self.last_played_by = None
-        self._neighbours = (
-            (-1, 1),
-            (-1, 0),
-            (-1, -1),
-            (0, 1),
-            (0, -1),
-            (1, 1),
-            (1, 0),
-            (1, -1),
-        )
+        self.observers = []
+        self._zobrist_keys = zobrist_keys(board_size, len(self.player_indexes))
+        self._symmetries = symmetries(board_size)
+        self._symmetry_hashes = [0] * len(self._symmetries)
+        self.win_engine = win_engine
+        self.allow_overline = allow_overline
+        self._run_lengths = None
+        if win_engine == "incremental":
+            self._run_lengths = IncrementalWinEngine(board_size, self.player_indexes)
+        self.move_count = 0
+        self.winner = 0
+        self._empty = None
+        self._empty_index = None
+        self._moves = []
+        self._board_owners = None
+
+    def _forget_moves(self) -> None:
+        """Drop the moves, hashes and run lengths, as a new or loaded board has none."""
+        self.last_played_by = None
+        self.winner = 0
+        self._moves = []
+        self._symmetry_hashes = [0] * len(self._symmetries)
+        if self._run_lengths is not None:
+            self._run_lengths.reset()
+
+    def _new_board(self, rows: int, cols: int, dtype, board: np.ndarray = None):
+        """Allocate the board storage, or check and empty the board given."""
+        if board is None:
+            return _numpy().zeros([rows, cols], dtype=dtype)
+        if board.shape != (rows, cols):
+            raise Exception(f"Board must have shape ({rows}, {cols}).")
+        board.fill(0)
+        return board
 
     def reset_board(self):
-        """Resets the board to starting position."""
-        self.board = np.zeros([self.board_size, self.board_size])
-        self.last_played_by = None
+        """Resets the board to starting position, in place."""
+        self._clear_board()
+        self._forget_moves()
+        self.move_count = 0
+        if self._empty is not None:
+            self._empty = list(range(self.rows * self.cols))
+            self._empty_index = list(self._empty)
 
-    def is_index_bound(self, coordinate: int) -> bool:
+    @property
+    def zobrist_hash(self) -> int:
+        """64 bit Zobrist hash of the points played, updated on every move."""
+        return self._symmetry_hashes[0]
+
+    def canonical_key(self) -> int:
+        """Return the same key for all rotations and reflections of the board.
+
+        There are 8 of them on a square board and 4 on a rectangular one.
+
+        The Zobrist hash of every symmetric image of the board is updated on each
+        move, and the smallest of them is the key.
+
+        Returns:
+            int: The minimum Zobrist hash over the symmetries of the board.
+        """
+        return min(self._symmetry_hashes)
+
+    def canonical_symmetry(self) -> int:
+        """Return which symmetry of the board has the key `canonical_key()`.
+
+        Returns:
+            int: Index into `src.position.symmetries(board_size)` of the image with
+                the smallest Zobrist hash, cell c of the board is cell
+                symmetries(board_size)[index][c] of that image.
+        """
+        hashes = self._symmetry_hashes
+        return hashes.index(min(hashes))
+
+    def status(self) -> int:
+        """Return the state of the game, kept up to date by every move.
+
+        Returns:
+            int: The index of the winning player, ONGOING (0) while the game goes
+                on, or DRAW (-1) once the board is full without a winner.
+        """
+        if self.winner:
+            return self.winner
+        if self.move_count == self.rows * self.cols:
+            return DRAW
+        return ONGOING
+
+    def legal_moves(self) -> List[Tuple[int, int]]:
+        """Return the (x, y) of every empty point, in no particular order."""
+        cols = self.cols
+        return [divmod(cell, cols) for cell in self._empty_cells()]
+
+    def random_legal_move(self, rng: random.Random) -> Tuple[int, int]:
+        """Return the (x, y) of an empty point drawn uniformly, in O(1).
+
+        Args:
+            rng (random.Random): The source of randomness.
+
+        Raises:
+            Exception: If the board is full.
+        """
+        empty = self._empty_cells()
+        if not empty:
+            raise Exception("No legal moves left.")
+        return divmod(empty[rng.randrange(len(empty))], self.cols)
+
+    def _empty_cells(self) -> List[int]:
+        """The empty cells as x * cols + y, indexed on first use.
+
+        The cells are kept in a list with the position of every cell in a second
+        list, so a move removes its cell in O(1) by swapping in the last one.
+        """
+        if self._empty is None:
+            self._empty = [
+                cell
+                for cell, value in enumerate(self._flat_board().tolist())
+                if not value
+            ]
+            self._empty_index = [-1] * (self.rows * self.cols)
+            for position, cell in enumerate(self._empty):
+                self._empty_index[cell] = position
+        return self._empty
+
+    def is_index_bound(self, coordinate: int, axis: int = 0) -> bool:
         """Checks if the given position 'x' is within the bounds of the board dimmension.
 
         Args:
             coordinate (int): The position to be played
+            axis (int): 0 to check against the rows, 1 against the columns.
 
         Returns:
             bool: True if it is within the board dimmension, False otherwise.
         """
-        if coordinate >= self.board_size or coordinate < 0:
+        if coordinate >= (self.cols if axis else self.rows) or coordinate < 0:
             return False
         return True
 
@@ -75,18 +316,20 @@ class TicTacToe:
             return True
         return False
 
-    def is_consecutive_player(self, player_index: int) -> bool:
-        """Checks if the move is played by the same player consecutively.
+    def player_to_move(self) -> Optional[int]:
+        """Return the player index to move next, None if any player may start."""
+        return self._next_players.get(self.last_played_by)
+
+    def is_players_turn(self, player_index: int) -> bool:
+        """Checks if it is the turn of the player, players take turns in order.
 
         Args:
             player_index (int): The index of the player playing the move
 
         Returns:
-            bool: True if it is consecutive, False otherwise.
+            bool: True if the player is next, or if nobody has played yet.
         """
-        if self.last_played_by and self.last_played_by == player_index:
-            return True
-        return False
+        return self._next_players.get(self.last_played_by, player_index) == player_index
 
     def get_winner(self, x_coordinate: int, y_coordinate: int) -> int:
         """Return the player index of the winner, if there is one. Return 0 otherwise.
@@ -97,6 +340,19 @@ class TicTacToe:
         Returns:
             int: The player index of the winner, if there is one otherwise 0.
         """
+        if self._run_lengths is not None:
+            runs = self._run_lengths.runs_through(
+                self.last_played_by, x_coordinate, y_coordinate
+            )
+            if self.win_length in runs or (
+                self.allow_overline and max(runs) > self.win_length
+            ):
+                return self.last_played_by
+            return 0
+
+        if self.win_engine == "iterative":
+            return self._scan_winner(x_coordinate, y_coordinate)
+
         edges = list(self._neighbours)
         while len(edges) > 0:
             edge = edges.pop()
@@ -105,7 +361,7 @@ class TicTacToe:
             )
 
             if not self.is_index_bound(path_start[0]) or not self.is_index_bound(
-                path_start[1]
+                path_start[1], 1
             ):
                 continue
             if self.board[path_start[0], path_start[1]] != self.last_played_by:
@@ -121,6 +377,78 @@ class TicTacToe:
                 edges.remove(reflection)
         return 0
 
+    def scan_winner(self) -> Tuple[int, List[WinningLine]]:
+        """Find the winner of the whole board, whatever the last move was.
+
+        Unlike `get_winner`, which reads the lines through the last move, every
+        row, column and diagonal is read in one vectorised pass, so boards loaded
+        from storage or received from a client can be checked. See `src.scan`.
+
+        Returns:
+            tuple: The index of the winning player, 0 if nobody has won and
+                SEVERAL_WINNERS if more than one player has, and the
+                WinningLine(player, cells) of every run of win_length points.
+        """
+        # pylint: disable=import-outside-toplevel
+        from src.scan import WinningLine, run_cells, scan_boards
+
+        winners, runs = scan_boards(self.board, self.win_length, self.allow_overline)
+        lines = [
+            WinningLine(int(run[1]), run_cells(run, self.win_length)) for run in runs
+        ]
+        return int(winners[0]), lines
+
+    def _flat_board(self):
+        """The cells of the board as x * cols + y, a view sharing its storage."""
+        return self.board.reshape(-1)
+
+    def _scan_winner(self, x_coordinate: int, y_coordinate: int) -> int:
+        """Count the points of the last player along the 4 axes through (x, y).
+
+        Each axis is walked forward and then backward over the flat board, one
+        index step at a time, and the walk stops at the edge of the board, at a
+        point of another player or once the run is long enough to decide the axis:
+        win_length points, or win_length + 1 when overlines do not win. At most
+        4 * win_length points are read, O(win_length) per move.
+
+        Args:
+            x_coordinate (int): x coordinate of last placed point.
+            y_coordinate (int): y coordinate of last placed point
+        Returns:
+            int: The player index of the winner, if there is one otherwise 0.
+        """
+        player_index = self.last_played_by
+        cols = self.cols
+        flat = self._flat_board()
+        cell = x_coordinate * cols + y_coordinate
+        cap = self.win_length if self.allow_overline else self.win_length + 1
+        for x_step, y_step in DIRECTIONS:
+            step = x_step * cols + y_step
+            forward = min(
+                _room(x_coordinate, x_step, self.rows),
+                _room(y_coordinate, y_step, cols),
+            )
+            backward = min(
+                _room(x_coordinate, -x_step, self.rows),
+                _room(y_coordinate, -y_step, cols),
+            )
+            run = 1
+            position = cell
+            for _ in range(min(forward, cap - run)):
+                position += step
+                if flat[position] != player_index:
+                    break
+                run += 1
+            position = cell
+            for _ in range(min(backward, cap - run)):
+                position -= step
+                if flat[position] != player_index:
+                    break
+                run += 1
+            if run == self.win_length:
+                return player_index
+        return 0
+
     def check_valid_move(
         self, player_index: int, x_coordinate: int, y_coordinate: int
     ) -> List:
@@ -140,17 +468,21 @@ class TicTacToe:
         if not self.is_player_valid(player_index):
             messages.append(f"Invalid Player index. Must be in {self.player_indexes}")
 
-        if self.is_consecutive_player(player_index):
+        if player_index == self.last_played_by:
             messages.append(
                 f"Player {player_index} has just been. Time for another player!"
             )
+        elif self.is_player_valid(player_index) and not self.is_players_turn(
+            player_index
+        ):
+            messages.append(f"It is the turn of player {self.player_to_move()}.")
 
         coordinates_in_bounds = True
         if not self.is_index_bound(x_coordinate):
             messages.append(f"x_coord: {x_coordinate} is out of bounds.")
             coordinates_in_bounds = False
 
-        if not self.is_index_bound(y_coordinate):
+        if not self.is_index_bound(y_coordinate, 1):
             messages.append(f"y_coord: {y_coordinate} is out of bounds.")
             coordinates_in_bounds = False
 
@@ -168,12 +500,40 @@ class TicTacToe:
         return str(self.board)
 
     def play_one_step(
-        self, player_index: int, x_coordinate: int, y_coordinate: int
+        self,
+        player_index: int,
+        x_coordinate: int,
+        y_coordinate: int,
+        render: bool = True,
     ) -> int:
         """Plays one step of the game.
 
         This function should validate the move and also see if the move wins the board.
 
+        Args:
+            player_index (int): The index of the player of the current move.
+            x_coordinate (int): The x position.
+            y_coordinate (int): The y position.
+            render (bool): Print the board (and the winner) after the move.
+
+        Raises:
+            Exception: If the move is invalid
+
+        Returns:
+            int: The index of the winning player, 0 otherwise
+        """
+        won_player = self.place(player_index, x_coordinate, y_coordinate)
+        if render:
+            render_move(self, player_index, x_coordinate, y_coordinate, won_player)
+        return won_player
+
+    def place(self, player_index: int, x_coordinate: int, y_coordinate: int) -> int:
+        """Plays one step of the game without printing anything.
+
+        The move is validated with plain boolean checks, the error messages are only
+        built when the move is rejected. Observers added with `add_observer` are
+        called after the move is placed.
+
         Args:
             player_index (int): The index of the player of the current move.
             x_coordinate (int): The x position.
@@ -185,20 +545,376 @@ class TicTacToe:
         Returns:
             int: The index of the winning player, 0 otherwise
         """
-        messages = self.check_valid_move(player_index, x_coordinate, y_coordinate)
-        if messages:
+        if not self.is_move_valid(player_index, x_coordinate, y_coordinate):
+            messages = self.check_valid_move(player_index, x_coordinate, y_coordinate)
             raise Exception(f"The move is illegal : {','.join(messages)}")
 
-        self.board[x_coordinate, y_coordinate] = player_index
+        self._place_point(player_index, x_coordinate, y_coordinate)
+        won_player = self.get_winner(x_coordinate, y_coordinate)
+        self.winner = self.winner or won_player
+        for observer in self.observers:
+            observer(self, player_index, x_coordinate, y_coordinate, won_player)
+        return won_player
+
+    def play_sequence(
+        self, player_indexes, x_coordinates, y_coordinates
+    ) -> Tuple[int, Optional[int]]:
+        """Validate a whole sequence of moves at once, then play it until a win.
+
+        The checks of `check_valid_move` run on all the moves together with NumPy:
+        player indexes, turn order, bounds, and cells taken on the board or by an
+        earlier move of the sequence. Nothing is played if any move is illegal.
+        With the recursive and iterative engines, which walk the board on every
+        win check, the first winning move is found in one pass over the lines of
+        win_length cells instead when overlines win. Observers are called after
+        every move.
+
+        Args:
+            player_indexes (array like): The player of every move.
+            x_coordinates (array like): The x position of every move.
+            y_coordinates (array like): The y position of every move.
+
+        Raises:
+            Exception: If the arrays differ in length, or with the messages of the
+                first illegal move.
+
+        Returns:
+            tuple: The index of the winning player and the index of the winning
+                move in the sequence, (0, None) if no move wins.
+        """
+        # pylint: disable=too-many-locals
+        np = _numpy()
+        players = np.asarray(player_indexes, dtype=np.int64)
+        x_coords = np.asarray(x_coordinates, dtype=np.int64)
+        y_coords = np.asarray(y_coordinates, dtype=np.int64)
+        if not players.ndim == x_coords.ndim == y_coords.ndim == 1 or not (
+            len(players) == len(x_coords) == len(y_coords)
+        ):
+            raise Exception("Moves must be given as 1-D arrays of the same length.")
+        if players.size == 0:
+            return 0, None
+
+        cells = x_coords * self.cols + y_coords
+        if not self._is_legal_sequence(players, x_coords, y_coords, cells):
+            invalid = self._invalid_sequence(players, x_coords, y_coords, cells)
+            index = int(np.argmax(invalid))
+            messages = self._sequence_messages(index, players, x_coords, y_coords)
+            raise Exception(f"Move {index} is illegal : {','.join(messages)}")
+
+        won_at = None
+        one_pass = self.allow_overline and self.win_engine in SCANNING_ENGINES
+        if one_pass:
+            won_at = self._first_win(players, cells)
+            if won_at is not None:
+                players = players[: won_at + 1]
+        for index, (player_index, x_coordinate, y_coordinate) in enumerate(
+            zip(players.tolist(), x_coords.tolist(), y_coords.tolist())
+        ):
+            self._place_point(player_index, x_coordinate, y_coordinate)
+            if one_pass:
+                won_player = player_index if index == won_at else 0
+            else:
+                won_player = self.get_winner(x_coordinate, y_coordinate)
+            self.winner = self.winner or won_player
+            for observer in self.observers:
+                observer(self, player_index, x_coordinate, y_coordinate, won_player)
+            if won_player:
+                return won_player, index
+        return 0, None
+
+    def _sequence_messages(
+        self,
+        index: int,
+        players: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+    ) -> List:
+        """The `check_valid_move` messages of the first illegal move of a sequence.
+
+        The legal moves before it are played on a branch, so the messages are
+        those of the position the move would be played in.
+        """
+        # pylint: disable=protected-access
+        before = self.branch()
+        for player_index, x_coordinate, y_coordinate in zip(
+            players[:index].tolist(),
+            x_coords[:index].tolist(),
+            y_coords[:index].tolist(),
+        ):
+            before._place_point(player_index, x_coordinate, y_coordinate)
+        return before.check_valid_move(
+            int(players[index]), int(x_coords[index]), int(y_coords[index])
+        )
+
+    def _is_legal_sequence(
+        self,
+        players: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+        cells: np.ndarray,
+    ) -> bool:
+        """Check a whole sequence with a few reductions, see `_invalid_sequence`."""
+        np = _numpy()
+        first = int(players[0])
+        if not (self.is_player_valid(first) and self.is_players_turn(first)):
+            return False
+        if not (players[1:] == players[:-1] % len(self.player_indexes) + 1).all():
+            return False
+        if x_coords.min() < 0 or x_coords.max() >= self.rows:
+            return False
+        if y_coords.min() < 0 or y_coords.max() >= self.cols:
+            return False
+        uses = np.bincount(cells, minlength=self.rows * self.cols)
+        uses += self.board.ravel() != 0
+        return uses.max() <= 1
+
+    def _invalid_sequence(
+        self,
+        players: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+        cells: np.ndarray,
+    ) -> np.ndarray:
+        """Boolean mask of the illegal moves of a sequence, see `play_sequence`.
+
+        Players 1 to N take turns, so every player but the first must be the
+        player after the one before. Cells out of bounds are sent to an extra
+        cell past the board, and a cell is repeated when the first move written
+        to it (writing the moves in reverse order) is another move.
+        """
+        # pylint: disable=unsupported-assignment-operation
+        np = _numpy()
+        num_players = len(self.player_indexes)
+        size = self.rows * self.cols
+        expected = np.empty_like(players)
+        expected[0] = self._next_players.get(self.last_played_by, players[0])
+        expected[1:] = players[:-1] % num_players + 1
+        out_of_bounds = (x_coords.astype(np.uint64) >= self.rows) | (
+            y_coords.astype(np.uint64) >= self.cols
+        )
+        cells = np.where(out_of_bounds, size, cells)
+        moves = np.arange(len(cells))
+        first_moves = np.empty(size + 1, dtype=np.int64)
+        first_moves[cells[::-1]] = moves[::-1]
+        taken = np.append(self.board.ravel() != 0, False)
+        return (
+            (players != expected)
+            | (expected < 1)
+            | (expected > num_players)
+            | out_of_bounds
+            | taken[cells]
+            | ((first_moves[cells] != moves) & ~out_of_bounds)
+        )
+
+    def _first_win(self, players: np.ndarray, cells: np.ndarray) -> Optional[int]:
+        """Index of the first move of a legal sequence that wins, None if none does.
+
+        A line of win_length cells is won by the move that fills it last, if all
+        its points are of one player. Lines full before the sequence are skipped.
+        """
+        np = _numpy()
+        lines = _line_cells(self.board_size, self.win_length)
+        owners = self.board.ravel().astype(np.int64)
+        owners[cells] = players
+        moves = np.full(len(owners), -1, dtype=np.int64)
+        moves[cells] = np.arange(len(cells))
+        line_owners = owners[lines]
+        owned = (line_owners == line_owners[:, :1]).all(axis=1)
+        complete = owned & (line_owners[:, 0] != 0)
+        won_at = moves[lines[complete]].max(axis=1, initial=-1)
+        won_at = won_at[won_at >= 0]
+        return int(won_at.min()) if won_at.size else None
+
+    def is_move_valid(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> bool:
+        """Yes/no version of `check_valid_move` that builds no messages.
+
+        Args:
+            player_index (int): The index of the player of the current move.
+            x_coordinate (int): The x position.
+            y_coordinate (int): The y position.
+
+        Returns:
+            bool: True if the move is valid, False otherwise.
+        """
+        return (
+            player_index in self.player_indexes
+            and self._next_players.get(self.last_played_by, player_index)
+            == player_index
+            and 0 <= x_coordinate < self.rows
+            and 0 <= y_coordinate < self.cols
+            and not self.is_grid_occupied(x_coordinate, y_coordinate)
+        )
+
+    def add_observer(self, observer: Callable) -> None:
+        """Call `observer(game, player_index, x, y, won_player)` after every move.
+
+        Args:
+            observer (Callable): The callback, `render_move` prints the board.
+        """
+        self.observers.append(observer)
+
+    def undo(self) -> Tuple[int, int, int]:
+        """Take back the last move, observers are not called.
+
+        Raises:
+            Exception: If there is no move to take back.
+
+        Returns:
+            tuple: The (player_index, x, y) of the move taken back.
+        """
+        if not self._moves:
+            raise Exception("No move to undo.")
+        player_index, x_coordinate, y_coordinate, last_played_by, winner, _ = (
+            self._moves.pop()
+        )
+        self._clear_point(x_coordinate, y_coordinate)
+        self.last_played_by = last_played_by
+        self.winner = winner
+        self.move_count -= 1
+        self._hash_point(player_index, x_coordinate, y_coordinate)
+        if self._empty is not None:
+            cell = x_coordinate * self.cols + y_coordinate
+            self._empty_index[cell] = len(self._empty)
+            self._empty.append(cell)
+        if self._run_lengths is not None:
+            self._run_lengths.remove(player_index, x_coordinate, y_coordinate)
+        return player_index, x_coordinate, y_coordinate
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Return a token of the current position for `restore`, in O(1)."""
+        return len(self._moves), self.zobrist_hash
+
+    def restore(self, token: Tuple[int, int]) -> None:
+        """Go back to the position of a `snapshot` by undoing the moves since.
+
+        Args:
+            token (tuple): The return value of `snapshot`.
+
+        Raises:
+            Exception: If the position of the snapshot is not in the history of
+                the game, e.g. after undoing past it and playing other moves.
+        """
+        depth, key = token
+        moves = self._moves
+        if depth > len(moves) or key != (
+            moves[depth][5] if depth < len(moves) else self.zobrist_hash
+        ):
+            raise Exception("The snapshot is not in the history of this game.")
+        while len(moves) > depth:
+            self.undo()
+
+    def branch(self) -> "TicTacToe":
+        """Return a copy of the game to explore without touching this one.
+
+        The NumPy board is shared until one of the games writes to it, then the
+        branch gets a copy and the game keeps its storage. The move stack and the
+        move index are copied, so the branch can be undone to any earlier move. It
+        starts without observers.
+        """
+        # pylint: disable=protected-access
+        clone = type(self).__new__(type(self))
+        for name in self._branch_shared:
+            setattr(clone, name, getattr(self, name))
+        clone.observers = []
+        clone._symmetry_hashes = list(self._symmetry_hashes)
+        clone._moves = list(self._moves)
+        clone._run_lengths = None
+        if self._run_lengths is not None:
+            clone._run_lengths = self._run_lengths.copy()
+        clone._empty = None
+        clone._empty_index = None
+        if self._empty is not None:
+            clone._empty = list(self._empty)
+            clone._empty_index = list(self._empty_index)
+        self._share_board(clone)
+        return clone
+
+    def _share_board(self, clone: "TicTacToe") -> None:
+        """Give a branch the board, the first of the games sharing it owns it."""
+        # pylint: disable=protected-access
+        if self._board_owners is None:
+            self._board_owners = [weakref.ref(self)]
+        self._board_owners.append(weakref.ref(clone))
+        clone._board_owners = self._board_owners
+        clone.board = self.board
+
+    def _own_board(self) -> None:
+        """Stop sharing the board before a write, the owner keeps it, branches copy it."""
+        # pylint: disable=protected-access
+        owners = self._board_owners
+        self._board_owners = None
+        if owners[0]() is not self:
+            owners[1:] = [ref for ref in owners[1:] if ref() not in (None, self)]
+            self.board = self.board.copy()
+            return
+        branches = [game for game in (ref() for ref in owners[1:]) if game is not None]
+        if branches:
+            board = self.board.copy()
+            shared = [weakref.ref(game) for game in branches]
+            for game in branches:
+                game.board = board
+                game._board_owners = shared if len(shared) > 1 else None
+
+    def _clear_board(self) -> None:
+        """Empty every cell of the board without reallocating it."""
+        if self._board_owners is not None:
+            self._own_board()
+        self.board.fill(0)
+
+    def _place_point(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> None:
+        """Write an already validated move to the board and the win engine."""
+        self._moves.append(
+            (
+                player_index,
+                x_coordinate,
+                y_coordinate,
+                self.last_played_by,
+                self.winner,
+                self._symmetry_hashes[0],
+            )
+        )
+        self._set_point(player_index, x_coordinate, y_coordinate)
         self.last_played_by = player_index
+        self.move_count += 1
+        self._hash_point(player_index, x_coordinate, y_coordinate)
+        if self._empty is not None:
+            cell = x_coordinate * self.cols + y_coordinate
+            position = self._empty_index[cell]
+            last = self._empty.pop()
+            if last != cell:
+                self._empty[position] = last
+                self._empty_index[last] = position
+            self._empty_index[cell] = -1
+        if self._run_lengths is not None:
+            self._run_lengths.place(player_index, x_coordinate, y_coordinate)
+
+    def _set_point(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> None:
+        """Write a point to the board storage."""
+        if self._board_owners is not None:
+            self._own_board()
+        self.board[x_coordinate, y_coordinate] = player_index
 
-        print(self)
+    def _clear_point(self, x_coordinate: int, y_coordinate: int) -> None:
+        """Empty a point of the board storage."""
+        if self._board_owners is not None:
+            self._own_board()
+        self.board[x_coordinate, y_coordinate] = 0
 
-        won_player = self.get_winner(x_coordinate, y_coordinate)
-        if won_player != 0:
-            print(f"Game won by {won_player}")
-            return won_player
-        return 0
+    def _hash_point(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> None:
+        """XOR a point into (or out of) the Zobrist hash of every symmetry."""
+        keys = self._zobrist_keys[self.player_indexes.index(player_index)]
+        cell = x_coordinate * self.cols + y_coordinate
+        hashes = self._symmetry_hashes
+        for index, permutation in enumerate(self._symmetries):
+            hashes[index] ^= keys[permutation[cell]]
 
     # pylint: disable=inconsistent-return-statements
     def _find_path(
@@ -226,7 +942,7 @@ class TicTacToe:
 
         point_out_of_bounds = not self.is_index_bound(
             point[0]
-        ) or not self.is_index_bound(point[1])
+        ) or not self.is_index_bound(point[1], 1)
 
         if not point_out_of_bounds and (
             self.board[point[0], point[1]] == self.last_played_by
@@ -239,7 +955,7 @@ class TicTacToe:
         next_point = self._take_step_in_direction(current_path[0], edge)
         next_point_out_of_bounds = not self.is_index_bound(
             next_point[0]
-        ) or not self.is_index_bound(next_point[1])
+        ) or not self.is_index_bound(next_point[1], 1)
 
         if next_point_out_of_bounds:
             return current_path
@@ -254,7 +970,31 @@ class TicTacToe:
     @staticmethod
     def _take_step_in_direction(point: List[int], edge: Tuple) -> list:
         """Move point to next point via a direction vector, edge."""
-        new_point = [np.nan] * 2
-        new_point[0] = point[0] + edge[0]
-        new_point[1] = point[1] + edge[1]
-        return new_point
+        return [point[0] + edge[0], point[1] + edge[1]]
+
+
+@lru_cache(maxsize=None)
+def _line_cells(board_size, win_length: int) -> np.ndarray:
+    """The cells of every line of win_length cells as a (lines, win_length) array."""
+    lines, _ = win_lines(board_size, win_length)
+    np = _numpy()
+    return np.array(lines, dtype=np.int64).reshape(len(lines), win_length)
+
+
+def _numpy():
+    """Import NumPy on first use."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    return numpy
+
+
+def _room(coordinate: int, step: int, length: int) -> int:
+    """Number of steps of `step` (-1, 0 or 1) from `coordinate` before an edge.
+
+    `length` is the number of rows or columns along the axis of `coordinate`.
+    """
+    if step > 0:
+        return length - 1 - coordinate
+    if step < 0:
+        return coordinate
+    return length
@@ -0,0 +1,237 @@
+"""Module implementing a position evaluation cache and an opening book.
+
+Both are keyed by the Zobrist hash of the board and the player to move, and the
+cache by the board size, win length and overline rule of the game as well. With
+symmetry folding the key is `TicTacToe.canonical_key()`, shared by the 8
+rotations and reflections of the board, and moves are stored for the canonical
+image and mapped back to the board they are asked for.
+"""
+import struct
+from collections import OrderedDict, namedtuple
+from typing import Dict, Optional, Tuple
+
+from src.board import TicTacToe
+from src.position import symmetries
+from src.search import Searcher
+
+# Approximate bytes per cache entry: key, value and OrderedDict bookkeeping.
+ENTRY_BYTES = 300
+
+BOOK_MAGIC = b"TTTB"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<4sBBBB")
+BOOK_ENTRY = struct.Struct("<QBH")
+
+CacheEntry = namedtuple("CacheEntry", ["score", "move"])
+
+
+def _position_key(game: TicTacToe, fold_symmetries: bool) -> Tuple[int, int]:
+    """Key of the position of `game` and its player to move, the first if none."""
+    key = game.canonical_key() if fold_symmetries else game.zobrist_hash
+    return key, game.player_to_move() or game.player_indexes[0]
+
+
+def _cache_key(game: TicTacToe, fold_symmetries: bool) -> Tuple:
+    """Key of a position in the cache, which holds positions of any variant."""
+    return _position_key(game, fold_symmetries) + (
+        game.board_size,
+        game.win_length,
+        game.allow_overline,
+    )
+
+
+def _to_canonical(game: TicTacToe, move: Tuple[int, int]) -> int:
+    """Map an (x, y) move of the board to a cell of its canonical image."""
+    permutation = symmetries(game.board_size)[game.canonical_symmetry()]
+    return permutation[move[0] * game.cols + move[1]]
+
+
+def _from_canonical(game: TicTacToe, cell: int) -> Tuple[int, int]:
+    """Map a cell of the canonical image back to an (x, y) move of the board."""
+    permutation = symmetries(game.board_size)[game.canonical_symmetry()]
+    return divmod(permutation.index(cell), game.cols)
+
+
+class EvaluationCache:
+    """Scores and best moves of positions with least recently used eviction.
+
+    The cache holds at most `max_entries` positions, or as many as fit in
+    `max_bytes` at about ENTRY_BYTES each. Entries are kept in an OrderedDict,
+    least recently used first, so eviction pops from the front.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, fold_symmetries=True):
+        """Init for Evaluation Cache Class."""
+        if max_entries is None and max_bytes is None:
+            raise Exception("Give a maximum number of entries or of bytes.")
+        limits = [max_entries] if max_entries is not None else []
+        if max_bytes is not None:
+            limits.append(max_bytes // ENTRY_BYTES)
+        self.max_entries = min(limits)
+        if self.max_entries <= 0:
+            raise Exception("The cache must hold at least one entry.")
+        self.fold_symmetries = fold_symmetries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of cached positions."""
+        return len(self._entries)
+
+    def get(self, game: TicTacToe) -> Optional[CacheEntry]:
+        """Return the cached score and move of the position of `game`, or None."""
+        key = _cache_key(game, self.fold_symmetries)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        score, cell = entry
+        if cell is None:
+            return CacheEntry(score, None)
+        if not self.fold_symmetries:
+            return CacheEntry(score, divmod(cell, game.cols))
+        return CacheEntry(score, _from_canonical(game, cell))
+
+    def put(
+        self, game: TicTacToe, score: int, move: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Cache the score, and optionally the best (x, y) move, of `game`."""
+        cell = None
+        if move is not None:
+            cell = move[0] * game.cols + move[1]
+            if self.fold_symmetries:
+                cell = _to_canonical(game, move)
+        key = _cache_key(game, self.fold_symmetries)
+        self._entries[key] = (score, cell)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Entries, hits, misses, evictions and hit rate."""
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class OpeningBook:
+    """Precomputed best moves for the first plies of a variant.
+
+    Positions are folded by symmetry. A book file starts with the magic bytes
+    `TTTB`, a version byte, the board size, the win length and the number of
+    plies, followed by one (key, player to move, canonical cell) entry per
+    position. Zobrist keys are generated from a fixed seed, so a book written by
+    one process is valid in any other.
+    """
+
+    def __init__(self, board_size: int, win_length: int, plies: int, moves: Dict):
+        """Init for Opening Book Class, use `build` or `load`."""
+        self.board_size = board_size
+        self.win_length = win_length
+        self.plies = plies
+        self.moves = moves
+
+    def __len__(self) -> int:
+        """Number of positions in the book."""
+        return len(self.moves)
+
+    @classmethod
+    def build(
+        cls,
+        board_size: int,
+        win_length: int,
+        plies: int,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None,
+    ) -> "OpeningBook":
+        """Search the best move of every position of the first `plies` plies.
+
+        Args:
+            board_size (int): size of n x n board.
+            win_length (int): number of consecutive points needed to win.
+            plies (int): Positions with fewer points than this are in the book.
+            depth (int): Search depth per position, the whole game tree if None.
+            time_limit (float): Seconds to search each position for.
+
+        Returns:
+            OpeningBook: The book, with one move per position.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
+        book = cls(board_size, win_length, plies, {})
+        searcher = Searcher()
+        frontier = [[]]
+        for _ in range(plies):
+            next_frontier = []
+            for moves in frontier:
+                game = TicTacToe(board_size, win_length)
+                for step, move in enumerate(moves):
+                    game.place(game.player_indexes[step % 2], *move)
+                key = _position_key(game, True)
+                if game.status() or key in book.moves:
+                    continue
+                best = searcher.search(game, depth=depth, time_limit=time_limit)
+                book.moves[key] = _to_canonical(game, best)
+                next_frontier.extend(moves + [move] for move in game.legal_moves())
+            frontier = next_frontier
+        return book
+
+    def lookup(self, game: TicTacToe) -> Optional[Tuple[int, int]]:
+        """Return the book move for the player to move in `game`, or None."""
+        if (game.board_size, game.win_length) != (self.board_size, self.win_length):
+            return None
+        cell = self.moves.get(_position_key(game, True))
+        if cell is None:
+            return None
+        return _from_canonical(game, cell)
+
+    def write(self, path: str) -> None:
+        """Write the book to `path`."""
+        with open(path, "wb") as book_file:
+            book_file.write(
+                BOOK_HEADER.pack(
+                    BOOK_MAGIC,
+                    BOOK_VERSION,
+                    self.board_size,
+                    self.win_length,
+                    self.plies,
+                )
+            )
+            for (key, player_index), cell in sorted(self.moves.items()):
+                book_file.write(BOOK_ENTRY.pack(key, player_index, cell))
+
+    @classmethod
+    def load(cls, path: str) -> "OpeningBook":
+        """Read a book written by `write`."""
+        with open(path, "rb") as book_file:
+            data = book_file.read()
+        magic, version, board_size, win_length, plies = BOOK_HEADER.unpack_from(data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise Exception("Not an opening book.")
+        moves = {
+            (key, player_index): cell
+            for key, player_index, cell in BOOK_ENTRY.iter_unpack(
+                data[BOOK_HEADER.size :]
+            )
+        }
+        return cls(board_size, win_length, plies, moves)
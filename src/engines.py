@@ -0,0 +1,150 @@
+"""Module implementing the incremental win detection engine for Tic Tac Toe."""
+from typing import List
+
+from src.position import board_shape
+
+
+class IncrementalWinEngine:
+    """Run length matrices per player and per direction, updated on each placement.
+
+    Every placed point looks at its neighbours in the four directions of travel. A
+    neighbour next to an empty point is always the end of a run, so it holds the
+    length of that run. Joining the runs before and after the point and writing the
+    new length to both of its ends keeps the matrices correct in O(1) per move.
+    The lengths joined by each placement are stacked, so `remove` takes the last
+    point back in O(1) as well.
+    """
+
+    __slots__ = (
+        "board_size",
+        "rows",
+        "cols",
+        "_player_slots",
+        "run_lengths",
+        "_joined",
+    )
+
+    # horizontal, vertical, diagonal from left to right, diagonal from right to left
+    directions = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, board_size: int, player_indexes: List[int]):
+        """Init for the incremental win engine, board_size may be (rows, cols)."""
+        self.board_size = board_size
+        self.rows, self.cols = board_shape(board_size)
+        self._player_slots = {
+            player_index: slot for slot, player_index in enumerate(player_indexes)
+        }
+        self.run_lengths = []
+        self._joined = []
+        self.reset()
+
+    def reset(self):
+        """Clears every run length matrix."""
+        cells = self.rows * self.cols
+        self.run_lengths = [
+            [[0] * cells for _ in self.directions] for _ in self._player_slots
+        ]
+        self._joined = []
+
+    def copy(self) -> "IncrementalWinEngine":
+        """Return an independent engine with the same run lengths."""
+        # pylint: disable=protected-access
+        clone = IncrementalWinEngine.__new__(IncrementalWinEngine)
+        clone.board_size = self.board_size
+        clone.rows = self.rows
+        clone.cols = self.cols
+        clone._player_slots = self._player_slots
+        clone.run_lengths = [
+            [list(runs) for runs in player_runs] for player_runs in self.run_lengths
+        ]
+        clone._joined = list(self._joined)
+        return clone
+
+    def _run_at(self, runs: List[int], x_coordinate: int, y_coordinate: int) -> int:
+        """Return the run length stored at (x, y), 0 if (x, y) is off the board."""
+        if not 0 <= x_coordinate < self.rows:
+            return 0
+        if not 0 <= y_coordinate < self.cols:
+            return 0
+        return runs[x_coordinate * self.cols + y_coordinate]
+
+    def place(self, player_index: int, x_coordinate: int, y_coordinate: int) -> int:
+        """Update the run length matrices for a newly placed point.
+
+        Args:
+            player_index (int): The index of the player placing the point.
+            x_coordinate (int): The x position.
+            y_coordinate (int): The y position.
+
+        Returns:
+            int: The longest run through the placed point.
+        """
+        size = self.cols
+        longest = 0
+        joined = []
+        for runs, (x_step, y_step) in zip(
+            self.run_lengths[self._player_slots[player_index]], self.directions
+        ):
+            before = self._run_at(runs, x_coordinate - x_step, y_coordinate - y_step)
+            after = self._run_at(runs, x_coordinate + x_step, y_coordinate + y_step)
+            length = before + after + 1
+
+            runs[x_coordinate * size + y_coordinate] = length
+            if before:
+                runs[
+                    (x_coordinate - x_step * before) * size
+                    + y_coordinate
+                    - y_step * before
+                ] = length
+            if after:
+                runs[
+                    (x_coordinate + x_step * after) * size
+                    + y_coordinate
+                    + y_step * after
+                ] = length
+            joined.append((before, after))
+            longest = max(longest, length)
+        self._joined.append(joined)
+        return longest
+
+    def remove(self, player_index: int, x_coordinate: int, y_coordinate: int) -> None:
+        """Take back the point placed last, which must be at (x, y).
+
+        The ends of the runs it joined get their own lengths back. Any point placed
+        after them has been removed first, so these are the values they held.
+        """
+        size = self.cols
+        cell = x_coordinate * size + y_coordinate
+        for runs, (x_step, y_step), (before, after) in zip(
+            self.run_lengths[self._player_slots[player_index]],
+            self.directions,
+            self._joined.pop(),
+        ):
+            runs[cell] = 0
+            if before:
+                runs[
+                    (x_coordinate - x_step * before) * size
+                    + y_coordinate
+                    - y_step * before
+                ] = before
+            if after:
+                runs[
+                    (x_coordinate + x_step * after) * size
+                    + y_coordinate
+                    + y_step * after
+                ] = after
+
+    def longest_run(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> int:
+        """Return the longest run through the most recently placed point (x, y)."""
+        return max(self.runs_through(player_index, x_coordinate, y_coordinate))
+
+    def runs_through(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> List[int]:
+        """Return the run length through the last placed (x, y) in each direction."""
+        cell = x_coordinate * self.cols + y_coordinate
+        return [
+            runs[cell] for runs in self.run_lengths[self._player_slots[player_index]]
+        ]
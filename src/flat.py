@@ -0,0 +1,125 @@
+"""Module implementing a pure Python Tic Tac Toe game on a flat bytearray.
+
+Importing it does not import NumPy, so a process started to validate and play a
+few moves, like a worker started per request, is ready in a fraction of the
+time. NumPy is imported on first use of what needs it: reading `board` as an
+array, printing the game, `play_sequence` and `scan_winner`.
+"""
+from src.board import TicTacToe
+
+# One byte per cell holds the player indexes 1 to 255.
+MAX_PLAYERS = 255
+
+
+def _numpy():
+    """Import NumPy on first use."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    return numpy
+
+
+class FlatTicTacToe(TicTacToe):
+    """Tic Tac Toe with the board held in a flat bytearray, one byte per cell.
+
+    Cell (x, y) is byte x * cols + y. Wins are checked on the bytes by the
+    iterative engine, or by the incremental one, as `TicTacToe` does. `board` is
+    still available as a NumPy array, built from the bytes when it is read.
+    """
+
+    __slots__ = ("cells",)
+
+    def __init__(
+        self,
+        board_size=3,
+        win_length=3,
+        win_engine="iterative",
+        allow_overline=True,
+        num_players=2,
+    ):
+        """Init for Flat Tic Tac Toe Class."""
+        # pylint: disable=too-many-arguments
+        if win_engine == "recursive":
+            raise Exception("The flat board has no recursive win engine.")
+        if num_players > MAX_PLAYERS:
+            raise Exception(f"At most {MAX_PLAYERS} players fit in a byte.")
+        self.cells = bytearray()
+        super().__init__(
+            board_size=board_size,
+            win_length=win_length,
+            win_engine=win_engine,
+            allow_overline=allow_overline,
+            num_players=num_players,
+        )
+
+    def _new_board(self, rows: int, cols: int, dtype, board=None) -> bytearray:
+        """Allocate the cells, there is no NumPy board to check."""
+        return bytearray(rows * cols)
+
+    @property
+    def board(self):
+        """The board as a NumPy array, built from the cells."""
+        np = _numpy()
+        return (
+            np.frombuffer(self.cells, dtype=np.uint8)
+            .astype(np.float64)
+            .reshape(self.rows, self.cols)
+        )
+
+    @board.setter
+    def board(self, board) -> None:
+        """Load the cells from a bytearray, or from an array of player indexes.
+
+        As for `BitboardTicTacToe`, the position loaded has no move history: the
+        Zobrist hashes are recomputed, the move stack is emptied and any player
+        may move next.
+        """
+        if not isinstance(board, bytearray):
+            board = bytearray(int(value) for value in _numpy().ravel(board).tolist())
+        self.cells = board
+        self.move_count = len(board) - board.count(0)
+        self._empty = self._empty_index = None
+        if hasattr(self, "_symmetries"):  # Not while TicTacToe.__init__ runs.
+            self._forget_moves()
+            for cell, player_index in enumerate(board):
+                if player_index:
+                    x_coordinate, y_coordinate = divmod(cell, self.cols)
+                    self._hash_point(player_index, x_coordinate, y_coordinate)
+                    if self._run_lengths is not None:
+                        self._run_lengths.place(
+                            player_index, x_coordinate, y_coordinate
+                        )
+
+    def is_grid_occupied(self, x_coordinate: int, y_coordinate: int) -> bool:
+        """Checks if a position on the board is already been played before.
+
+        Args:
+            x_coordinate (int): The x dimension of the board
+            y_coordinate (int): The x dimension of the board
+        Returns:
+            bool: True if its occupied, False otherwise
+        """
+        return self.cells[x_coordinate * self.cols + y_coordinate] != 0
+
+    def _flat_board(self) -> memoryview:
+        """The cells of the board, as a view of the bytes."""
+        return memoryview(self.cells)
+
+    def _clear_board(self) -> None:
+        """Empty every cell without reallocating the bytes."""
+        self.cells[:] = bytes(len(self.cells))
+
+    def _share_board(self, clone: TicTacToe) -> None:
+        """Give a branch its own cells, copying them is O(cells) bytes."""
+        # pylint: disable=protected-access
+        clone.cells = bytearray(self.cells)
+        clone._board_owners = None
+
+    def _clear_point(self, x_coordinate: int, y_coordinate: int) -> None:
+        """Empty the byte of a point."""
+        self.cells[x_coordinate * self.cols + y_coordinate] = 0
+
+    def _set_point(
+        self, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> None:
+        """Write the byte of a point."""
+        self.cells[x_coordinate * self.cols + y_coordinate] = player_index
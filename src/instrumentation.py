@@ -0,0 +1,295 @@
+"""Module implementing optional timing and counting hooks for Tic Tac Toe games.
+
+Nothing here runs unless it is switched on: `instrument()` wraps the methods of
+`TicTacToe` and its subclasses with timers, and `uninstrument()` puts the
+original methods back, so games pay nothing while instrumentation is off.
+
+    >>> with profile() as metrics:
+    ...     play_some_games()
+    >>> print(metrics.to_prometheus())
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.board import TicTacToe
+
+# Methods timed by `instrument`, the times of callers include their callees.
+PHASES = (
+    "play_one_step",
+    "place",
+    "is_move_valid",
+    "check_valid_move",
+    "_place_point",
+    "get_winner",
+    "__str__",
+)
+
+SECONDS_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 1e-3, 1e-2, 1e-1)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1024)
+
+_originals: Dict[Tuple[type, str], Callable] = {}
+
+
+class Histogram:
+    """Observations counted in buckets of upper bounds, Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        """Init for Histogram Class."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def as_dict(self) -> Dict:
+        """The count, sum, mean and cumulative count per upper bound."""
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            cumulative[bound] = running
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": cumulative,
+        }
+
+
+class Metrics:
+    """Call counts and timings per method, and the cost of each win check.
+
+    `find_path_depth` is the deepest `_find_path` recursion of every win check
+    of the recursive engine, and `win_check_cells` the number of board cells read
+    by every win check.
+    """
+
+    def __init__(self):
+        """Init for Metrics Class."""
+        self.timings: Dict[str, Histogram] = {}
+        self.find_path_depth = Histogram(COUNT_BUCKETS)
+        self.win_check_cells = Histogram(COUNT_BUCKETS)
+        self._depth = 0
+        self._max_depth = 0
+        # The (method, game) calls being timed, an override calling `super()`
+        # runs the wrapper of the parent class inside its own.
+        self._active = set()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Count a call of a method and its duration."""
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = Histogram(SECONDS_BUCKETS)
+        histogram.observe(seconds)
+
+    def calls(self, name: str) -> int:
+        """Number of recorded calls of a method."""
+        histogram = self.timings.get(name)
+        return histogram.count if histogram else 0
+
+    def as_dict(self) -> Dict:
+        """All the metrics as plain dictionaries."""
+        return {
+            "calls": {
+                name: histogram.count for name, histogram in self.timings.items()
+            },
+            "seconds": {
+                name: histogram.as_dict() for name, histogram in self.timings.items()
+            },
+            "find_path_depth": self.find_path_depth.as_dict(),
+            "win_check_cells": self.win_check_cells.as_dict(),
+        }
+
+    def to_prometheus(self, prefix="tictactoe") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_calls_total Calls per method.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for name, histogram in sorted(self.timings.items()):
+            lines.append(f'{prefix}_calls_total{{method="{name}"}} {histogram.count}')
+        lines += [
+            f"# HELP {prefix}_method_seconds Time spent per call, callees included.",
+            f"# TYPE {prefix}_method_seconds histogram",
+        ]
+        for name, histogram in sorted(self.timings.items()):
+            lines += _histogram_lines(
+                f"{prefix}_method_seconds", histogram, f'method="{name}",'
+            )
+        for name, histogram, help_text in (
+            ("find_path_depth", self.find_path_depth, "Deepest _find_path call."),
+            ("win_check_cells", self.win_check_cells, "Cells read per win check."),
+        ):
+            lines += [
+                f"# HELP {prefix}_{name} {help_text}",
+                f"# TYPE {prefix}_{name} histogram",
+            ]
+            lines += _histogram_lines(f"{prefix}_{name}", histogram, "")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: str, histogram: Histogram, labels: str) -> list:
+    """Bucket, sum and count lines of one Prometheus histogram."""
+    lines = []
+    for bound, count in histogram.as_dict()["buckets"].items():
+        bound = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{metric}_bucket{{{labels}le="{bound}"}} {count}')
+    labels = f"{{{labels.rstrip(',')}}}" if labels else ""
+    lines.append(f"{metric}_sum{labels} {histogram.total!r}")
+    lines.append(f"{metric}_count{labels} {histogram.count}")
+    return lines
+
+
+class _CountingBoard(np.ndarray):
+    """A view of a board that counts the cells read through it and its views."""
+
+    def __array_finalize__(self, obj):
+        """Share the read counter with the array this one is a view of."""
+        # pylint: disable=attribute-defined-outside-init
+        self.reads = getattr(obj, "reads", None) or [0]
+
+    def __getitem__(self, key):
+        """Count one read."""
+        self.reads[0] += 1
+        return super().__getitem__(key)
+
+
+def _timed(name: str, method: Callable, metrics: Metrics) -> Callable:
+    """Wrap a method to record its calls and durations, once per call of a game."""
+    # pylint: disable=protected-access
+
+    @wraps(method)
+    def wrapper(game, *args, **kwargs):
+        call = (name, id(game))
+        if call in metrics._active:
+            return method(game, *args, **kwargs)
+        metrics._active.add(call)
+        start = time.perf_counter()
+        try:
+            return method(game, *args, **kwargs)
+        finally:
+            metrics.record(name, time.perf_counter() - start)
+            metrics._active.discard(call)
+
+    return wrapper
+
+
+def _win_check(method: Callable, metrics: Metrics) -> Callable:
+    """Wrap `get_winner` to time it and measure the cells and depth it takes."""
+    # pylint: disable=protected-access
+
+    @wraps(method)
+    def wrapper(game, *args, **kwargs):
+        call = ("get_winner", id(game))
+        if call in metrics._active:
+            return method(game, *args, **kwargs)
+        metrics._active.add(call)
+        metrics._max_depth = 0
+        board = None
+        if not isinstance(getattr(type(game), "board", None), property):
+            board = game.board
+            game.board = board.view(_CountingBoard)
+        start = time.perf_counter()
+        try:
+            return method(game, *args, **kwargs)
+        finally:
+            metrics.record("get_winner", time.perf_counter() - start)
+            if board is not None:
+                metrics.win_check_cells.observe(game.board.reads[0])
+                game.board = board
+            if metrics._max_depth:
+                metrics.find_path_depth.observe(metrics._max_depth)
+            metrics._active.discard(call)
+
+    return wrapper
+
+
+def _find_path(method: Callable, metrics: Metrics) -> Callable:
+    """Wrap `_find_path` to track how deep its recursion goes."""
+    # pylint: disable=protected-access
+
+    @wraps(method)
+    def wrapper(game, *args, **kwargs):
+        metrics._depth += 1
+        metrics._max_depth = max(metrics._max_depth, metrics._depth)
+        try:
+            return method(game, *args, **kwargs)
+        finally:
+            metrics._depth -= 1
+
+    return wrapper
+
+
+def _game_classes() -> Iterator[type]:
+    """`TicTacToe` and all its subclasses."""
+    pending = [TicTacToe]
+    while pending:
+        cls = pending.pop()
+        yield cls
+        pending.extend(cls.__subclasses__())
+
+
+def instrument(
+    metrics: Optional[Metrics] = None, classes: Optional[Iterable[type]] = None
+) -> Metrics:
+    """Start recording the metrics of every game.
+
+    Args:
+        metrics (Metrics): Where to record, a new one if None.
+        classes: The game classes to instrument, `TicTacToe` and all its
+            subclasses by default.
+
+    Raises:
+        Exception: If instrumentation is already on.
+
+    Returns:
+        Metrics: The metrics being recorded.
+    """
+    if _originals:
+        raise Exception("Games are already instrumented.")
+    metrics = Metrics() if metrics is None else metrics
+    for cls in _game_classes() if classes is None else classes:
+        for name in PHASES + ("_find_path",):
+            method = cls.__dict__.get(name)
+            if method is None:
+                continue
+            _originals[(cls, name)] = method
+            if name == "get_winner":
+                wrapper = _win_check(method, metrics)
+            elif name == "_find_path":
+                wrapper = _find_path(method, metrics)
+            else:
+                wrapper = _timed(name, method, metrics)
+            setattr(cls, name, wrapper)
+    return metrics
+
+
+def uninstrument() -> None:
+    """Put the original methods back."""
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
+
+
+@contextmanager
+def profile(classes: Optional[Iterable[type]] = None) -> Iterator[Metrics]:
+    """Record the metrics of the games played in a block.
+
+    Yields:
+        Metrics: The metrics of the block, complete once it exits.
+    """
+    metrics = instrument(classes=classes)
+    try:
+        yield metrics
+    finally:
+        uninstrument()
@@ -0,0 +1,282 @@
+"""Module implementing a Monte Carlo Tree Search player for Tic Tac Toe."""
+import math
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from src.board import DRAW, ONGOING
+from src.position import Position
+
+MCTSResult = namedtuple(
+    "MCTSResult", ["move", "visits", "playouts", "playouts_per_second"]
+)
+
+
+class MCTS:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """UCT search with random playouts on a flat `Position`.
+
+    The tree lives in flat lists preallocated to `capacity` nodes. The children of
+    a node are allocated in one block when it is expanded, so a node only needs
+    the index of its first child and the number of children. Once the lists are
+    full, leaves are no longer expanded and the search carries on with playouts.
+    """
+
+    def __init__(self, capacity=200_000, exploration=1.4, seed=None):
+        """Init for MCTS Class."""
+        self.capacity = capacity
+        self.exploration = exploration
+        self._rng = random.Random(seed)
+        self.visits = [0] * capacity
+        self.wins = [0.0] * capacity
+        self.first_child = [0] * capacity
+        self.child_count = [0] * capacity
+        self.moves = [0] * capacity
+        self.movers = [0] * capacity
+        self.size = 0
+
+    def _new_tree(self, position: Position) -> None:
+        """Clear the tree down to the root, the player to move in `position`."""
+        self.size = 1
+        self.visits[0] = 0
+        self.wins[0] = 0.0
+        self.child_count[0] = 0
+        self.movers[0] = 0
+        for player_index in position.player_indexes:
+            if position.next_player(player_index) == position.to_move:
+                self.movers[0] = player_index
+
+    def _expand(self, node: int, position: Position) -> bool:
+        """Allocate a child for every legal move of `node`, if there is room."""
+        moves = position.legal_moves()
+        if self.size + len(moves) > self.capacity:
+            return False
+        self.first_child[node] = self.size
+        self.child_count[node] = len(moves)
+        for cell in moves:
+            child = self.size
+            self.visits[child] = 0
+            self.wins[child] = 0.0
+            self.child_count[child] = 0
+            self.moves[child] = cell
+            self.movers[child] = position.to_move
+            self.size += 1
+        return True
+
+    def _select(self, node: int) -> int:
+        """Return the child of `node` with the highest UCT score."""
+        first = self.first_child[node]
+        log_visits = math.log(self.visits[node] or 1)
+        best_child = first
+        best_score = -1.0
+        for child in range(first, first + self.child_count[node]):
+            visits = self.visits[child]
+            if not visits:
+                return child
+            score = self.wins[child] / visits + self.exploration * math.sqrt(
+                log_visits / visits
+            )
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
+
+    def _playout(self, position: Position) -> int:
+        """Play random moves to the end and take them back.
+
+        Returns:
+            int: The winning player index, 0 for a draw.
+        """
+        moves = position.legal_moves()
+        self._rng.shuffle(moves)
+        played = 0
+        winner = 0
+        for cell in moves:
+            played += 1
+            if position.make(cell):
+                winner = position.winner
+                break
+        for _ in range(played):
+            position.unmake()
+        return winner
+
+    def _iterate(self, position: Position) -> None:
+        """Run one selection, expansion, playout and backpropagation."""
+        path = [0]
+        node = 0
+        winner = None
+        while True:
+            if not self.child_count[node]:
+                if self.visits[node] and self._expand(node, position):
+                    continue
+                break
+            node = self._select(node)
+            path.append(node)
+            if position.make(self.moves[node]):
+                winner = position.winner
+                break
+            if position.is_full():
+                winner = 0
+                break
+
+        if winner is None:
+            winner = self._playout(position)
+
+        for node in path:
+            self.visits[node] += 1
+            if winner == self.movers[node]:
+                self.wins[node] += 1.0
+            elif not winner:
+                self.wins[node] += 0.5
+        for _ in range(len(path) - 1):
+            position.unmake()
+
+    def search(
+        self,
+        position: Position,
+        playouts: Optional[int] = None,
+        time_limit: Optional[float] = None,
+    ) -> Tuple[Dict[int, int], int, float]:
+        """Search `position` for a number of playouts and/or a number of seconds.
+
+        Args:
+            position (Position): The position to search, restored afterwards.
+            playouts (int): Number of playouts to run.
+            time_limit (float): Seconds to search for.
+
+        Raises:
+            Exception: If the game is already won or no legal moves are left.
+
+        Returns:
+            tuple: The visits of every root move by cell, the number of playouts run
+                and the seconds taken.
+        """
+        if playouts is None and time_limit is None:
+            raise Exception("Give a number of playouts or a time limit.")
+        if position.winner:
+            raise Exception("The game is already won.")
+        if not position.legal_moves():
+            raise Exception("No legal moves left.")
+
+        self._new_tree(position)
+        if not self._expand(0, position):
+            raise Exception("Capacity is too small for the root moves.")
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        done = 0
+        while playouts is None or done < playouts:
+            self._iterate(position)
+            done += 1
+            if deadline is not None and done & 63 == 0:
+                if time.perf_counter() > deadline:
+                    break
+
+        first = self.first_child[0]
+        visits = {
+            self.moves[child]: self.visits[child]
+            for child in range(first, first + self.child_count[0])
+        }
+        return visits, done, time.perf_counter() - start
+
+
+def _state(game) -> Tuple:
+    """The picklable state of a game that a worker needs to rebuild its position."""
+    return (
+        game.board_size,
+        game.win_length,
+        tuple(game.player_indexes),
+        tuple(int(value) for value in game.board.ravel().tolist()),
+        game.last_played_by,
+        game.allow_overline,
+    )
+
+
+def _position_from_state(state: Tuple) -> Position:
+    """Build a position from the output of `_state`."""
+    board_size, win_length, player_indexes, cells, last_played_by, overline = state
+    position = Position(board_size, win_length, player_indexes, overline)
+    for cell, player_index in enumerate(cells):
+        if player_index:
+            position.put(cell, player_index)
+    position.refresh_winner()
+    if last_played_by in position.player_indexes:
+        position.to_move = position.next_player(last_played_by)
+    return position
+
+
+def _search_worker(
+    state: Tuple, playouts: Optional[int], time_limit: Optional[float], seed: int
+) -> Tuple[Dict[int, int], int, float]:
+    """Run one independent search of the root parallel search."""
+    return MCTS(seed=seed).search(_position_from_state(state), playouts, time_limit)
+
+
+def best_move(
+    game,
+    playouts: Optional[int] = 10_000,
+    time_limit: Optional[float] = None,
+    workers: int = 1,
+    seed: Optional[int] = None,
+) -> MCTSResult:
+    """Find a move for the player to move in `game` with Monte Carlo Tree Search.
+
+    With more than one worker every process searches its own tree from the root
+    (with `playouts` each) and the visit counts of the root moves are added up.
+
+    Args:
+        game (TicTacToe): The game to search, it is not modified.
+        playouts (int): Number of playouts per worker.
+        time_limit (float): Seconds to search for.
+        workers (int): Number of processes to search in.
+        seed (int): Seed for reproducible searches.
+
+    Raises:
+        Exception: If the game is already won or no legal moves are left.
+
+    Returns:
+        MCTSResult: The (x, y) of the most visited move, the merged visit counts
+            by (x, y), the total number of playouts and playouts per second.
+    """
+    # pylint: disable=too-many-locals
+    status = game.status()
+    if status == DRAW:
+        raise Exception("No legal moves left.")
+    if status != ONGOING:
+        raise Exception("The game is already won.")
+    state = _state(game)
+    seeds = random.Random(seed).sample(range(1 << 30), workers)
+    if workers == 1:
+        results = [_search_worker(state, playouts, time_limit, seeds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _search_worker,
+                    [state] * workers,
+                    [playouts] * workers,
+                    [time_limit] * workers,
+                    seeds,
+                )
+            )
+
+    merged: Dict[Tuple[int, int], int] = {}
+    for visits, _, _ in results:
+        for cell, count in visits.items():
+            move = divmod(cell, game.cols)
+            merged[move] = merged.get(move, 0) + count
+    total = sum(done for _, done, _ in results)
+    seconds = max(elapsed for _, _, elapsed in results)
+    return MCTSResult(
+        move=max(merged, key=merged.get),
+        visits=merged,
+        playouts=total,
+        playouts_per_second=total / seconds if seconds else float("inf"),
+    )
+
+
+def playouts_per_second(game, seconds: float = 1.0, workers: int = 1) -> float:
+    """Measure playout throughput on `game`, to size hardware for a time budget."""
+    return best_move(
+        game, playouts=None, time_limit=seconds, workers=workers
+    ).playouts_per_second
@@ -0,0 +1,83 @@
+"""Module implementing a pool of Tic Tac Toe games sharing one board buffer."""
+import numpy as np
+
+from src.board import TicTacToe
+from src.position import board_shape
+
+
+class BoardPool:
+    """Preallocated boards for many games in one contiguous NumPy buffer.
+
+    Every game handed out by `acquire` stores its board as a view into the buffer,
+    so a pool of a hundred thousand games is one allocation of
+    capacity * rows * cols cells instead of one array per game.
+    Released slots are reused by the next `acquire`.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        board_size=3,
+        win_length=3,
+        win_engine="recursive",
+        dtype=np.int8,
+    ):
+        """Init for Board Pool Class."""
+        # pylint: disable=too-many-arguments
+        self.board_size = board_size
+        self.win_length = win_length
+        self.win_engine = win_engine
+        self.boards = np.zeros([capacity, *board_shape(board_size)], dtype=dtype)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._live = bytearray(capacity)
+
+    @property
+    def capacity(self) -> int:
+        """Number of games the pool can hold."""
+        return len(self.boards)
+
+    def __len__(self) -> int:
+        """Number of games currently acquired."""
+        return self.capacity - len(self._free)
+
+    def acquire(self) -> TicTacToe:
+        """Return a new game whose board lives in a free slot of the pool.
+
+        Raises:
+            Exception: If every slot is in use.
+        """
+        if not self._free:
+            raise Exception(f"Pool is full, all {self.capacity} slots are in use.")
+        slot = self._free.pop()
+        self._live[slot] = 1
+        return TicTacToe(
+            self.board_size,
+            self.win_length,
+            win_engine=self.win_engine,
+            board=self.boards[slot],
+        )
+
+    def slot_of(self, game: TicTacToe) -> int:
+        """Return the slot of the pool holding the board of `game`.
+
+        Raises:
+            Exception: If the board of the game is not in this pool.
+        """
+        board = game.board
+        if board.base is not self.boards:
+            raise Exception("Game does not belong to this pool.")
+        offset = board.ctypes.data - self.boards.ctypes.data
+        return offset // self.boards[0].nbytes
+
+    def release(self, game: TicTacToe) -> None:
+        """Give the slot of a game back to the pool, the game must not be used after.
+
+        Raises:
+            Exception: If the game is not from this pool or already released.
+        """
+        slot = self.slot_of(game)
+        if not self._live[slot]:
+            raise Exception(f"Slot {slot} is already released.")
+        self._live[slot] = 0
+        self.boards[slot].fill(0)
+        self._free.append(slot)
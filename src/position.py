@@ -0,0 +1,274 @@
+"""Module implementing a flat, mutable game state for searching Tic Tac Toe."""
+import random
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def board_shape(board_size: Union[int, Tuple[int, int]]) -> Tuple[int, int]:
+    """Return the (rows, cols) of an n x n board_size n or a (rows, cols) pair."""
+    try:
+        rows, cols = board_size
+    except TypeError:
+        return board_size, board_size
+    return rows, cols
+
+
+@lru_cache(maxsize=None)
+def win_lines(board_size: int, win_length: int) -> Tuple[Tuple, Tuple]:
+    """Precompute every winning line of the board and the lines through each cell.
+
+    Cell (x, y) has the flat index x * cols + y. A line is a run of win_length
+    cells in one of the four directions.
+
+    Args:
+        board_size (int): size of n x n board, or a (rows, cols) tuple.
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: The cells of every line, and for each cell the ids of its lines.
+    """
+    rows, cols = board_shape(board_size)
+    lines = []
+    lines_through = [[] for _ in range(rows * cols)]
+    for x_step, y_step in DIRECTIONS:
+        for x_start in range(rows):
+            for y_start in range(cols):
+                x_end = x_start + x_step * (win_length - 1)
+                y_end = y_start + y_step * (win_length - 1)
+                if not (0 <= x_end < rows and 0 <= y_end < cols):
+                    continue
+                cells = tuple(
+                    (x_start + x_step * i) * cols + y_start + y_step * i
+                    for i in range(win_length)
+                )
+                for cell in cells:
+                    lines_through[cell].append(len(lines))
+                lines.append(cells)
+    return tuple(lines), tuple(tuple(line_ids) for line_ids in lines_through)
+
+
+@lru_cache(maxsize=None)
+def line_ends(board_size: int, win_length: int) -> Tuple[Tuple[int, int], ...]:
+    """The cells just before and just after every line of `win_lines`.
+
+    A line with a point of its player on either end is part of a longer run.
+
+    Args:
+        board_size (int): size of n x n board, or a (rows, cols) tuple.
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: For each line, the flat index of the cell before and after it, -1
+            when it is off the board.
+    """
+    rows, cols = board_shape(board_size)
+    ends = []
+    for x_step, y_step in DIRECTIONS:
+        for x_start in range(rows):
+            for y_start in range(cols):
+                x_end = x_start + x_step * (win_length - 1)
+                y_end = y_start + y_step * (win_length - 1)
+                if not (0 <= x_end < rows and 0 <= y_end < cols):
+                    continue
+                outside = []
+                for x_coord, y_coord in (
+                    (x_start - x_step, y_start - y_step),
+                    (x_end + x_step, y_end + y_step),
+                ):
+                    inside = 0 <= x_coord < rows and 0 <= y_coord < cols
+                    outside.append(x_coord * cols + y_coord if inside else -1)
+                ends.append(tuple(outside))
+    return tuple(ends)
+
+
+@lru_cache(maxsize=None)
+def symmetries(board_size: int) -> Tuple[Tuple[int, ...], ...]:
+    """The rotations and reflections of the board as cell permutations.
+
+    A square board has 8 of them. A rectangular board only has the identity, the
+    half turn and the two mirror images, which keep its shape.
+
+    Args:
+        board_size (int): size of n x n board, or a (rows, cols) tuple.
+
+    Returns:
+        tuple: For each symmetry, the cell that every cell is mapped to. The
+            identity comes first.
+    """
+    rows, cols = board_shape(board_size)
+    last_row, last_col = rows - 1, cols - 1
+    if rows == cols:
+        maps = (
+            lambda x, y: (x, y),
+            lambda x, y: (y, last_col - x),
+            lambda x, y: (last_row - x, last_col - y),
+            lambda x, y: (last_row - y, x),
+            lambda x, y: (x, last_col - y),
+            lambda x, y: (last_row - x, y),
+            lambda x, y: (y, x),
+            lambda x, y: (last_row - y, last_col - x),
+        )
+    else:
+        maps = (
+            lambda x, y: (x, y),
+            lambda x, y: (last_row - x, last_col - y),
+            lambda x, y: (x, last_col - y),
+            lambda x, y: (last_row - x, y),
+        )
+    return tuple(
+        tuple(
+            image[0] * cols + image[1]
+            for image in (symmetry(x, y) for x in range(rows) for y in range(cols))
+        )
+        for symmetry in maps
+    )
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(board_size: int, num_players: int, seed=0) -> Tuple[Tuple[int, ...]]:
+    """Random 64 bit keys, one per player slot and cell, shared by every position."""
+    rows, cols = board_shape(board_size)
+    rng = random.Random(f"{seed}:{board_size}:{num_players}")
+    return tuple(
+        tuple(rng.getrandbits(64) for _ in range(rows * cols))
+        for _ in range(num_players)
+    )
+
+
+class Position:  # pylint: disable=too-many-instance-attributes
+    """A game state held in a flat list, with in-place make and unmake of moves.
+
+    Every line of win_length cells keeps a count of points per player, so a move
+    only updates the lines through its cell and a win is a count reaching
+    win_length. With `allow_overline=False` the cells on both ends of the line
+    must not be the player's too. A Zobrist hash of the points is kept up to date
+    as well.
+    """
+
+    def __init__(
+        self, board_size=3, win_length=3, player_indexes=(1, 2), allow_overline=True
+    ):
+        """Init for Position Class."""
+        self.board_size = board_size
+        self.win_length = win_length
+        self.allow_overline = allow_overline
+        self._ends = None if allow_overline else line_ends(board_size, win_length)
+        self.player_indexes = tuple(player_indexes)
+        self.lines, self.lines_through = win_lines(board_size, win_length)
+        self._keys = zobrist_keys(board_size, len(self.player_indexes))
+        self._slots = {
+            player_index: slot for slot, player_index in enumerate(self.player_indexes)
+        }
+        rows, cols = board_shape(board_size)
+        self.cells = [0] * (rows * cols)
+        self.line_counts = [[0] * len(self.lines) for _ in self.player_indexes]
+        self.to_move = self.player_indexes[0]
+        self.moves: List[int] = []
+        self.winner = 0
+        self.key = 0
+        self.filled = 0
+
+    @classmethod
+    def from_game(cls, game) -> "Position":
+        """Copy the state of a `TicTacToe` game into a new position.
+
+        Args:
+            game (TicTacToe): The game to copy, with the next move still to play.
+
+        Returns:
+            Position: The position with the side to move after `last_played_by`.
+        """
+        position = cls(
+            game.board_size, game.win_length, game.player_indexes, game.allow_overline
+        )
+        board = game.board.ravel().tolist()
+        for cell, player_index in enumerate(board):
+            if player_index:
+                position.put(cell, int(player_index))
+        position.refresh_winner()
+        if game.last_played_by in position.player_indexes:
+            position.to_move = position.next_player(game.last_played_by)
+        return position
+
+    def next_player(self, player_index: int) -> int:
+        """Return the player who plays after `player_index`."""
+        slot = self._slots[player_index] + 1
+        return self.player_indexes[slot % len(self.player_indexes)]
+
+    def put(self, cell: int, player_index: int) -> bool:
+        """Place a point without touching the turn order or the move stack.
+
+        Returns:
+            bool: True if the point completes a line for the player.
+        """
+        slot = self._slots[player_index]
+        self.cells[cell] = player_index
+        self.key ^= self._keys[slot][cell]
+        self.filled += 1
+        counts = self.line_counts[slot]
+        won = False
+        for line_id in self.lines_through[cell]:
+            counts[line_id] += 1
+            if counts[line_id] == self.win_length:
+                won = won or self._ends is None or self._is_exact(line_id, player_index)
+        if won:
+            self.winner = player_index
+        return won
+
+    def _is_exact(self, line_id: int, player_index: int) -> bool:
+        """Whether a full line is not extended by a point of the player on its ends."""
+        return all(
+            end < 0 or self.cells[end] != player_index for end in self._ends[line_id]
+        )
+
+    def refresh_winner(self) -> None:
+        """Find the winner again once points are loaded with `put` in any order.
+
+        Without overlines a line that was full when put may have been extended by
+        a later point, so the lines are checked again.
+        """
+        if self._ends is None:
+            return
+        self.winner = 0
+        for player_index, counts in zip(self.player_indexes, self.line_counts):
+            for line_id, count in enumerate(counts):
+                if count == self.win_length and self._is_exact(line_id, player_index):
+                    self.winner = player_index
+
+    def make(self, cell: int) -> bool:
+        """Play the side to move at `cell`, in place.
+
+        Returns:
+            bool: True if the move wins the game.
+        """
+        player_index = self.to_move
+        self.moves.append(cell)
+        self.to_move = self.next_player(player_index)
+        return self.put(cell, player_index)
+
+    def unmake(self) -> None:
+        """Take back the last move made with `make`.
+
+        Moves are only made while the game is in progress, so the winner is cleared.
+        """
+        cell = self.moves.pop()
+        player_index = self.cells[cell]
+        slot = self._slots[player_index]
+        self.cells[cell] = 0
+        self.key ^= self._keys[slot][cell]
+        self.filled -= 1
+        counts = self.line_counts[slot]
+        for line_id in self.lines_through[cell]:
+            counts[line_id] -= 1
+        self.winner = 0
+        self.to_move = player_index
+
+    def legal_moves(self) -> List[int]:
+        """Return the flat index of every empty cell."""
+        return [cell for cell, value in enumerate(self.cells) if not value]
+
+    def is_full(self) -> bool:
+        """Return True if no empty cell is left."""
+        return self.filled == len(self.cells)
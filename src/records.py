@@ -0,0 +1,237 @@
+"""Module implementing a compact binary format for recorded Tic Tac Toe games.
+
+A file starts with the magic bytes `TTTR` and a version byte, followed by the
+records one after the other. Every record has a header of unsigned varints:
+board_size, win_length, the number of players, the player indexes, the first
+player and the number of moves. The moves follow as packed little endian cell
+indexes (x * board_size + y), one byte each on boards of up to 256 cells and
+two bytes each above that, so the moves of a record are copied out in one
+piece without decoding them one by one.
+"""
+import array
+import mmap
+import sys
+import weakref
+from collections import namedtuple
+from typing import BinaryIO, Iterator, List, Sequence, Tuple, Union
+
+from src.board import TicTacToe
+
+MAGIC = b"TTTR"
+VERSION = 1
+
+GameRecord = namedtuple(
+    "GameRecord",
+    ["board_size", "win_length", "player_indexes", "first_player", "moves"],
+)
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a non negative integer as an unsigned LEB128 varint."""
+    if value < 0:
+        raise Exception("Varints must not be negative.")
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(buffer, offset: int) -> Tuple[int, int]:
+    """Decode the varint at `offset`, return its value and the next offset."""
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def move_width(board_size: int) -> int:
+    """Bytes per packed move for a board of this size."""
+    return 1 if board_size * board_size <= 256 else 2
+
+
+class RecordWriter:  # pylint: disable=too-few-public-methods
+    """Streams game records to a binary file object."""
+
+    def __init__(self, stream: BinaryIO):
+        """Init for Record Writer Class, writes the file header."""
+        self.stream = stream
+        self.stream.write(MAGIC + bytes([VERSION]))
+
+    def write(self, record: GameRecord) -> None:
+        """Append one game record to the stream."""
+        header = [
+            record.board_size,
+            record.win_length,
+            len(record.player_indexes),
+            *record.player_indexes,
+            record.first_player,
+            len(record.moves),
+        ]
+        width = move_width(record.board_size)
+        self.stream.write(b"".join(encode_varint(value) for value in header))
+        self.stream.write(
+            b"".join(cell.to_bytes(width, "little") for cell in record.moves)
+        )
+
+
+class MoveRecorder:
+    """Observer that records the moves of a game, see `TicTacToe.add_observer`."""
+
+    def __init__(self):
+        """Init for Move Recorder Class."""
+        self.first_player = None
+        self.moves: List[int] = []
+
+    def __call__(self, game, player_index, x_coordinate, y_coordinate, won_player):
+        """Record one move."""
+        # pylint: disable=unused-argument
+        if self.first_player is None:
+            self.first_player = player_index
+        self.moves.append(x_coordinate * game.cols + y_coordinate)
+
+    def record(self, game: TicTacToe) -> GameRecord:
+        """Return the record of the moves seen so far in `game`.
+
+        Raises:
+            Exception: If the board is not square, the header has one board size.
+        """
+        if game.rows != game.cols:
+            raise Exception("Only square boards can be recorded.")
+        return GameRecord(
+            game.board_size,
+            game.win_length,
+            tuple(game.player_indexes),
+            self.first_player or game.player_indexes[0],
+            list(self.moves),
+        )
+
+
+def iter_records(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Iterator:
+    """Lazily decode the records of a file held in a bytes-like buffer.
+
+    The moves of each record are copied out of the buffer in one piece, as bytes
+    or an array of two byte moves, so no per-move Python objects are created
+    until they are read, and the records can be kept after the buffer is closed.
+
+    Args:
+        buffer: The file contents, e.g. a memory mapped file.
+
+    Yields:
+        GameRecord: The records in file order.
+    """
+    with memoryview(buffer) as view:
+        yield from _decode_records(view)
+
+
+def _decode_records(view: memoryview) -> Iterator:
+    """Decode the records of `iter_records`, the view is released by the caller."""
+    if bytes(view[: len(MAGIC)]) != MAGIC or view[len(MAGIC)] != VERSION:
+        raise Exception("Not a game record file.")
+    offset = len(MAGIC) + 1
+    while offset < len(view):
+        board_size, offset = decode_varint(view, offset)
+        win_length, offset = decode_varint(view, offset)
+        num_players, offset = decode_varint(view, offset)
+        player_indexes = []
+        for _ in range(num_players):
+            player_index, offset = decode_varint(view, offset)
+            player_indexes.append(player_index)
+        first_player, offset = decode_varint(view, offset)
+        num_moves, offset = decode_varint(view, offset)
+        width = move_width(board_size)
+        moves = bytes(view[offset : offset + num_moves * width])
+        if width == 2:
+            moves = array.array("H", moves)
+            if sys.byteorder != "little":
+                moves.byteswap()
+        offset += num_moves * width
+        yield GameRecord(
+            board_size, win_length, tuple(player_indexes), first_player, moves
+        )
+
+
+def replay(record: GameRecord, game: TicTacToe = None) -> Tuple[TicTacToe, int]:
+    """Play the moves of a record into a game, without rendering.
+
+    Args:
+        record (GameRecord): The record to replay.
+        game (TicTacToe): Game to replay into, reset first. A new game if None.
+
+    Returns:
+        tuple: The game in its final position and the winner, 0 if there is none.
+    """
+    if game is None:
+        game = TicTacToe(
+            record.board_size,
+            record.win_length,
+            num_players=len(record.player_indexes),
+        )
+    else:
+        game.reset_board()
+    players: Sequence[int] = record.player_indexes
+    if list(players) != list(game.player_indexes):
+        raise Exception(
+            f"Record players {list(players)} do not match {game.player_indexes}."
+        )
+    turn = players.index(record.first_player)
+    winner = 0
+    for cell in record.moves:
+        x_coordinate, y_coordinate = divmod(cell, record.board_size)
+        winner = game.place(players[turn], x_coordinate, y_coordinate)
+        if winner:
+            break
+        turn = (turn + 1) % len(players)
+    return game, winner
+
+
+class RecordFile:
+    """A game record file opened with `mmap`, to scan at disk speed."""
+
+    def __init__(self, path: str):
+        """Init for Record File Class, maps the file read only."""
+        with open(path, "rb") as record_file:
+            self._mapped = mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._readers = weakref.WeakSet()
+
+    def __iter__(self) -> Iterator:
+        """Lazily decode the records of the file."""
+        reader = iter_records(self._mapped)
+        self._readers.add(reader)
+        return reader
+
+    def final_positions(self) -> Iterator[Tuple[TicTacToe, int]]:
+        """Replay every record into one reused game, yielding it and the winner."""
+        game = None
+        for record in self:
+            if game is None or (
+                game.board_size,
+                game.win_length,
+                len(game.player_indexes),
+            ) != (record.board_size, record.win_length, len(record.player_indexes)):
+                game = TicTacToe(
+                    record.board_size,
+                    record.win_length,
+                    num_players=len(record.player_indexes),
+                )
+            yield replay(record, game)
+
+    def close(self) -> None:
+        """Unmap the file, ending the iterations left unfinished."""
+        for reader in list(self._readers):
+            reader.close()
+        self._mapped.close()
+
+    def __enter__(self):
+        """Use the file as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the file when leaving the context."""
+        self.close()
@@ -0,0 +1,146 @@
+"""Module implementing a full board winner scan of boards loaded or received as is.
+
+`TicTacToe.get_winner` only reads the lines through the last move. A board read
+from storage or sent by a client has no last move, so here every row, column and
+diagonal of whole stacks of boards is read at once. The windows of win_length
+cells of a board shape are precomputed, with one more cell on each side for the
+exact length rule, all windows of all boards are gathered in one indexing
+operation and every window holding win_length points of one player is a winning
+run.
+
+A run is a row of the (runs, 6) array returned by `winning_runs`: the board
+index, the player index, the x and y of its first cell and its x and y step.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from src.position import DIRECTIONS
+
+# Status of a board on which more than one player has a winning run.
+SEVERAL_WINNERS = -2
+
+WinningLine = namedtuple("WinningLine", ["player", "cells"])
+
+
+def _stack(boards) -> np.ndarray:
+    """A (boards, rows, cols) stack of one board or of many."""
+    boards = np.asarray(boards)
+    if boards.ndim == 2:
+        boards = boards[None]
+    if boards.ndim != 3:
+        raise Exception("Boards must be a board or a stack of boards.")
+    return boards
+
+
+@lru_cache(maxsize=None)
+def run_table(rows: int, cols: int, win_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Precompute every window of win_length cells of a board.
+
+    Args:
+        rows (int): Number of rows of the board.
+        cols (int): Number of columns of the board.
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: The flat cells of every window with the cell before and the cell
+            after it, rows * cols when off the board, as a (windows,
+            win_length + 2) array, and the (x, y, x step, y step) of every window.
+    """
+    cells, heads = [], []
+    for x_step, y_step in DIRECTIONS:
+        for x_start in range(rows):
+            for y_start in range(cols):
+                line = [
+                    (x_start + step * x_step, y_start + step * y_step)
+                    for step in range(-1, win_length + 1)
+                ]
+                if not all(
+                    0 <= x_coord < rows and 0 <= y_coord < cols
+                    for x_coord, y_coord in line[1:-1]
+                ):
+                    continue
+                cells.append(
+                    [
+                        (
+                            x_coord * cols + y_coord
+                            if 0 <= x_coord < rows and 0 <= y_coord < cols
+                            else rows * cols
+                        )
+                        for x_coord, y_coord in line
+                    ]
+                )
+                heads.append((x_start, y_start, x_step, y_step))
+    return (
+        np.array(cells, dtype=np.int64).reshape(-1, win_length + 2),
+        np.array(heads, dtype=np.int64).reshape(-1, 4),
+    )
+
+
+def winning_runs(boards, win_length: int, allow_overline=True) -> np.ndarray:
+    """Find every run of win_length points of one player on a stack of boards.
+
+    Args:
+        boards (array like): A (rows, cols) board or a (boards, rows, cols) stack,
+            0 for an empty cell and the player index otherwise.
+        win_length (int): number of consecutive points needed to win.
+        allow_overline (bool): If False, runs longer than win_length do not count.
+
+    Raises:
+        Exception: If the boards are not 2-D or 3-D.
+
+    Returns:
+        np.ndarray: A (board, player, x, y, x step, y step) row per run, by board.
+            With overlines a run of n > win_length points is n - win_length + 1
+            overlapping runs.
+    """
+    boards = _stack(boards)
+    count, rows, cols = boards.shape
+    cells, heads = run_table(rows, cols, win_length)
+    flat = np.zeros([count, rows * cols + 1], dtype=boards.dtype)
+    flat[:, :-1] = boards.reshape(count, -1)
+    windows = flat[:, cells]
+    first = windows[..., 1]
+    run = (first != 0) & (windows[..., 2:-1] == first[..., None]).all(axis=-1)
+    if not allow_overline:
+        run &= (windows[..., 0] != first) & (windows[..., -1] != first)
+    board_ids, window_ids = np.nonzero(run)
+    return np.column_stack(
+        [board_ids, first[board_ids, window_ids].astype(np.int64), heads[window_ids]]
+    )
+
+
+def scan_boards(
+    boards, win_length: int, allow_overline=True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the winner of every board of a stack, see `winning_runs`.
+
+    Returns:
+        tuple: The winner of every board, 0 if nobody has a run and
+            SEVERAL_WINNERS if more than one player has, and the winning runs.
+    """
+    boards = _stack(boards)
+    runs = winning_runs(boards, win_length, allow_overline)
+    has_run = np.zeros((len(boards), int(boards.max(initial=0)) + 1), dtype=bool)
+    has_run[runs[:, 0], runs[:, 1]] = True
+    winners = has_run.argmax(axis=1)
+    winners[has_run.sum(axis=1) > 1] = SEVERAL_WINNERS
+    return winners, runs
+
+
+def run_cells(run: np.ndarray, win_length: int) -> Tuple[Tuple[int, int], ...]:
+    """The (x, y) of the cells of one run of `winning_runs`."""
+    _, _, x_coord, y_coord, x_step, y_step = (int(value) for value in run)
+    return tuple(
+        (x_coord + step * x_step, y_coord + step * y_step) for step in range(win_length)
+    )
+
+
+def winning_lines(board, win_length: int, allow_overline=True) -> List[WinningLine]:
+    """The winning runs of one board as (player, cells) pairs."""
+    return [
+        WinningLine(int(run[1]), run_cells(run, win_length))
+        for run in winning_runs(board, win_length, allow_overline)
+    ]
@@ -0,0 +1,267 @@
+"""Module implementing alpha-beta move search for Tic Tac Toe."""
+import random
+import time
+from typing import List, Optional, Tuple
+
+from src.position import Position
+
+WIN_SCORE = 1_000_000
+# Scores above this are wins (or losses) a known number of moves away.
+MATE_BOUND = WIN_SCORE - 10_000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit has run out."""
+
+
+class TranspositionTable:
+    """Fixed size table of search results indexed by Zobrist hash.
+
+    Each hash maps to one slot. A slot is replaced when the new result was searched
+    at least as deep, or when the stored result comes from an earlier search, so the
+    table never grows beyond `2 ** size_bits` entries.
+    """
+
+    def __init__(self, size_bits=16):
+        """Init for Transposition Table Class."""
+        self.size = 1 << size_bits
+        self._mask = self.size - 1
+        self.keys = [None] * self.size
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        """Age the stored entries, so they are the first to be replaced."""
+        self.generation += 1
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """Return (depth, score, flag, move) stored for `key`, None if missing."""
+        slot = key & self._mask
+        if self.keys[slot] != key:
+            return None
+        return self.entries[slot][:4]
+
+    def put(self, key: int, depth: int, score: int, flag: int, move: int) -> None:
+        """Store a search result for `key`, following the replacement policy."""
+        slot = key & self._mask
+        entry = self.entries[slot]
+        if (
+            entry is not None
+            and self.keys[slot] != key
+            and entry[0] > depth
+            and entry[4] == self.generation
+        ):
+            return
+        self.keys[slot] = key
+        self.entries[slot] = (depth, score, flag, move, self.generation)
+
+
+class Searcher:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """Negamax search with alpha-beta pruning and iterative deepening.
+
+    Moves are ordered by the transposition table move, then the killer moves of
+    the ply, then the history heuristic. Moves are made and unmade in place on a
+    single `Position`, so the search allocates no boards.
+    """
+
+    def __init__(self, table_bits=16, seed=0):
+        """Init for Searcher Class."""
+        self.table = TranspositionTable(table_bits)
+        self._side_keys = {}
+        self._rng = random.Random(seed)
+        self.position = None
+        self.nodes = 0
+        self.depth_reached = 0
+        self.score = 0
+        self._killers: List[List[int]] = []
+        self._history: List[int] = []
+        self._deadline = None
+        self._weights = []
+        self._root_move = None
+
+    def _key(self) -> int:
+        """Zobrist hash of the position including the side to move."""
+        to_move = self.position.to_move
+        if to_move not in self._side_keys:
+            self._side_keys[to_move] = self._rng.getrandbits(64)
+        return self.position.key ^ self._side_keys[to_move]
+
+    def _evaluate(self) -> int:
+        """Score the position for the side to move from the lines still open.
+
+        A line holding points of one player only is worth 4 ** points to them.
+        """
+        position = self.position
+        own_slot = position.player_indexes.index(position.to_move)
+        own = position.line_counts[own_slot]
+        other = position.line_counts[1 - own_slot]
+        score = 0
+        for own_count, other_count in zip(own, other):
+            if not other_count:
+                score += self._weights[own_count]
+            elif not own_count:
+                score -= self._weights[other_count]
+        return score
+
+    def _ordered_moves(self, tt_move: Optional[int], ply: int) -> List[int]:
+        """Return the legal moves, most promising first."""
+        moves = self.position.legal_moves()
+        history = self._history
+        moves.sort(key=lambda cell: history[cell], reverse=True)
+        for cell in reversed(self._killers[ply]):
+            if cell in moves:
+                moves.remove(cell)
+                moves.insert(0, cell)
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """Return the score of the position for the side to move."""
+        # pylint: disable=too-many-branches,too-many-locals,too-many-return-statements
+        self.nodes += 1
+        if self._deadline is not None and self.nodes & 1023 == 0:
+            if time.perf_counter() > self._deadline:
+                raise SearchTimeout()
+
+        position = self.position
+        if position.winner:
+            return ply - WIN_SCORE
+        if position.is_full():
+            return 0
+        if depth == 0:
+            return self._evaluate()
+
+        key = self._key()
+        alpha_start = alpha
+        tt_move = None
+        entry = self.table.get(key)
+        if entry is not None:
+            tt_depth, tt_score, flag, tt_move = entry
+            tt_score = _score_from_table(tt_score, ply)
+            if tt_depth >= depth and ply > 0:
+                if flag == EXACT:
+                    return tt_score
+                if flag == LOWER and tt_score >= beta:
+                    return tt_score
+                if flag == UPPER and tt_score <= alpha:
+                    return tt_score
+
+        best_score = -WIN_SCORE - 1
+        node_move = None
+        for cell in self._ordered_moves(tt_move, ply):
+            position.make(cell)
+            try:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                position.unmake()
+            if score > best_score:
+                best_score = score
+                node_move = cell
+                if ply == 0:
+                    self._root_move = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                killers = self._killers[ply]
+                if cell not in killers:
+                    killers.insert(0, cell)
+                    del killers[2:]
+                self._history[cell] += depth * depth
+                break
+
+        flag = EXACT
+        if best_score <= alpha_start:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        self.table.put(key, depth, _score_to_table(best_score, ply), flag, node_move)
+        return best_score
+
+    def search(
+        self, game, depth: Optional[int] = None, time_limit: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """Find the best move for the player to move in `game`.
+
+        Args:
+            game (TicTacToe): The game to search, it is not modified.
+            depth (int): Maximum depth in plies, the whole game tree if None.
+            time_limit (float): Seconds to search for, unlimited if None.
+
+        Raises:
+            Exception: If the game is already won or no legal moves are left.
+
+        Returns:
+            tuple: The (x, y) coordinates of the best move found.
+        """
+        if len(game.player_indexes) != 2:
+            raise Exception("Search is only implemented for two players.")
+
+        self.position = Position.from_game(game)
+        if self.position.winner:
+            raise Exception("The game is already won.")
+        moves = self.position.legal_moves()
+        if not moves:
+            raise Exception("No legal moves left.")
+
+        max_depth = len(moves) if depth is None else min(depth, len(moves))
+        self._deadline = None
+        if time_limit is not None:
+            self._deadline = time.perf_counter() + time_limit
+        self._killers = [[] for _ in range(len(moves) + 1)]
+        self._history = [0] * len(self.position.cells)
+        self._weights = [0] + [4**count for count in range(1, game.win_length + 1)]
+        self.table.new_search()
+        self.nodes = 0
+        self.depth_reached = 0
+
+        chosen = moves[0]
+        for iteration_depth in range(1, max_depth + 1):
+            self._root_move = None
+            try:
+                self.score = self._negamax(
+                    iteration_depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0
+                )
+            except SearchTimeout:
+                break
+            chosen = self._root_move
+            self.depth_reached = iteration_depth
+            if abs(self.score) > MATE_BOUND:
+                break
+        return divmod(chosen, game.cols)
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """Make win scores relative to the node before storing them."""
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    """Make stored win scores relative to the root again."""
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def best_move(
+    game, depth: Optional[int] = None, time_limit: Optional[float] = None
+) -> Tuple[int, int]:
+    """Find the best move for the player to move in `game`.
+
+    Args:
+        game (TicTacToe): The game to search, it is not modified.
+        depth (int): Maximum depth in plies, the whole game tree if None.
+        time_limit (float): Seconds to search for, unlimited if None.
+
+    Returns:
+        tuple: The (x, y) coordinates of the best move found.
+    """
+    return Searcher().search(game, depth=depth, time_limit=time_limit)
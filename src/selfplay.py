@@ -0,0 +1,316 @@
+"""Module implementing a parallel self-play generator of training datasets.
+
+    python -m src.selfplay --games 10000 --workers 4 --output selfplay/ --augment
+
+Every position of a game is a sample: the int8 board, the player to move, the
+move played (x * board_size + y) and the outcome for the player to move, 1 for
+a win, -1 for a loss and 0 for a draw. Samples are written in order to numbered
+`.npz` shards of `shard_size` samples. With a seed the dataset is the same
+whatever the number of workers.
+"""
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.board import ONGOING, TicTacToe
+from src.position import symmetries
+from src.search import best_move
+
+Samples = namedtuple("Samples", ["boards", "players", "moves", "outcomes"])
+Config = namedtuple(
+    "Config", ["board_size", "win_length", "policy", "random_plies", "augment"]
+)
+
+
+def random_policy(game: TicTacToe, rng: random.Random) -> Tuple[int, int]:
+    """Play a uniformly random legal move."""
+    return game.random_legal_move(rng)
+
+
+def search_policy(
+    game: TicTacToe, rng: random.Random, depth: Optional[int] = 2
+) -> Tuple[int, int]:
+    """Play the best move of an alpha-beta search of `depth` plies."""
+    # pylint: disable=unused-argument
+    return best_move(game, depth=depth)
+
+
+POLICIES = {"random": random_policy, "search": search_policy}
+
+
+def _policy(policy: Union[str, Callable], depth: Optional[int]) -> Callable:
+    """Resolve a policy name, or keep a callable `policy(game, rng) -> (x, y)`."""
+    if callable(policy):
+        return policy
+    if policy not in POLICIES:
+        raise Exception(f"Unknown policy: {policy}. Must be in {tuple(POLICIES)}")
+    if policy == "search":
+        return partial(search_policy, depth=depth)
+    return POLICIES[policy]
+
+
+def play_game(
+    config: Config, rng: random.Random
+) -> Tuple[List[np.ndarray], List[int], List[int], int]:
+    """Play one game, return its boards, players to move, moves and winner."""
+    game = TicTacToe(config.board_size, config.win_length, "incremental", dtype=np.int8)
+    boards, players, moves = [], [], []
+    while game.status() == ONGOING:
+        player_index = game.player_indexes[len(moves) % len(game.player_indexes)]
+        if len(moves) < config.random_plies:
+            move = random_policy(game, rng)
+        else:
+            move = config.policy(game, rng)
+        boards.append(game.board.copy())
+        players.append(player_index)
+        moves.append(move[0] * game.board_size + move[1])
+        game.place(player_index, *move)
+    return boards, players, moves, game.winner
+
+
+def augment(samples: Samples, board_size: int) -> Samples:
+    """Add the 7 other rotations and reflections of every sample."""
+    flat = samples.boards.reshape(len(samples.moves), -1)
+    boards, moves = [], []
+    for permutation in symmetries(board_size):
+        permutation = np.asarray(permutation)
+        inverse = np.argsort(permutation)
+        boards.append(flat[:, inverse].reshape(samples.boards.shape))
+        moves.append(permutation[samples.moves])
+    return Samples(
+        np.concatenate(boards),
+        np.tile(samples.players, 8),
+        np.concatenate(moves).astype(np.int16),
+        np.tile(samples.outcomes, 8),
+    )
+
+
+def play_chunk(config: Config, seeds: List[int]) -> Tuple[Samples, int, float]:
+    """Play one game per seed in a worker.
+
+    Returns:
+        tuple: The samples of the games, the worker process id and the seconds
+            spent playing.
+    """
+    start = time.perf_counter()
+    boards, players, moves, outcomes = [], [], [], []
+    for seed in seeds:
+        game_boards, game_players, game_moves, winner = play_game(
+            config, random.Random(seed)
+        )
+        boards.extend(game_boards)
+        players.extend(game_players)
+        moves.extend(game_moves)
+        outcomes.extend(
+            0 if not winner else 1 if player == winner else -1
+            for player in game_players
+        )
+    size = config.board_size
+    samples = Samples(
+        np.array(boards, dtype=np.int8).reshape((-1, size, size)),
+        np.array(players, dtype=np.int8),
+        np.array(moves, dtype=np.int16),
+        np.array(outcomes, dtype=np.int8),
+    )
+    if config.augment:
+        samples = augment(samples, size)
+    return samples, os.getpid(), time.perf_counter() - start
+
+
+class ShardWriter:
+    """Buffers samples and writes them as numbered `.npz` shards."""
+
+    def __init__(self, directory: str, shard_size=100_000, compress=False):
+        """Init for Shard Writer Class."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self.compress = compress
+        self.shards = 0
+        self.samples = 0
+        self._buffer: List[Samples] = []
+        self._buffered = 0
+
+    def add(self, samples: Samples) -> None:
+        """Buffer samples, writing every full shard."""
+        self._buffer.append(samples)
+        self._buffered += len(samples.moves)
+        while self._buffered >= self.shard_size:
+            self._write(self.shard_size)
+
+    def close(self) -> None:
+        """Write the samples left as a last, smaller shard."""
+        if self._buffered:
+            self._write(self._buffered)
+
+    def _write(self, count: int) -> None:
+        """Write the first `count` buffered samples as one shard."""
+        merged = Samples(*(np.concatenate(arrays) for arrays in zip(*self._buffer)))
+        shard = Samples(*(array[:count] for array in merged))
+        rest = Samples(*(array[count:] for array in merged))
+        self._buffer = [rest] if len(rest.moves) else []
+        self._buffered = len(rest.moves)
+        save = np.savez_compressed if self.compress else np.savez
+        path = os.path.join(self.directory, f"shard-{self.shards:05d}.npz")
+        save(path, **shard._asdict())
+        self.shards += 1
+        self.samples += count
+
+
+def generate(
+    output: str,
+    games: int,
+    board_size=3,
+    win_length=3,
+    policy: Union[str, Callable] = "random",
+    workers=1,
+    **options,
+) -> Dict:
+    """Play self-play games across a process pool and write them as shards.
+
+    At most `2 * workers` chunks of games are in flight or waiting to be written,
+    and finished chunks are written in order, so memory stays bounded and the
+    dataset does not depend on which worker finishes first.
+
+    Args:
+        output (str): Directory of the shards.
+        games (int): Number of games to play.
+        board_size (int): size of n x n board.
+        win_length (int): number of consecutive points needed to win.
+        policy: "random", "search" or a picklable `policy(game, rng) -> (x, y)`.
+        workers (int): Number of processes, games are played in process if 1.
+        **options: seed (None for a random one), depth (of the search policy),
+            random_plies (random opening moves, default 0), augment (add the 8
+            symmetries), chunk (games per task, default 100), shard_size,
+            compress.
+
+    Returns:
+        dict: Games, samples, shards, seconds, games per second overall and
+            per worker process id.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    seed = options.get("seed")
+    if seed is None:
+        seed = random.SystemRandom().randrange(1 << 30)
+    config = Config(
+        board_size,
+        win_length,
+        _policy(policy, options.get("depth", 2)),
+        options.get("random_plies", 0),
+        options.get("augment", False),
+    )
+    chunk = options.get("chunk", 100)
+    seeds = [seed * 1_000_003 + game for game in range(games)]
+    chunks = [seeds[start : start + chunk] for start in range(0, games, chunk)]
+    writer = ShardWriter(
+        output, options.get("shard_size", 100_000), options.get("compress", False)
+    )
+    worker_games: Dict[int, int] = {}
+    worker_seconds: Dict[int, float] = {}
+
+    def collect(result: Tuple[Samples, int, float], played: int) -> None:
+        samples, pid, seconds = result
+        writer.add(samples)
+        worker_games[pid] = worker_games.get(pid, 0) + played
+        worker_seconds[pid] = worker_seconds.get(pid, 0.0) + seconds
+
+    start = time.perf_counter()
+    if workers == 1:
+        for seeds_chunk in chunks:
+            collect(play_chunk(config, seeds_chunk), len(seeds_chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            finished = {}
+            next_submit = next_write = 0
+            while next_write < len(chunks):
+                while (
+                    next_submit < len(chunks) and next_submit - next_write < 2 * workers
+                ):
+                    future = executor.submit(play_chunk, config, chunks[next_submit])
+                    pending[future] = next_submit
+                    next_submit += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while next_write in finished:
+                    collect(finished.pop(next_write), len(chunks[next_write]))
+                    next_write += 1
+    writer.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "samples": writer.samples,
+        "shards": writer.shards,
+        "seed": seed,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed if elapsed else float("inf"),
+        "games_per_sec_per_worker": {
+            pid: played / worker_seconds[pid]
+            for pid, played in worker_games.items()
+            if worker_seconds[pid]
+        },
+    }
+
+
+def load(directory: str) -> Samples:
+    """Read every shard of a dataset back, in order."""
+    paths = sorted(name for name in os.listdir(directory) if name.startswith("shard-"))
+    shards = []
+    for name in paths:
+        with np.load(os.path.join(directory, name)) as shard:
+            shards.append(Samples(*(shard[field] for field in Samples._fields)))
+    return Samples(*(np.concatenate(arrays) for arrays in zip(*shards)))
+
+
+def main(argv=None) -> None:
+    """Command line entry point, `python -m src.selfplay`."""
+    parser = argparse.ArgumentParser(description="Generate self-play datasets.")
+    parser.add_argument("--output", default="selfplay")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--board-size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=3)
+    parser.add_argument("--policy", choices=tuple(POLICIES), default="random")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--random-plies", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=100)
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--augment", action="store_true")
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    stats = generate(
+        args.output,
+        args.games,
+        args.board_size,
+        args.win_length,
+        args.policy,
+        args.workers,
+        seed=args.seed,
+        depth=args.depth,
+        random_plies=args.random_plies,
+        augment=args.augment,
+        chunk=args.chunk,
+        shard_size=args.shard_size,
+        compress=args.compress,
+    )
+    print(
+        f"{stats['games']} games, {stats['samples']} samples in {stats['shards']} "
+        f"shards, {stats['games_per_sec']:.0f} games/s (seed {stats['seed']})"
+    )
+    for pid, rate in sorted(stats["games_per_sec_per_worker"].items()):
+        print(f"  worker {pid}: {rate:.0f} games/s")
+
+
+if __name__ == "__main__":
+    main()
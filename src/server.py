@@ -0,0 +1,283 @@
+"""Module implementing an asyncio server hosting many Tic Tac Toe games.
+
+Clients speak a line protocol over TCP, one command per line:
+
+    NEW <game_id> [board_size] [win_length]   ->  OK
+    MOVE <game_id> <player> <x> <y>           ->  OK <winner>
+    BOARD <game_id>                           ->  OK <last_played_by> <cells>
+    END <game_id>                             ->  OK
+    PING                                      ->  OK
+
+Failures answer `ERR <message>`. `<cells>` is the board row by row as digits.
+Boards larger than `max_board_size` (19 by default) are refused.
+With several shards every server process owns the game ids that `shard_for`
+maps to it, and clients connect to the shard of their game.
+"""
+import argparse
+import asyncio
+import time
+import zlib
+from collections import OrderedDict
+from multiprocessing import Process
+from typing import List, Optional
+
+from src.board import TicTacToe
+
+# Largest board a client may ask for, the incremental engine is O(cells) memory.
+MAX_BOARD_SIZE = 19
+
+
+def shard_for(game_id: str, num_shards: int) -> int:
+    """Return the shard that owns `game_id`."""
+    return zlib.crc32(game_id.encode()) % num_shards
+
+
+class SessionRegistry:
+    """Live games keyed by game id, least recently used first.
+
+    Every command on a game moves it to the end, so idle games are evicted from
+    the front without scanning the whole registry.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 300.0,
+        shard=0,
+        num_shards=1,
+        max_board_size=MAX_BOARD_SIZE,
+    ):
+        """Init for Session Registry Class."""
+        self.idle_timeout = idle_timeout
+        self.max_board_size = max_board_size
+        self.shard = shard
+        self.num_shards = num_shards
+        self.games: "OrderedDict[str, TicTacToe]" = OrderedDict()
+        self._last_active = {}
+
+    def __len__(self) -> int:
+        """Number of live games."""
+        return len(self.games)
+
+    def _touch(self, game_id: str) -> TicTacToe:
+        """Return a live game and mark it as active."""
+        game = self.games.get(game_id)
+        if game is None:
+            raise Exception(f"Unknown game: {game_id}")
+        self.games.move_to_end(game_id)
+        self._last_active[game_id] = time.monotonic()
+        return game
+
+    def create(self, game_id: str, board_size=3, win_length=3) -> TicTacToe:
+        """Start a new game under `game_id`."""
+        if shard_for(game_id, self.num_shards) != self.shard:
+            raise Exception(f"Game {game_id} belongs to another shard.")
+        if game_id in self.games:
+            raise Exception(f"Game {game_id} already exists.")
+        if board_size > self.max_board_size:
+            raise Exception(f"Board size above {self.max_board_size} is not served.")
+        self.games[game_id] = TicTacToe(
+            board_size=board_size, win_length=win_length, win_engine="incremental"
+        )
+        self._last_active[game_id] = time.monotonic()
+        return self.games[game_id]
+
+    def move(
+        self, game_id: str, player_index: int, x_coordinate: int, y_coordinate: int
+    ) -> int:
+        """Validate and play a move, turn order is enforced by `last_played_by`.
+
+        Returns:
+            int: The index of the winning player, 0 otherwise.
+        """
+        game = self._touch(game_id)
+        return game.place(player_index, x_coordinate, y_coordinate)
+
+    def board(self, game_id: str) -> TicTacToe:
+        """Return a live game."""
+        return self._touch(game_id)
+
+    def end(self, game_id: str) -> None:
+        """Remove a game."""
+        self._touch(game_id)
+        del self.games[game_id]
+        del self._last_active[game_id]
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Remove the games idle for longer than `idle_timeout`.
+
+        Returns:
+            int: The number of games evicted.
+        """
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        while self.games:
+            game_id = next(iter(self.games))
+            if now - self._last_active[game_id] <= self.idle_timeout:
+                break
+            del self.games[game_id]
+            del self._last_active[game_id]
+            evicted += 1
+        return evicted
+
+    def _command_new(self, args: List[str]) -> str:
+        """NEW <game_id> [board_size] [win_length]"""
+        self.create(args[0], *(int(arg) for arg in args[1:3]))
+        return "OK"
+
+    def _command_move(self, args: List[str]) -> str:
+        """MOVE <game_id> <player> <x> <y>"""
+        player_index, x_coordinate, y_coordinate = (int(arg) for arg in args[1:4])
+        return f"OK {self.move(args[0], player_index, x_coordinate, y_coordinate)}"
+
+    def _command_board(self, args: List[str]) -> str:
+        """BOARD <game_id>"""
+        game = self.board(args[0])
+        cells = "".join(str(int(value)) for value in game.board.ravel())
+        return f"OK {game.last_played_by or 0} {cells}"
+
+    def _command_end(self, args: List[str]) -> str:
+        """END <game_id>"""
+        self.end(args[0])
+        return "OK"
+
+    def handle(self, line: str) -> str:
+        """Run one protocol command and return the reply line."""
+        # pylint: disable=broad-except
+        words = line.split()
+        if not words:
+            return "ERR Empty command."
+        if words[0].upper() == "PING":
+            return "OK"
+        command = getattr(self, f"_command_{words[0].lower()}", None)
+        if command is None:
+            return f"ERR Unknown command: {words[0]}"
+        try:
+            return command(words[1:])
+        except (IndexError, ValueError):
+            return f"ERR Bad arguments: {line.strip()}"
+        except Exception as error:
+            return f"ERR {error}"
+
+
+class GameServer:
+    """Serves a `SessionRegistry` over TCP with asyncio."""
+
+    def __init__(self, registry: SessionRegistry, host="127.0.0.1", port=8765):
+        """Init for Game Server Class."""
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._evictor = None
+
+    async def _client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the commands of one connection until it closes."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.registry.handle(line.decode()).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _evict_forever(self) -> None:
+        """Evict idle games twice per idle timeout."""
+        while True:
+            await asyncio.sleep(self.registry.idle_timeout / 2)
+            self.registry.evict_idle()
+
+    async def start(self) -> int:
+        """Start listening, return the port (useful when port is 0)."""
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self._evictor = asyncio.ensure_future(self._evict_forever())
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop listening and evicting."""
+        self._evictor.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        """Start and serve until cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def run_server(
+    host: str,
+    port: int,
+    idle_timeout: float,
+    shard=0,
+    num_shards=1,
+    max_board_size=MAX_BOARD_SIZE,
+):
+    """Run one server process until interrupted."""
+    # pylint: disable=too-many-arguments
+    registry = SessionRegistry(idle_timeout, shard, num_shards, max_board_size)
+    try:
+        asyncio.run(GameServer(registry, host, port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def serve_sharded(
+    host: str,
+    base_port: int,
+    num_shards: int,
+    idle_timeout: float = 300.0,
+    max_board_size=MAX_BOARD_SIZE,
+) -> List[Process]:
+    """Start one server process per shard, shard i listens on base_port + i."""
+    processes = [
+        Process(
+            target=run_server,
+            args=(
+                host,
+                base_port + shard,
+                idle_timeout,
+                shard,
+                num_shards,
+                max_board_size,
+            ),
+            daemon=True,
+        )
+        for shard in range(num_shards)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def main(argv=None) -> None:
+    """Command line entry point, `python -m src.server`."""
+    parser = argparse.ArgumentParser(description="Tic Tac Toe game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    parser.add_argument("--max-board-size", type=int, default=MAX_BOARD_SIZE)
+    args = parser.parse_args(argv)
+    if args.shards == 1:
+        run_server(
+            args.host, args.port, args.idle_timeout, max_board_size=args.max_board_size
+        )
+        return
+    for process in serve_sharded(
+        args.host, args.port, args.shards, args.idle_timeout, args.max_board_size
+    ):
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
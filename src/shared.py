@@ -0,0 +1,371 @@
+"""Module implementing games whose state lives in shared memory for other processes.
+
+A game server process creates a `SharedGameRegistry`, one
+`multiprocessing.shared_memory` segment holding many games, and plays
+`SharedTicTacToe` games acquired from it. Spectators, evaluators and loggers in
+other processes attach to the segment by name and read the boards in place,
+nothing is pickled or sent to them.
+
+Every game slot has a header of four int64: a version counter, the last player,
+the move count and the winner. The version is a seqlock: the writer makes it odd
+before changing the slot and even again once the slot is consistent, so a reader
+that sees the same even version before and after copying a slot has a
+consistent snapshot, without any lock. Each slot has a single writer, and the
+stores of one process are assumed to become visible to others in order, as on
+x86.
+"""
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from src.board import TicTacToe
+from src.position import board_shape
+
+MAGIC = b"TTTM"
+VERSION = 1
+HEADER = struct.Struct("<4sBxxxIIII")
+# The game headers start after the segment header, aligned for int64.
+HEADERS_OFFSET = 64
+GAME_ID_BYTES = 32
+
+VERSION_FIELD, LAST_PLAYED_BY_FIELD, MOVE_COUNT_FIELD, WINNER_FIELD = range(4)
+
+GameSnapshot = namedtuple(
+    "GameSnapshot",
+    ["slot", "game_id", "version", "last_played_by", "move_count", "winner", "board"],
+)
+
+
+class SharedTicTacToe(TicTacToe):
+    """A game whose board and header live in a slot of a `SharedGameRegistry`.
+
+    `place`, `play_sequence`, `undo`, `restore` and `reset_board` each publish
+    their changes as one seqlock update. A branch is a private copy of the game,
+    its moves are not published.
+    """
+
+    __slots__ = ("_header", "_writes")
+
+    def __init__(
+        self,
+        header: np.ndarray,
+        board: np.ndarray,
+        board_size=3,
+        win_length=3,
+        win_engine="recursive",
+    ):
+        """Init for Shared Tic Tac Toe Class, use `SharedGameRegistry.acquire`."""
+        # pylint: disable=too-many-arguments
+        self._header = None
+        self._writes = 0
+        super().__init__(board_size, win_length, win_engine, board=board)
+        self._header = header
+
+    def _begin_write(self) -> None:
+        """Make the version odd, readers retry until the write ends."""
+        if self._writes == 0 and self._header is not None:
+            self._header[VERSION_FIELD] += 1
+        self._writes += 1
+
+    def _end_write(self) -> None:
+        """Publish the header and make the version even again."""
+        self._writes -= 1
+        if self._writes == 0 and self._header is not None:
+            self._header[LAST_PLAYED_BY_FIELD] = self.last_played_by or 0
+            self._header[MOVE_COUNT_FIELD] = self.move_count
+            self._header[WINNER_FIELD] = self.winner
+            self._header[VERSION_FIELD] += 1
+
+    def place(self, player_index: int, x_coordinate: int, y_coordinate: int) -> int:
+        """Plays one step of the game and publishes it, see `TicTacToe.place`."""
+        self._begin_write()
+        try:
+            return super().place(player_index, x_coordinate, y_coordinate)
+        finally:
+            self._end_write()
+
+    def play_sequence(self, player_indexes, x_coordinates, y_coordinates):
+        """Play a sequence of moves and publish them at once, see `TicTacToe`."""
+        self._begin_write()
+        try:
+            return super().play_sequence(player_indexes, x_coordinates, y_coordinates)
+        finally:
+            self._end_write()
+
+    def undo(self):
+        """Take back the last move and publish it, see `TicTacToe.undo`."""
+        self._begin_write()
+        try:
+            return super().undo()
+        finally:
+            self._end_write()
+
+    def restore(self, token) -> None:
+        """Return to a snapshot and publish it as one update."""
+        self._begin_write()
+        try:
+            super().restore(token)
+        finally:
+            self._end_write()
+
+    def reset_board(self):
+        """Reset the board to starting position and publish it."""
+        self._begin_write()
+        try:
+            super().reset_board()
+        finally:
+            self._end_write()
+
+    def detach(self) -> None:
+        """Go on with a private copy of the board, the moves are no longer published."""
+        self.board = self.board.copy()
+        self._header = None
+
+    def _share_board(self, clone: TicTacToe) -> None:
+        """Give a branch a private copy of the board, it is not published."""
+        # pylint: disable=protected-access
+        clone.board = self.board.copy()
+        clone._board_owners = None
+        clone._header = None
+        clone._writes = 0
+
+
+def _attach_memory(name: str) -> SharedMemory:
+    """Open a segment by name, leaving its unlinking to the process that made it.
+
+    Opening a segment registers it with the resource tracker, which unlinks it
+    when the process exits. A process started by the creator shares its tracker,
+    which is left as it is, but an unrelated process gets a tracker of its own
+    and the segment is unregistered from it.
+    """
+    # pylint: disable=protected-access
+    shared_tracker = resource_tracker._resource_tracker._fd is not None
+    memory = SharedMemory(name=name)
+    if not shared_tracker:
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+def _slot_sizes(capacity: int, rows: int, cols: int) -> List[int]:
+    """Bytes of the game headers, the game ids and the boards of a segment."""
+    return [capacity * 4 * 8, capacity * GAME_ID_BYTES, capacity * rows * cols]
+
+
+class SharedGameRegistry:  # pylint: disable=too-many-instance-attributes
+    """Many games mapped into one shared memory segment.
+
+    The process that creates the registry acquires games by id and plays them,
+    and processes that attach to it by `name` read the games with `read`, `find`
+    and `snapshots`. The segment starts with the magic bytes `TTTM`, a version
+    byte and the capacity, rows, columns and win length, followed by the
+    (capacity, 4) int64 game headers, the game ids and the int8 boards.
+    """
+
+    def __init__(self, memory: SharedMemory, owner: bool, win_engine="recursive"):
+        """Init for Shared Game Registry Class, use `create` or `attach`."""
+        magic, version, capacity, rows, cols, win_length = HEADER.unpack_from(
+            memory.buf
+        )
+        if magic != MAGIC or version != VERSION:
+            raise Exception("Not a shared game registry.")
+        self.memory = memory
+        self.owner = owner
+        self.name = memory.name
+        self.rows = rows
+        self.cols = cols
+        self.board_size = rows if rows == cols else (rows, cols)
+        self.win_length = win_length
+        self.win_engine = win_engine
+        headers_bytes, ids_bytes, _ = _slot_sizes(capacity, rows, cols)
+        self.headers = np.ndarray(
+            (capacity, 4), dtype=np.int64, buffer=memory.buf, offset=HEADERS_OFFSET
+        )
+        self.game_ids = np.ndarray(
+            capacity,
+            dtype=f"S{GAME_ID_BYTES}",
+            buffer=memory.buf,
+            offset=HEADERS_OFFSET + headers_bytes,
+        )
+        self.boards = np.ndarray(
+            (capacity, rows, cols),
+            dtype=np.int8,
+            buffer=memory.buf,
+            offset=HEADERS_OFFSET + headers_bytes + ids_bytes,
+        )
+        self._games = {}
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        board_size=3,
+        win_length=3,
+        win_engine="recursive",
+        name: Optional[str] = None,
+    ) -> "SharedGameRegistry":
+        """Create a segment for `capacity` games, the caller owns and unlinks it.
+
+        Args:
+            capacity (int): Number of games the segment holds.
+            board_size (int): size of n x n board, or a (rows, cols) tuple.
+            win_length (int): number of consecutive points needed to win.
+            win_engine (str): The win engine of the games acquired.
+            name (str): Name of the segment, a random one if None.
+
+        Returns:
+            SharedGameRegistry: The registry, with every slot free.
+        """
+        # pylint: disable=too-many-arguments
+        rows, cols = board_shape(board_size)
+        size = HEADERS_OFFSET + sum(_slot_sizes(capacity, rows, cols))
+        memory = SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(
+            memory.buf, 0, MAGIC, VERSION, capacity, rows, cols, win_length
+        )
+        return cls(memory, True, win_engine)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedGameRegistry":
+        """Attach to the segment of a registry created by another process."""
+        memory = _attach_memory(name)
+        try:
+            return cls(memory, False)
+        except Exception:
+            memory.close()
+            raise
+
+    @property
+    def capacity(self) -> int:
+        """Number of games the segment holds."""
+        return len(self.headers)
+
+    def __len__(self) -> int:
+        """Number of games acquired."""
+        return int(np.count_nonzero(self.game_ids))
+
+    def acquire(self, game_id: str) -> SharedTicTacToe:
+        """Return a new game in a free slot, published under `game_id`.
+
+        Raises:
+            Exception: If the id is taken or too long, or every slot is in use.
+        """
+        if not self.owner:
+            raise Exception("Only the process that created the registry writes.")
+        encoded = game_id.encode()
+        if not encoded or len(encoded) > GAME_ID_BYTES:
+            raise Exception(f"Game ids must be 1 to {GAME_ID_BYTES} bytes long.")
+        if game_id in self._games:
+            raise Exception(f"Game {game_id} is already in the registry.")
+        free = np.flatnonzero(self.game_ids == b"")
+        if not free.size:
+            raise Exception(f"Registry is full, all {self.capacity} slots are in use.")
+        slot = int(free[0])
+        header = self.headers[slot]
+        header[VERSION_FIELD] += 1
+        game = SharedTicTacToe(
+            header, self.boards[slot], self.board_size, self.win_length, self.win_engine
+        )
+        header[LAST_PLAYED_BY_FIELD:] = 0
+        self.game_ids[slot] = encoded
+        header[VERSION_FIELD] += 1
+        self._games[game_id] = (slot, game)
+        return game
+
+    def release(self, game_id: str) -> None:
+        """Free the slot of a game, its `SharedTicTacToe` is detached from it.
+
+        Raises:
+            Exception: If there is no game with this id.
+        """
+        if game_id not in self._games:
+            raise Exception(f"No game {game_id} in the registry.")
+        slot, game = self._games.pop(game_id)
+        game.detach()
+        header = self.headers[slot]
+        header[VERSION_FIELD] += 1
+        self.boards[slot].fill(0)
+        header[LAST_PLAYED_BY_FIELD:] = 0
+        self.game_ids[slot] = b""
+        header[VERSION_FIELD] += 1
+
+    def find(self, game_id: str) -> Optional[int]:
+        """Return the slot of a game, None if it is not in the registry."""
+        slots = np.flatnonzero(self.game_ids == game_id.encode())
+        return int(slots[0]) if slots.size else None
+
+    def read(self, slot: int) -> GameSnapshot:
+        """Copy a consistent snapshot of a slot, retrying while it is written."""
+        header = self.headers[slot]
+        board = self.boards[slot]
+        while True:
+            version = int(header[VERSION_FIELD])
+            if version % 2 == 0:
+                game_id = self.game_ids[slot]
+                _, last_played_by, move_count, winner = header.tolist()
+                cells = board.copy()
+                if int(header[VERSION_FIELD]) == version:
+                    return GameSnapshot(
+                        slot,
+                        game_id.decode(),
+                        version,
+                        last_played_by,
+                        move_count,
+                        winner,
+                        cells,
+                    )
+            time.sleep(0)
+
+    def snapshots(self) -> Iterator[GameSnapshot]:
+        """Consistent snapshots of every acquired game.
+
+        All the slots are copied at once, and only those written to during the
+        copy are read again one by one.
+        """
+        versions = self.headers[:, VERSION_FIELD].copy()
+        headers = self.headers.copy()
+        game_ids = self.game_ids.copy()
+        boards = self.boards.copy()
+        torn = (versions % 2 == 1) | (self.headers[:, VERSION_FIELD] != versions)
+        for slot in np.flatnonzero((game_ids != b"") | torn).tolist():
+            if torn[slot]:
+                snapshot = self.read(slot)
+                if snapshot.game_id:
+                    yield snapshot
+                continue
+            _, last_played_by, move_count, winner = headers[slot].tolist()
+            yield GameSnapshot(
+                slot,
+                game_ids[slot].decode(),
+                int(versions[slot]),
+                last_played_by,
+                move_count,
+                winner,
+                boards[slot],
+            )
+
+    def close(self) -> None:
+        """Detach from the segment, and unlink it if this process created it.
+
+        The games still acquired are detached first and go on with a private
+        board, none of them is left pointing into the closed segment.
+        """
+        for _, game in self._games.values():
+            game.detach()
+        self.headers = self.game_ids = self.boards = None
+        self._games = {}
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        """Use the registry as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the registry when leaving the context."""
+        self.close()
@@ -0,0 +1,232 @@
+"""Module implementing a full game tree solver with an on-disk solution table."""
+import mmap
+import struct
+from collections import namedtuple
+from typing import Dict, List, Tuple
+
+from src.position import Position, symmetries
+
+UNKNOWN, WIN, LOSS, DRAW = 0, 1, 2, 3
+
+MAGIC = b"TTTS"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBB")
+# 3 ** 25 positions on 5x5 would not fit on any disk.
+MAX_BOARD_SIZE = 4
+
+Solution = namedtuple("Solution", ["value", "distance"])
+
+
+def table_size(board_size: int) -> int:
+    """Number of positions ranked by the table, 3 ** (board_size * board_size)."""
+    return 3 ** (board_size * board_size)
+
+
+class Solver:  # pylint: disable=too-many-instance-attributes
+    """Forward game tree search over every position reachable from the empty board.
+
+    A position is ranked as a base 3 number with one digit per cell: 0 for empty,
+    1 for a point of the side to move and 2 for a point of the other player, so a
+    position and its value do not depend on which player index started. Positions
+    are solved once per symmetry class and the result is written for all 8
+    rotations and reflections.
+
+    Values are for the side to move: WIN, LOSS or DRAW, with the number of moves
+    left under best play (the winner is as quick and the loser as slow as
+    possible).
+    """
+
+    def __init__(self, board_size=3, win_length=3):
+        """Init for Solver Class."""
+        if win_length > board_size:
+            raise Exception("Win length must be less than board size.")
+        if board_size > MAX_BOARD_SIZE:
+            raise Exception(
+                f"Board size above {MAX_BOARD_SIZE} is too large for a full table."
+            )
+        self.board_size = board_size
+        self.win_length = win_length
+        cells = board_size * board_size
+        self.values = bytearray((table_size(board_size) + 3) // 4)
+        self.distances = bytearray(table_size(board_size))
+        self._position = Position(board_size, win_length)
+        self._memo: Dict[int, Tuple[int, int]] = {}
+        self._powers = [3**cell for cell in range(cells)]
+        self._images = [
+            [self._powers[permutation[cell]] for cell in range(cells)]
+            for permutation in symmetries(board_size)
+        ]
+        # Rank of every symmetric image, with the side to move as 1 (own) or 2.
+        self._own_ranks = [0] * len(self._images)
+        self._other_ranks = [0] * len(self._images)
+
+    def _store(self, ranks: List[int], value: int, distance: int) -> None:
+        """Write a solution for every symmetric image of the position."""
+        for rank in ranks:
+            self.values[rank >> 2] |= value << ((rank & 3) * 2)
+            self.distances[rank] = distance
+
+    def _make(self, cell: int) -> bool:
+        """Play the side to move at `cell` and swap the point of view of the ranks."""
+        won = self._position.make(cell)
+        for index, image in enumerate(self._images):
+            own = self._own_ranks[index]
+            self._own_ranks[index] = self._other_ranks[index] + 2 * image[cell]
+            self._other_ranks[index] = own + image[cell]
+        return won
+
+    def _unmake(self, cell: int) -> None:
+        """Take back the move at `cell`."""
+        self._position.unmake()
+        for index, image in enumerate(self._images):
+            other = self._other_ranks[index]
+            self._other_ranks[index] = self._own_ranks[index] - 2 * image[cell]
+            self._own_ranks[index] = other - image[cell]
+
+    def _solve(self) -> Tuple[int, int]:
+        """Return the (value, distance) of the current position for the side to move."""
+        canonical = min(self._own_ranks)
+        if canonical in self._memo:
+            return self._memo[canonical]
+
+        position = self._position
+        best = None
+        for cell in position.legal_moves():
+            won = self._make(cell)
+            if won:
+                child = (LOSS, 0)
+                self._store(self._own_ranks, LOSS, 0)
+            elif position.is_full():
+                child = (DRAW, 0)
+                self._store(self._own_ranks, DRAW, 0)
+            else:
+                child = self._solve()
+            self._unmake(cell)
+
+            result = (
+                {LOSS: WIN, WIN: LOSS, DRAW: DRAW}[child[0]],
+                child[1] + 1,
+            )
+            if best is None or _preference(result) > _preference(best):
+                best = result
+
+        self._memo[canonical] = best
+        self._store(self._own_ranks, *best)
+        return best
+
+    def solve(self) -> Solution:
+        """Solve every position reachable from the empty board.
+
+        Returns:
+            Solution: The value and distance of the empty board for the first player.
+        """
+        return Solution(*self._solve())
+
+    def write(self, path: str) -> None:
+        """Write the solution table to `path`, solving first if needed."""
+        if not self._memo:
+            self.solve()
+        with open(path, "wb") as table_file:
+            table_file.write(
+                HEADER.pack(MAGIC, VERSION, self.board_size, self.win_length, 0)
+            )
+            table_file.write(self.values)
+            table_file.write(self.distances)
+
+
+def _preference(result: Tuple[int, int]) -> Tuple[int, int]:
+    """Order results: quick wins, then draws, then slow losses."""
+    value, distance = result
+    if value == WIN:
+        return (2, -distance)
+    if value == DRAW:
+        return (1, 0)
+    return (0, distance)
+
+
+def build_table(board_size: int, win_length: int, path: str) -> Solution:
+    """Solve a (board_size, win_length) variant and write its table to `path`.
+
+    Returns:
+        Solution: The value and distance of the empty board for the first player.
+    """
+    solver = Solver(board_size, win_length)
+    solution = solver.solve()
+    solver.write(path)
+    return solution
+
+
+class SolvedTable:
+    """Read only view of a solution table written by `Solver.write`.
+
+    The file is memory mapped, so opening it reads nothing up front and worker
+    processes that open the same file share its pages without copying them.
+    """
+
+    def __init__(self, table_file, mapped: mmap.mmap):
+        """Init for Solved Table Class, use `SolvedTable.open`."""
+        magic, version, board_size, win_length, _ = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            raise Exception("Not a solution table.")
+        self.board_size = board_size
+        self.win_length = win_length
+        self._file = table_file
+        self._mapped = mapped
+        self._values_offset = HEADER.size
+        self._distances_offset = HEADER.size + (table_size(board_size) + 3) // 4
+
+    @classmethod
+    def open(cls, path: str) -> "SolvedTable":
+        """Memory map the table at `path`."""
+        table_file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            mapped = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            table_file.close()
+            raise
+        return cls(table_file, mapped)
+
+    def close(self) -> None:
+        """Unmap the table and close the file."""
+        self._mapped.close()
+        self._file.close()
+
+    def __enter__(self):
+        """Use the table as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the table when leaving the context."""
+        self.close()
+
+    def lookup_rank(self, rank: int) -> Solution:
+        """Return the solution stored for a ranked position."""
+        packed = self._mapped[self._values_offset + (rank >> 2)]
+        value = packed >> ((rank & 3) * 2) & 3
+        return Solution(value, self._mapped[self._distances_offset + rank])
+
+    def rank(self, game) -> int:
+        """Rank the position of a `TicTacToe` game from the side to move."""
+        if (game.board_size, game.win_length) != (self.board_size, self.win_length):
+            raise Exception(
+                f"Table is for board size {self.board_size} and win length "
+                f"{self.win_length}."
+            )
+        if len(game.player_indexes) != 2:
+            raise Exception("Table is for two players.")
+        if not game.allow_overline and self.win_length < self.board_size:
+            raise Exception("Table is for games where overlines win.")
+        last_played_by = game.last_played_by
+        rank = 0
+        for cell, value in enumerate(game.board.ravel().tolist()):
+            if value:
+                rank += (2 if value == last_played_by else 1) * 3**cell
+        return rank
+
+    def lookup(self, game) -> Solution:
+        """Return the value and distance to the end for the player to move in `game`.
+
+        Returns:
+            Solution: UNKNOWN if the position can not be reached in a game.
+        """
+        return self.lookup_rank(self.rank(game))
@@ -0,0 +1,346 @@
+"""Module implementing an incremental threat index and threat space search.
+
+On large boards (15x15 or 19x19 with five in a row) what matters is where each
+player can make a four or a five. Every full row, column and diagonal of the
+board is kept as a base 3 number with one digit per cell, 0 for empty and 1 or 2
+for the point of the first or second player. A move changes the code of the 4
+lines through it, and each of these lines is then re-read as windows of
+win_length cells, every window code being looked up in a precomputed table.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.board import TicTacToe
+from src.position import DIRECTIONS
+
+THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE = 1, 2, 3, 4, 5
+
+# 3 ** 10 windows is the largest table worth building.
+MAX_WIN_LENGTH = 10
+
+Threat = namedtuple("Threat", ["kind", "line", "cells"])
+LineThreats = namedtuple("LineThreats", ["kind", "gains", "makes"])
+
+
+@lru_cache(maxsize=None)
+def pattern_lines(board_size: int, win_length: int) -> Tuple[Tuple, Tuple]:
+    """Precompute the full lines of the board that are long enough to win on.
+
+    Args:
+        board_size (int): size of n x n board.
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: The cells of every line in order, and for each cell the
+            (line id, position in the line) of the lines through it.
+    """
+    lines = []
+    lines_through = [[] for _ in range(board_size * board_size)]
+    for x_step, y_step in DIRECTIONS:
+        for x_start in range(board_size):
+            for y_start in range(board_size):
+                x_before, y_before = x_start - x_step, y_start - y_step
+                if 0 <= x_before < board_size and 0 <= y_before < board_size:
+                    continue
+                cells = []
+                x_coord, y_coord = x_start, y_start
+                while 0 <= x_coord < board_size and 0 <= y_coord < board_size:
+                    cells.append(x_coord * board_size + y_coord)
+                    x_coord, y_coord = x_coord + x_step, y_coord + y_step
+                if len(cells) < win_length:
+                    continue
+                for position, cell in enumerate(cells):
+                    lines_through[cell].append((len(lines), position))
+                lines.append(tuple(cells))
+    return tuple(lines), tuple(tuple(entries) for entries in lines_through)
+
+
+@lru_cache(maxsize=None)
+def window_table(win_length: int) -> Tuple:
+    """Classify every window of win_length cells for both players.
+
+    Digit i of a window code is its cell i. A window blocked by a point of the
+    other player, or with fewer than win_length - 2 points, can not become a four
+    with one move and is classified as None.
+
+    Args:
+        win_length (int): number of consecutive points needed to win.
+
+    Returns:
+        tuple: For each window code, a pair (one per player digit 1 and 2) of
+            None or (number of points, offsets of the empty cells).
+    """
+    table = []
+    for code in range(3**win_length):
+        digits = []
+        for _ in range(win_length):
+            code, digit = divmod(code, 3)
+            digits.append(digit)
+        empties = tuple(offset for offset, digit in enumerate(digits) if not digit)
+        entry = []
+        for player_digit in (1, 2):
+            points = digits.count(player_digit)
+            if points + len(empties) == win_length and points >= win_length - 2:
+                entry.append((points, empties))
+            else:
+                entry.append(None)
+        table.append(tuple(entry) if any(entry) else None)
+    return tuple(table)
+
+
+def _classify(five: bool, gains: Set[int], makes: Dict[int, Set[int]]) -> int:
+    """Threat class of a line from what its windows hold, 0 if there is none."""
+    if five:
+        return FIVE
+    if len(gains) > 1:
+        return OPEN_FOUR
+    if gains:
+        return FOUR
+    if any(len(created) > 1 for created in makes.values()):
+        return OPEN_THREE
+    if makes:
+        return THREE
+    return 0
+
+
+class PatternIndex:  # pylint: disable=too-many-instance-attributes
+    """The threats of both players, updated for the 4 lines through each move.
+
+    For every line a player has threats on, the index keeps the threat class, the
+    gain cells (where a point makes five) and the cells that make a four, with
+    the gain cell each of them creates. Use `from_game` to index a game and follow
+    its moves, or `put` and `remove` to try moves, as the threat search does.
+
+    Observers are not called on `undo`, `restore` or `reset_board`, so an index
+    following a game is rebuilt from the board when the move count of the game
+    is not the one it last indexed.
+    """
+
+    def __init__(self, board_size=15, win_length=5, player_indexes=(1, 2)):
+        """Init for Pattern Index Class."""
+        if len(player_indexes) != 2:
+            raise Exception("Threats are only defined for two players.")
+        if win_length > MAX_WIN_LENGTH:
+            raise Exception(f"Win length above {MAX_WIN_LENGTH} is not supported.")
+        self.board_size = board_size
+        self.win_length = win_length
+        self.player_indexes = tuple(player_indexes)
+        self.cells = [0] * (board_size * board_size)
+        self._lines, self._lines_through = pattern_lines(board_size, win_length)
+        self._table = window_table(win_length)
+        self._span = 3**win_length
+        self._powers = [3**position for position in range(board_size)]
+        self.codes = [0] * len(self._lines)
+        self._threats: List[Dict[int, LineThreats]] = [{}, {}]
+        self._game: Optional[TicTacToe] = None
+        self._move_count = 0
+
+    @classmethod
+    def from_game(cls, game: TicTacToe, follow=True) -> "PatternIndex":
+        """Index the points of a game, and its next moves if `follow` is True."""
+        if game.rows != game.cols:
+            raise Exception("Threats are only indexed on square boards.")
+        if not game.allow_overline:
+            raise Exception("Threats are only indexed for games where overlines win.")
+        index = cls(game.board_size, game.win_length, game.player_indexes)
+        index._load(game)
+        if follow:
+            index._game = game
+            game.add_observer(index)
+        return index
+
+    def _load(self, game: TicTacToe) -> None:
+        """Index the points of a game from scratch."""
+        self.cells = [0] * len(self.cells)
+        self.codes = [0] * len(self._lines)
+        self._threats = [{}, {}]
+        for cell, value in enumerate(game.board.ravel().tolist()):
+            if value:
+                self.put(cell, int(value))
+        self._move_count = game.move_count
+
+    def _sync(self) -> None:
+        """Rebuild the index if the game followed took moves back since."""
+        if self._game is not None and self._game.move_count != self._move_count:
+            self._load(self._game)
+
+    def __call__(self, game, player_index, x_coordinate, y_coordinate, won_player):
+        """Observer of a `TicTacToe` game, index the move."""
+        # pylint: disable=unused-argument
+        if game.move_count != self._move_count + 1:
+            self._load(game)
+            return
+        self.put(x_coordinate * self.board_size + y_coordinate, player_index)
+        self._move_count = game.move_count
+
+    def put(self, cell: int, player_index: int) -> None:
+        """Index a point of `player_index` at the flat cell x * board_size + y."""
+        digit = self.player_indexes.index(player_index) + 1
+        self.cells[cell] = digit
+        for line_id, position in self._lines_through[cell]:
+            self.codes[line_id] += digit * self._powers[position]
+            self._evaluate(line_id)
+
+    def remove(self, cell: int) -> None:
+        """Take back the point at a flat cell."""
+        digit = self.cells[cell]
+        self.cells[cell] = 0
+        for line_id, position in self._lines_through[cell]:
+            self.codes[line_id] -= digit * self._powers[position]
+            self._evaluate(line_id)
+
+    def _evaluate(self, line_id: int) -> None:
+        """Re-read the windows of one line and update the threats of both players."""
+        # pylint: disable=too-many-locals
+        cells = self._lines[line_id]
+        code = self.codes[line_id]
+        found = ([False, set(), {}], [False, set(), {}])
+        for start in range(len(cells) - self.win_length + 1):
+            entry = self._table[code % self._span]
+            code //= 3
+            if entry is None:
+                continue
+            for slot, pattern in enumerate(entry):
+                if pattern is None:
+                    continue
+                points, empties = pattern
+                if points == self.win_length:
+                    found[slot][0] = True
+                elif points == self.win_length - 1:
+                    found[slot][1].add(cells[start + empties[0]])
+                else:
+                    first, second = (cells[start + offset] for offset in empties)
+                    found[slot][2].setdefault(first, set()).add(second)
+                    found[slot][2].setdefault(second, set()).add(first)
+
+        for slot, (five, gains, makes) in enumerate(found):
+            kind = _classify(five, gains, makes)
+            if kind:
+                self._threats[slot][line_id] = LineThreats(kind, gains, makes)
+            else:
+                self._threats[slot].pop(line_id, None)
+
+    def _slot(self, player_index: int) -> int:
+        """Position of a player in `player_indexes`."""
+        return self.player_indexes.index(player_index)
+
+    def threats(self, player_index: int) -> List[Threat]:
+        """Return the threats of a player, strongest first.
+
+        The cells of a four are its gain cells and the cells of a three are the
+        moves that turn it into a four, as (x, y). A five has no cells.
+
+        Returns:
+            list: A Threat(kind, line, cells) per line holding a threat.
+        """
+        self._sync()
+        threats = []
+        for line_id, line in self._threats[self._slot(player_index)].items():
+            cells = line.makes
+            if line.kind == FIVE:
+                cells = ()
+            elif line.kind >= FOUR:
+                cells = line.gains
+            threats.append(
+                Threat(
+                    line.kind,
+                    line_id,
+                    tuple(divmod(cell, self.board_size) for cell in sorted(cells)),
+                )
+            )
+        threats.sort(key=lambda threat: (-threat.kind, threat.line))
+        return threats
+
+    def winning_cells(self, player_index: int) -> Set[int]:
+        """The empty cells where a point of the player makes win_length in a row."""
+        self._sync()
+        gains = set()
+        for line in self._threats[self._slot(player_index)].values():
+            gains |= line.gains
+        return gains
+
+    def four_moves(self, player_index: int) -> Set[int]:
+        """The empty cells where a point of the player makes a four."""
+        self._sync()
+        moves = set()
+        for line in self._threats[self._slot(player_index)].values():
+            moves.update(line.makes)
+        return moves
+
+    def has_five(self, player_index: int) -> bool:
+        """Whether the player already has win_length points in a row."""
+        self._sync()
+        return any(
+            line.kind == FIVE
+            for line in self._threats[self._slot(player_index)].values()
+        )
+
+
+def _vcf(
+    index: PatternIndex, attacker: int, defender: int, depth: int, line: List[int]
+) -> bool:
+    """Search wins by continuous fours for `attacker`, who is to move.
+
+    Every attacking move makes a four, so the defender has a single reply: the
+    gain cell. On success `line` holds the moves from here, ending with a move
+    that makes five or two gain cells at once.
+    """
+    wins = index.winning_cells(attacker)
+    if wins:
+        line.append(min(wins))
+        return True
+    blocks = index.winning_cells(defender)
+    if depth == 0 or len(blocks) > 1:
+        return False
+
+    candidates = index.four_moves(attacker)
+    if blocks:
+        candidates &= blocks
+    for move in sorted(candidates):
+        index.put(move, attacker)
+        gains = index.winning_cells(attacker)
+        found = False
+        rest: List[int] = []
+        if not index.winning_cells(defender):
+            if len(gains) > 1:
+                found = True
+            else:
+                reply = gains.pop()
+                index.put(reply, defender)
+                found = _vcf(index, attacker, defender, depth - 1, rest)
+                index.remove(reply)
+                rest.insert(0, reply)
+        index.remove(move)
+        if found:
+            line.extend([move] + rest)
+            return True
+    return False
+
+
+def find_vcf(
+    game: TicTacToe, player_index: Optional[int] = None, max_depth=12
+) -> Optional[List[Tuple[int, int]]]:
+    """Find a forced win by continuous fours (victory by continuous fours, VCF).
+
+    Args:
+        game (TicTacToe): The game to search, it is not modified.
+        player_index (int): The attacker, the player to move by default.
+        max_depth (int): The largest number of fours to play.
+
+    Returns:
+        list: The (x, y) moves of the attacker and the forced replies, ending
+            with a move that makes five or two gain cells at once, or None if
+            there is no such win.
+    """
+    players = list(game.player_indexes)
+    if player_index is None:
+        player_index = players[0]
+        if game.last_played_by in players:
+            player_index = players[1 - players.index(game.last_played_by)]
+    defender = players[1 - players.index(player_index)]
+    index = PatternIndex.from_game(game, follow=False)
+    line: List[int] = []
+    if not _vcf(index, player_index, defender, max_depth, line):
+        return None
+    return [divmod(cell, game.board_size) for cell in line]
@@ -0,0 +1,502 @@
+"""Module implementing matches and round-robin tournaments between agents.
+
+    python -m src.tournament random search:2 "cmd:python my_agent.py" --games 100
+
+Agents are given by spec: `random`, `search[:depth]` (alpha-beta search),
+`mcts[:playouts]` (Monte Carlo Tree Search) or `cmd:<command>`, an external
+program speaking a line protocol on its standard input and output. It is sent
+
+    MOVE <rows> <cols> <win_length> <player> <milliseconds> <cells>
+
+with the board row by row as digits and 0 milliseconds for no time limit, and
+answers `<x> <y>`. It must exit at the end of its input. Games are played with
+the rules of `TicTacToe` without rendering, spread over a process pool, and an
+illegal move or a move over the time limit loses the game.
+"""
+import argparse
+import math
+import os
+import random
+import select
+import shlex
+import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src import mcts, search
+from src.board import DRAW, ONGOING, TicTacToe
+
+# Seconds a move may take over the time limit, for process and pipe overheads.
+GRACE = 0.05
+
+Config = namedtuple("Config", ["board_size", "win_length", "move_time"])
+GameResult = namedtuple("GameResult", ["first", "second", "winner", "moves", "reason"])
+Standing = namedtuple(
+    "Standing",
+    [
+        "agent",
+        "games",
+        "wins",
+        "draws",
+        "losses",
+        "score",
+        "score_low",
+        "score_high",
+        "elo",
+        "elo_low",
+        "elo_high",
+    ],
+)
+
+
+class AgentError(Exception):
+    """Raised when an external agent exits or answers something else than a move."""
+
+
+class AgentTimeout(AgentError):
+    """Raised when an external agent does not answer in time."""
+
+
+class RandomAgent:
+    """Plays a uniformly random legal move."""
+
+    def new_game(self) -> None:
+        """Forget the previous game."""
+
+    def move(
+        self, game: TicTacToe, rng: random.Random, time_limit: Optional[float]
+    ) -> Tuple[int, int]:
+        """Return the move to play."""
+        # pylint: disable=unused-argument
+        return game.random_legal_move(rng)
+
+
+class SearchAgent:
+    """Plays the best move of an alpha-beta search, within the time limit.
+
+    The transposition table is kept for all the moves of a game, and cleared for
+    the next one so that games do not depend on the ones played before.
+    """
+
+    def __init__(self, depth: Optional[int] = None):
+        """Init for Search Agent Class."""
+        self.depth = depth
+        self.searcher = search.Searcher()
+
+    def new_game(self) -> None:
+        """Start with an empty transposition table."""
+        self.searcher = search.Searcher()
+
+    def move(
+        self, game: TicTacToe, rng: random.Random, time_limit: Optional[float]
+    ) -> Tuple[int, int]:
+        """Return the move to play."""
+        # pylint: disable=unused-argument
+        return self.searcher.search(game, depth=self.depth, time_limit=time_limit)
+
+
+class MCTSAgent:
+    """Plays the most visited move of a Monte Carlo Tree Search."""
+
+    def __init__(self, playouts=1000):
+        """Init for MCTS Agent Class."""
+        self.playouts = playouts
+
+    def new_game(self) -> None:
+        """Forget the previous game, every search starts from a new tree."""
+
+    def move(
+        self, game: TicTacToe, rng: random.Random, time_limit: Optional[float]
+    ) -> Tuple[int, int]:
+        """Return the move to play."""
+        seed = rng.randrange(1 << 30)
+        return mcts.best_move(game, self.playouts, time_limit, seed=seed).move
+
+
+class SubprocessAgent:
+    """An external program asked for every move over its standard input.
+
+    The program is started for the first game and kept for the next ones. If it
+    exits during a game or does not answer in time it loses that game, and it is
+    started again for the next one.
+    """
+
+    def __init__(self, command: str):
+        """Init for Subprocess Agent Class."""
+        self.command = shlex.split(command)
+        self.process = None
+
+    def new_game(self) -> None:
+        """Start the program, again if it exited or was stopped in the last game."""
+        if self.process is not None and self.process.poll() is not None:
+            self.close()
+        if self.process is None:
+            self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+
+    def move(
+        self, game: TicTacToe, rng: random.Random, time_limit: Optional[float]
+    ) -> Tuple[int, int]:
+        """Send the position, return the move the program answers.
+
+        Raises:
+            AgentTimeout: If the answer takes longer than the time limit.
+            AgentError: If the program exits or does not answer two integers.
+        """
+        # pylint: disable=unused-argument
+        if self.process is None:
+            raise AgentError(f"{self.command[0]} is not running.")
+        cells = "".join(str(int(value)) for value in game.board.ravel().tolist())
+        milliseconds = 0 if time_limit is None else int(time_limit * 1000)
+        try:
+            self.process.stdin.write(
+                f"MOVE {game.rows} {game.cols} {game.win_length} "
+                f"{game.player_to_move() or game.player_indexes[0]} {milliseconds} "
+                f"{cells}\n"
+            )
+            self.process.stdin.flush()
+        except BrokenPipeError as error:
+            self.close()
+            raise AgentError(f"{self.command[0]} exited.") from error
+        timeout = None if time_limit is None else time_limit + GRACE
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            self.process.kill()
+            self.close()
+            raise AgentTimeout(f"No answer from {self.command[0]} in time.")
+        line = self.process.stdout.readline()
+        if not line:
+            self.close()
+            raise AgentError(f"{self.command[0]} exited.")
+        answer = line.split()
+        if len(answer) != 2 or not all(value.lstrip("-").isdigit() for value in answer):
+            raise AgentError(f"Expected a move from {self.command[0]}: {answer}")
+        return int(answer[0]), int(answer[1])
+
+    def close(self) -> None:
+        """Stop the program."""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+def make_agent(spec: str):
+    """Create the agent of a spec, see the module docstring."""
+    name, _, argument = spec.partition(":")
+    if name == "random":
+        return RandomAgent()
+    if name == "search":
+        return SearchAgent(int(argument) if argument else None)
+    if name == "mcts":
+        return MCTSAgent(int(argument) if argument else 1000)
+    if name == "cmd" and argument:
+        return SubprocessAgent(argument)
+    raise Exception(
+        f"Unknown agent: {spec}. Must be random, search[:depth], mcts[:playouts] "
+        "or cmd:<command>"
+    )
+
+
+# The agents of this process by spec, kept for all the games it plays.
+_agents: Dict[str, object] = {}
+
+
+def _agent(spec: str):
+    """The agent of this process for a spec, created on first use."""
+    if spec not in _agents:
+        _agents[spec] = make_agent(spec)
+    return _agents[spec]
+
+
+def close_agents() -> None:
+    """Stop the external programs of this process."""
+    for agent in _agents.values():
+        if isinstance(agent, SubprocessAgent):
+            agent.close()
+    _agents.clear()
+
+
+def play_game(config: Config, first: str, second: str, seed: int) -> GameResult:
+    """Play one game, `first` moving first.
+
+    Returns:
+        GameResult: The winner is 1 for `first`, 2 for `second` and 0 for a draw,
+            and the reason is "win", "draw", "illegal" or "time". An external
+            agent that exits or answers something else than a move plays an
+            illegal move, other errors of the agents are raised.
+    """
+    agents = (_agent(first), _agent(second))
+    for agent in agents:
+        agent.new_game()
+    game = TicTacToe(config.board_size, config.win_length, "incremental")
+    rng = random.Random(seed)
+    while game.status() == ONGOING:
+        slot = game.move_count % 2
+        start = time.perf_counter()
+        try:
+            move = agents[slot].move(game, rng, config.move_time)
+        except AgentTimeout:
+            return GameResult(first, second, 2 - slot, game.move_count, "time")
+        except AgentError:
+            return GameResult(first, second, 2 - slot, game.move_count, "illegal")
+        elapsed = time.perf_counter() - start
+        if config.move_time is not None and elapsed > config.move_time + GRACE:
+            return GameResult(first, second, 2 - slot, game.move_count, "time")
+        if not game.is_move_valid(game.player_indexes[slot], *move):
+            return GameResult(first, second, 2 - slot, game.move_count, "illegal")
+        game.place(game.player_indexes[slot], *move)
+    if game.status() == DRAW:
+        return GameResult(first, second, 0, game.move_count, "draw")
+    return GameResult(first, second, game.status(), game.move_count, "win")
+
+
+def play_chunk(config: Config, tasks: List[Tuple[str, str, int]]) -> List[GameResult]:
+    """Play the (first, second, seed) games of a chunk, then stop the agents."""
+    try:
+        return [play_game(config, *task) for task in tasks]
+    finally:
+        close_agents()
+
+
+def schedule(agents: Sequence[str], games: int) -> List[Tuple[str, str]]:
+    """Every pair of agents plays `games` games, taking turns to move first."""
+    pairings = []
+    for one, other in combinations(agents, 2):
+        for game in range(games):
+            pairings.append((one, other) if game % 2 == 0 else (other, one))
+    return pairings
+
+
+def run_tournament(
+    agents: Sequence[str],
+    games: int,
+    board_size=3,
+    win_length=3,
+    move_time: Optional[float] = None,
+    workers=1,
+    **options,
+) -> Dict:
+    """Play a round-robin tournament, a match if there are two agents.
+
+    Args:
+        agents (list): The agent specs, see the module docstring.
+        games (int): Number of games of every pair of agents.
+        board_size (int): size of n x n board.
+        win_length (int): number of consecutive points needed to win.
+        move_time (float): Seconds per move, unlimited if None.
+        workers (int): Number of processes, games are played in process if 1.
+        **options: seed (None for a random one), chunk (games per task,
+            default 50).
+
+    Returns:
+        dict: The GameResult of every game in schedule order, the seed, the
+            seconds and the games per minute.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    if len(set(agents)) < 2:
+        raise Exception("A tournament needs at least two different agents.")
+    for spec in agents:
+        make_agent(spec)
+    seed = options.get("seed")
+    if seed is None:
+        seed = random.SystemRandom().randrange(1 << 30)
+    config = Config(board_size, win_length, move_time)
+    tasks = [
+        (first, second, seed * 1_000_003 + index)
+        for index, (first, second) in enumerate(schedule(agents, games))
+    ]
+    chunk = options.get("chunk", 50)
+    chunks = [tasks[start : start + chunk] for start in range(0, len(tasks), chunk)]
+
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        for tasks_chunk in chunks:
+            results.extend(play_chunk(config, tasks_chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_results in executor.map(partial(play_chunk, config), chunks):
+                results.extend(chunk_results)
+    elapsed = time.perf_counter() - start
+    return {
+        "results": results,
+        "seed": seed,
+        "seconds": elapsed,
+        "games_per_minute": len(results) * 60 / elapsed if elapsed else float("inf"),
+    }
+
+
+def elo_difference(score: float) -> float:
+    """The Elo difference expected to score `score` (1 a win, 0.5 a draw) a game.
+
+    Scores of 0 and 1 are clamped, their difference is unbounded.
+    """
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def score_interval(scores: Sequence[float], z=1.96) -> Tuple[float, float, float]:
+    """The mean of per game scores and its Wilson score interval, 95% by default.
+
+    Draws make the scores less spread than wins and losses alone, so the
+    interval is on the wide side, and unlike the normal one it does not shrink
+    to nothing when every game ends the same.
+    """
+    count = len(scores)
+    mean = sum(scores) / count
+    spread = z * z / count
+    centre = (mean + spread / 2) / (1 + spread)
+    margin = z * math.sqrt(mean * (1 - mean) / count + spread / count / 4)
+    margin /= 1 + spread
+    return mean, max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+def _scores(results: Sequence[GameResult]) -> Dict[Tuple[str, str], List[float]]:
+    """The per game scores of every agent against every other one."""
+    scores: Dict[Tuple[str, str], List[float]] = {}
+    for result in results:
+        first_score = {0: 0.5, 1: 1.0, 2: 0.0}[result.winner]
+        scores.setdefault((result.first, result.second), []).append(first_score)
+        scores.setdefault((result.second, result.first), []).append(1 - first_score)
+    return scores
+
+
+def fit_elo(results: Sequence[GameResult], iterations=500) -> Dict[str, float]:
+    """Fit Bradley-Terry ratings to the results, draws as half a win each.
+
+    Every pair of agents is given one virtual draw, so an agent that won or lost
+    every game still has a finite rating. The ratings are in Elo points with a
+    mean of 0.
+    """
+    scores = _scores(results)
+    agents = sorted({agent for agent, _ in scores})
+    won = {agent: 0.0 for agent in agents}
+    played: Dict[Tuple[str, str], float] = {}
+    for (agent, other), games in scores.items():
+        won[agent] += sum(games) + 0.5
+        played[agent, other] = len(games) + 1
+    strengths = {agent: 1.0 for agent in agents}
+    for _ in range(iterations):
+        for agent in agents:
+            strengths[agent] = won[agent] / sum(
+                count / (strengths[agent] + strengths[other])
+                for (one, other), count in played.items()
+                if one == agent
+            )
+        mean = sum(math.log10(value) for value in strengths.values()) / len(agents)
+        strengths = {agent: value / 10**mean for agent, value in strengths.items()}
+    return {agent: 400 * math.log10(value) for agent, value in strengths.items()}
+
+
+def _standing(agent: str, scores: List[float], elo: float) -> Standing:
+    """A table row, the Elo interval is the score interval through the Elo curve."""
+    score, low, high = score_interval(scores)
+    return Standing(
+        agent,
+        len(scores),
+        scores.count(1.0),
+        scores.count(0.5),
+        scores.count(0.0),
+        score,
+        low,
+        high,
+        elo,
+        elo + elo_difference(low) - elo_difference(score),
+        elo + elo_difference(high) - elo_difference(score),
+    )
+
+
+def standings(results: Sequence[GameResult]) -> List[Standing]:
+    """Every agent with its results, score and fitted Elo, best first."""
+    per_agent: Dict[str, List[float]] = {}
+    for (agent, _), games in _scores(results).items():
+        per_agent.setdefault(agent, []).extend(games)
+    ratings = fit_elo(results)
+    rows = [
+        _standing(agent, games, ratings[agent]) for agent, games in per_agent.items()
+    ]
+    return sorted(rows, key=lambda row: -row.elo)
+
+
+def pair_table(results: Sequence[GameResult]) -> List[Standing]:
+    """Every pair of agents, with the Elo difference of their score."""
+    rows = []
+    for (agent, other), games in sorted(_scores(results).items()):
+        if agent < other:
+            score = sum(games) / len(games)
+            rows.append(_standing(f"{agent} vs {other}", games, elo_difference(score)))
+    return rows
+
+
+def format_table(rows: Sequence[Standing]) -> str:
+    """The rows as a text table with 95% confidence intervals."""
+    width = max([len("agent")] + [len(row.agent) for row in rows])
+    lines = [
+        f"{'agent':<{width}} {'games':>6} {'W':>5} {'D':>5} {'L':>5}   "
+        f"{'score [95% CI]':<21} {'Elo [95% CI]'}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row.agent:<{width}} {row.games:>6} {row.wins:>5} {row.draws:>5} "
+            f"{row.losses:>5}   {row.score:.3f} [{row.score_low:.3f}, "
+            f"{row.score_high:.3f}]   {row.elo:+.0f} [{row.elo_low:+.0f}, "
+            f"{row.elo_high:+.0f}]"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    """Command line entry point, `python -m src.tournament`."""
+    parser = argparse.ArgumentParser(description="Play matches and tournaments.")
+    parser.add_argument("agents", nargs="+", help="agent specs, at least two")
+    parser.add_argument("--games", type=int, default=100, help="games per pair")
+    parser.add_argument("--board-size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=3)
+    parser.add_argument("--move-time", type=float, help="seconds per move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=50)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    stats = run_tournament(
+        args.agents,
+        args.games,
+        args.board_size,
+        args.win_length,
+        args.move_time,
+        args.workers,
+        seed=args.seed,
+        chunk=args.chunk,
+    )
+    results = stats["results"]
+    print(format_table(standings(results)))
+    print()
+    print(format_table(pair_table(results)))
+    reasons: Dict[str, int] = {}
+    for result in results:
+        reasons[result.reason] = reasons.get(result.reason, 0) + 1
+    print()
+    print(
+        f"{len(results)} games in {stats['seconds']:.1f} s, "
+        f"{stats['games_per_minute']:.0f} games/min (seed {stats['seed']}), "
+        + ", ".join(f"{count} {reason}" for reason, count in sorted(reasons.items()))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Test Module for the batched Tic Tac Toe games."""
+import numpy as np
+import pytest
+
+from src.batch import DRAW, ONGOING, BatchTicTacToe
+from src.board import TicTacToe
+
+
+def test_batch_rejects_illegal_moves():
+    """Test that illegal moves are reported with the games they were played in."""
+    batch = BatchTicTacToe(3)
+    batch.play([1, 2, 1], [0, 0, 0], [0, 0, 0])
+    with pytest.raises(Exception, match=r"games: \[0, 2\]"):
+        batch.play([1, 1, 2], [1, 1, 0], [1, 1, 0])
+
+
+def test_batch_rejects_unsupported_games():
+    """Test that only two player games on square boards are batched."""
+    with pytest.raises(Exception, match="two players"):
+        BatchTicTacToe(2, num_players=3)
+    with pytest.raises(Exception, match="square boards"):
+        BatchTicTacToe(2, board_size=(3, 4))
+    with pytest.raises(Exception, match="less than board size"):
+        BatchTicTacToe(2, win_length=4)
+
+
+def test_batch_ignores_finished_games():
+    """Test that a won game keeps its status while others carry on."""
+    batch = BatchTicTacToe(2)
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 0), (1, 0, 1)]:
+        batch.play([player_index] * 2, [x_coord] * 2, [y_coord] * 2)
+    batch.play([2, 2], [1, 1], [1, 1])
+    status = batch.play([1, 1], [0, 2], [2, 2])
+    assert status.tolist() == [1, ONGOING]
+    status = batch.play([2, 2], [-1, 1], [-1, 2])
+    assert status.tolist() == [1, 2]
+
+
+@pytest.mark.parametrize("board_size,win_length", [(3, 3), (4, 3), (5, 4), (7, 5)])
+def test_batch_matches_scalar_games(board_size, win_length):
+    """Test random games in a batch end the same as one game at a time."""
+    num_games = 64
+    rng = np.random.default_rng(board_size * 10 + win_length)
+    orders = np.argsort(rng.random([num_games, board_size * board_size]), axis=1)
+    first = rng.integers(1, 3, num_games)
+
+    batch = BatchTicTacToe(num_games, board_size, win_length)
+    expected = np.full(num_games, ONGOING)
+    for game_index in range(num_games):
+        game = TicTacToe(board_size, win_length)
+        for step, cell in enumerate(orders[game_index]):
+            player_index = (first[game_index] + step - 1) % 2 + 1
+            winner = game.place(player_index, *divmod(int(cell), board_size))
+            if winner:
+                expected[game_index] = winner
+                break
+        else:
+            expected[game_index] = DRAW
+
+    for step in range(board_size * board_size):
+        status = batch.play(
+            (first + step - 1) % 2 + 1, *np.divmod(orders[:, step], board_size)
+        )
+    assert status.tolist() == expected.tolist()
+    batch.reset_board()
+    assert not batch.boards.any()
+    assert (batch.status == ONGOING).all()
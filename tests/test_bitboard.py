@@ -0,0 +1,98 @@
+"""Test Module for the bitboard Tic Tac Toe backend."""
+import random
+
+import numpy as np
+import pytest
+
+from src.bitboard import BitboardTicTacToe, win_masks
+from src.board import TicTacToe
+
+
+def test_win_masks_3x3():
+    """Test the 3x3 centre lies on 4 lines and a corner on 3."""
+    masks = win_masks(3, 3)
+    assert len(masks[4]) == 4
+    assert len(masks[0]) == 3
+    assert 0b111 in masks[0]
+    assert 0b100010001 in masks[0]
+
+
+def test_board_round_trips_through_bitboards():
+    """Test that a NumPy board can be loaded and read back."""
+    game = BitboardTicTacToe(4, 3)
+    board = np.zeros([4, 4])
+    board[1, 2] = 1
+    board[3, 0] = 2
+    game.board = board
+    assert np.array_equal(game.board, board)
+    assert game.is_grid_occupied(1, 2)
+    assert not game.is_grid_occupied(2, 1)
+
+
+def test_assigning_a_board_resets_the_hash_and_turn():
+    """Test that a loaded board hashes like the same points played on it."""
+    game = BitboardTicTacToe(4, 3)
+    game.place(1, 0, 0)
+    game.place(2, 3, 3)
+    board = np.zeros([4, 4])
+    board[1, 2] = 1
+    board[3, 0] = 2
+    game.board = board
+    played = TicTacToe(4, 3)
+    played.place(1, 1, 2)
+    played.place(2, 3, 0)
+    assert game.zobrist_hash == played.zobrist_hash
+    assert game.canonical_key() == played.canonical_key()
+    assert game.last_played_by is None and game.player_to_move() is None
+    assert game.place(2, 0, 0) == 0 and game.move_count == 3
+    assert game.undo() == (2, 0, 0)
+    assert game.zobrist_hash == played.zobrist_hash
+    with pytest.raises(Exception, match="No move to undo"):
+        game.undo()
+
+
+def test_check_valid_move_on_taken_position():
+    """Test occupancy from the bitboards is reported by check_valid_move."""
+    game = BitboardTicTacToe()
+    game.play_one_step(1, 1, 1)
+    assert game.check_valid_move(2, 1, 1) == ["Position: 1, 1 is already taken!"]
+    game.reset_board()
+    assert not game.check_valid_move(2, 1, 1)
+
+
+@pytest.mark.parametrize("board_size,win_length", [(3, 3), (4, 3), (5, 4), (8, 5)])
+def test_matches_recursive_on_random_games(board_size, win_length):
+    """Test the bitboard finds the same winners as the recursive method."""
+    rng = random.Random(board_size * 10 + win_length)
+    for _ in range(20):
+        cells = [(x, y) for x in range(board_size) for y in range(board_size)]
+        rng.shuffle(cells)
+        reference = TicTacToe(board_size, win_length)
+        game = BitboardTicTacToe(board_size, win_length)
+        for i, (x_coord, y_coord) in enumerate(cells):
+            player_index = i % 2 + 1
+            expected = reference.play_one_step(player_index, x_coord, y_coord)
+            assert game.play_one_step(player_index, x_coord, y_coord) == expected
+            if expected:
+                break
+
+
+def test_branch_and_undo():
+    """Test a branch of a bitboard game plays and undoes on its own bitboards."""
+    game = BitboardTicTacToe(4, 3)
+    game.place(1, 0, 0)
+    game.place(2, 3, 3)
+    branch = game.branch()
+    branch.place(1, 0, 1)
+    assert branch.place(2, 2, 2) == 0
+    assert branch.place(1, 0, 2) == 1
+    assert game.status() == 0
+    assert not game.is_grid_occupied(0, 1)
+    assert branch.undo() == (1, 0, 2)
+    assert branch.status() == 0
+    assert branch.board.tolist() == [
+        [1, 1, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 2, 0],
+        [0, 0, 0, 2],
+    ]
@@ -1,9 +1,11 @@
 """Test Module for Tic Tac Toe Class."""
+
 # pylint: disable=protected-access
 import pytest
 
 import numpy as np
 from src.board import TicTacToe
+from src.engines import IncrementalWinEngine
 
 
 @pytest.mark.parametrize("board_size", list(range(-1, 2)))
@@ -295,3 +297,194 @@ def test_recursive_function_in_four_connected_scenario():
     path = [[1, 0]]
     board._find_path([1, 0], (0, 1), path)
     assert len(path) == 3
+
+
+def test_board_fails_with_unknown_win_engine():
+    """Test that an unknown win engine is rejected."""
+    with pytest.raises(Exception, match="Unknown win engine: bogus"):
+        TicTacToe(win_engine="bogus")
+
+
+def test_incremental_engine_joins_runs_either_side():
+    """Test a point placed between two runs joins them into one run."""
+    engine = IncrementalWinEngine(board_size=5, player_indexes=[1, 2])
+    assert engine.place(1, 2, 0) == 1
+    assert engine.place(1, 2, 1) == 2
+    assert engine.place(1, 2, 4) == 1
+    assert engine.place(1, 2, 3) == 2
+    assert engine.place(1, 2, 2) == 5
+    assert engine.longest_run(1, 2, 2) == 5
+
+
+def test_incremental_engine_keeps_players_apart():
+    """Test runs of the other player do not count towards a run."""
+    engine = IncrementalWinEngine(board_size=3, player_indexes=[1, 2])
+    engine.place(2, 0, 0)
+    engine.place(2, 1, 1)
+    assert engine.place(1, 2, 2) == 1
+    engine.reset()
+    assert engine.place(2, 2, 2) == 1
+
+
+def test_zobrist_hash_is_order_independent_and_reset():
+    """Test the hash depends on the points only and is cleared on reset."""
+    first = TicTacToe()
+    second = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 1), (1, 2, 0)]:
+        first.place(player_index, x_coord, y_coord)
+    for player_index, x_coord, y_coord in [(1, 2, 0), (2, 1, 1), (1, 0, 0)]:
+        second.place(player_index, x_coord, y_coord)
+    assert first.zobrist_hash == second.zobrist_hash != 0
+    first.reset_board()
+    assert first.zobrist_hash == 0
+    assert first.canonical_key() == 0
+
+
+@pytest.mark.parametrize("board_size", [3, 4, 5])
+def test_canonical_key_is_shared_by_symmetric_boards(board_size):
+    """Test all 8 rotations and reflections of a board have the same key."""
+    moves = [(1, 0, 1), (2, 1, 2), (1, 0, 2)]
+    last = board_size - 1
+    images = [
+        lambda x, y: (x, y),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (last - y, x),
+        lambda x, y: (x, last - y),
+        lambda x, y: (last - x, y),
+        lambda x, y: (y, x),
+        lambda x, y: (last - y, last - x),
+    ]
+    keys = set()
+    hashes = set()
+    for image in images:
+        board = TicTacToe(board_size)
+        for player_index, x_coord, y_coord in moves:
+            board.place(player_index, *image(x_coord, y_coord))
+        keys.add(board.canonical_key())
+        hashes.add(board.zobrist_hash)
+    assert len(keys) == 1
+    assert len(hashes) == 8
+
+
+def test_compact_board_keeps_behaviour():
+    """Test an int8 board plays, wins and resets like the default one."""
+    board = TicTacToe(dtype=np.int8)
+    assert not hasattr(board, "__dict__")
+    assert board.board.dtype == np.int8
+    storage = board.board
+    for step, (x_coord, y_coord) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1)]):
+        assert board.play_one_step(step % 2 + 1, x_coord, y_coord, render=False) == 0
+    assert board.play_one_step(1, 0, 2, render=False) == 1
+    board.reset_board()
+    assert board.board is storage
+    assert not board.board.any()
+
+
+def test_board_storage_must_match_board_size():
+    """Test that external board storage has to be board_size x board_size."""
+    with pytest.raises(Exception):
+        TicTacToe(3, 3, board=np.zeros([4, 4], dtype=np.int8))
+
+
+def test_rectangular_board_validation():
+    """Test rectangular boards check the short side and the long side."""
+    with pytest.raises(Exception, match="Board size less than 3 is not allowed"):
+        TicTacToe((2, 9), 3)
+    with pytest.raises(Exception, match="Win length must be less than board size"):
+        TicTacToe((3, 5), 6)
+    with pytest.raises(Exception, match=r"Board must have shape \(3, 5\)"):
+        TicTacToe((3, 5), 3, board=np.zeros([5, 3], dtype=np.int8))
+    assert TicTacToe((4, 4)).board_size == 4
+    assert TicTacToe((3, 5), 5).board_size == (3, 5)
+
+
+def test_at_least_two_players():
+    """Test a game needs two players or more."""
+    with pytest.raises(Exception, match="At least 2 players are needed"):
+        TicTacToe(num_players=1)
+
+
+def test_check_valid_move_names_the_player_to_move():
+    """Test a move out of turn says whose turn it is."""
+    board = TicTacToe(4, num_players=4)
+    assert board.player_to_move() is None
+    assert not board.check_valid_move(3, 0, 0)
+    board.place(3, 0, 0)
+    assert board.player_to_move() == 4
+    assert board.check_valid_move(3, 1, 1) == [
+        "Player 3 has just been. Time for another player!"
+    ]
+    assert board.check_valid_move(1, 1, 1) == ["It is the turn of player 4."]
+    board.place(4, 1, 1)
+    assert board.is_players_turn(1)
+    assert not board.is_players_turn(2)
+
+
+def test_canonical_key_is_shared_by_rectangular_symmetries():
+    """Test the 4 symmetries of a 3x5 board have the same key."""
+    moves = [(1, 0, 1), (2, 1, 3), (1, 0, 2)]
+    images = [
+        lambda x, y: (x, y),
+        lambda x, y: (2 - x, 4 - y),
+        lambda x, y: (x, 4 - y),
+        lambda x, y: (2 - x, y),
+    ]
+    keys = set()
+    hashes = set()
+    for image in images:
+        board = TicTacToe((3, 5), 3)
+        for player_index, x_coord, y_coord in moves:
+            board.place(player_index, *image(x_coord, y_coord))
+        keys.add(board.canonical_key())
+        hashes.add(board.zobrist_hash)
+    assert len(keys) == 1
+    assert len(hashes) == 4
+
+
+def test_undo_needs_a_move():
+    """Test undo fails on a new game."""
+    with pytest.raises(Exception, match="No move to undo"):
+        TicTacToe().undo()
+
+
+def test_snapshot_and_restore():
+    """Test restore undoes the moves since a snapshot, and only those."""
+    board = TicTacToe(win_engine="incremental")
+    board.place(1, 1, 1)
+    token = board.snapshot()
+    board.place(2, 0, 0)
+    board.place(1, 0, 2)
+    board.restore(token)
+    assert board.board.tolist() == [[0, 0, 0], [0, 1, 0], [0, 0, 0]]
+    assert board.last_played_by == 1
+    board.restore(token)
+    board.undo()
+    board.place(1, 2, 2)
+    with pytest.raises(Exception, match="not in the history"):
+        board.restore(token)
+    board.undo()
+    with pytest.raises(Exception, match="not in the history"):
+        board.restore(token)
+
+
+def test_branch_shares_the_board_until_written():
+    """Test a branch and its game copy the shared board on their first write."""
+    board = TicTacToe(dtype=np.int8)
+    board.place(1, 1, 1)
+    first = board.branch()
+    second = board.branch()
+    assert first.board is board.board is second.board
+    first.place(2, 0, 0)
+    assert first.board is not board.board
+    assert board.board[0, 0] == 0
+    board.place(2, 2, 2)
+    assert second.board[2, 2] == 0
+    storage = second.board
+    second.place(2, 0, 2)
+    assert second.board is storage
+    assert second.board.dtype == np.int8
+    assert (first.move_count, board.move_count, second.move_count) == (2, 2, 2)
+    assert len({first.zobrist_hash, board.zobrist_hash, second.zobrist_hash}) == 3
+    assert first.undo() == (2, 0, 0)
+    assert first.board.tolist() == [[0, 0, 0], [0, 1, 0], [0, 0, 0]]
@@ -0,0 +1,94 @@
+"""Test Module for the evaluation cache and the opening book."""
+import pytest
+
+from src.board import TicTacToe
+from src.cache import ENTRY_BYTES, EvaluationCache, OpeningBook
+
+
+def game_with(moves, board_size=3):
+    """A game with the moves played in turn from player 1."""
+    game = TicTacToe(board_size)
+    for step, (x_coord, y_coord) in enumerate(moves):
+        game.place(step % 2 + 1, x_coord, y_coord)
+    return game
+
+
+def test_cache_hits_misses_and_lru_eviction():
+    """Test the least recently used entry is evicted first."""
+    cache = EvaluationCache(max_entries=2, fold_symmetries=False)
+    first, second, third = (game_with([move]) for move in [(0, 0), (0, 1), (1, 1)])
+    assert cache.get(first) is None
+    cache.put(first, 1, (1, 1))
+    cache.put(second, 2)
+    assert cache.get(first) == (1, (1, 1))
+    cache.put(third, 3)
+    assert cache.get(second) is None
+    assert cache.get(third) == (3, None)
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "hit_rate": 0.5,
+    }
+
+
+def test_cache_folds_symmetries_and_maps_moves_back():
+    """Test a move cached for one board is rotated for the rotated board."""
+    cache = EvaluationCache(max_entries=10)
+    cache.put(game_with([(0, 0), (0, 1)]), 5, (2, 2))
+    rotated = game_with([(0, 2), (1, 2)])
+    assert cache.get(rotated) == (5, (2, 0))
+    assert cache.get(game_with([(0, 0), (1, 1)])) is None
+
+
+def test_cache_key_includes_the_player_to_move():
+    """Test the same points with another player to move are another position."""
+    cache = EvaluationCache(max_entries=10)
+    game = TicTacToe()
+    game.place(2, 1, 1)
+    assert game.player_to_move() == 1
+    cache.put(game, 1)
+    other = TicTacToe()
+    other.place(2, 1, 1)
+    other.last_played_by = 1
+    assert cache.get(other) is None
+
+
+def test_cache_key_includes_the_variant():
+    """Test the same points in a game of another win length are another position."""
+    cache = EvaluationCache(max_entries=10, fold_symmetries=False)
+    game = TicTacToe(4, 3)
+    game.place(1, 1, 1)
+    cache.put(game, 7, (0, 0))
+    other = TicTacToe(4, 4)
+    other.place(1, 1, 1)
+    assert other.zobrist_hash == game.zobrist_hash
+    assert cache.get(other) is None
+    assert cache.get(game) == (7, (0, 0))
+
+
+def test_cache_memory_cap():
+    """Test the byte limit sets the number of entries."""
+    assert EvaluationCache(max_bytes=10 * ENTRY_BYTES).max_entries == 10
+    assert EvaluationCache(5, max_bytes=10 * ENTRY_BYTES).max_entries == 5
+    with pytest.raises(Exception):
+        EvaluationCache()
+
+
+def test_opening_book_round_trip(tmp_path):
+    """Test a built book answers the first plies and survives a round trip."""
+    book = OpeningBook.build(3, 3, plies=3)
+    path = str(tmp_path / "book.bin")
+    book.write(path)
+    loaded = OpeningBook.load(path)
+    assert loaded.moves == book.moves
+    assert (loaded.board_size, loaded.win_length, loaded.plies) == (3, 3, 3)
+    # Only the centre does not lose against a corner.
+    for corner in [(0, 0), (0, 2), (2, 0), (2, 2)]:
+        assert loaded.lookup(game_with([corner])) == (1, 1)
+    game = game_with([(0, 1), (1, 1)])
+    assert game.is_move_valid(1, *loaded.lookup(game))
+    assert loaded.lookup(game_with([(0, 0), (1, 1), (2, 2)])) is None
+    assert loaded.lookup(TicTacToe(4, 3)) is None
@@ -0,0 +1,106 @@
+"""Test Module for the pure Python flat bytearray backend."""
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.board import TicTacToe
+from src.flat import FlatTicTacToe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_game_does_not_import_numpy():
+    """Test a game can be imported and played without loading NumPy."""
+    script = (
+        "import sys\n"
+        "from src.flat import FlatTicTacToe\n"
+        "game = FlatTicTacToe(board_size=(4, 5), win_length=4)\n"
+        "for move in [(1, 0, 0), (2, 1, 0), (1, 0, 1), (2, 1, 1), (1, 0, 2)]:\n"
+        "    game.place(*move)\n"
+        "game.undo()\n"
+        "game.branch().legal_moves()\n"
+        "assert 'numpy' not in sys.modules, 'numpy was imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+
+
+@pytest.mark.parametrize(
+    "board_size,win_length,win_engine,allow_overline,num_players",
+    [
+        (3, 3, "iterative", True, 2),
+        (5, 4, "incremental", True, 2),
+        (7, 5, "iterative", False, 2),
+        ((4, 6), 4, "incremental", False, 2),
+        ((5, 4), 3, "iterative", True, 3),
+    ],
+)
+def test_flat_games_match_numpy_games(
+    board_size, win_length, win_engine, allow_overline, num_players
+):
+    """Test random games with undos end the same on both boards."""
+    # pylint: disable=too-many-arguments
+    rng = random.Random(5)
+    options = {
+        "board_size": board_size,
+        "win_length": win_length,
+        "win_engine": win_engine,
+        "allow_overline": allow_overline,
+        "num_players": num_players,
+    }
+    for _ in range(20):
+        flat = FlatTicTacToe(**options)
+        game = TicTacToe(**options)
+        while not game.status():
+            player_index = game.player_to_move() or 1
+            move = game.random_legal_move(rng)
+            assert flat.place(player_index, *move) == game.place(player_index, *move)
+            if rng.random() < 0.2:
+                assert flat.undo() == game.undo()
+            assert flat.status() == game.status()
+            assert flat.zobrist_hash == game.zobrist_hash
+            assert sorted(flat.legal_moves()) == sorted(game.legal_moves())
+        assert (flat.board == game.board).all()
+        assert flat.scan_winner() == game.scan_winner()
+
+
+def test_flat_board_can_be_loaded_branched_and_reset():
+    """Test the board setter, copy on branch and reset of the bytes."""
+    board = np.zeros((3, 4))
+    board[0, 1] = 2
+    board[2, 3] = 1
+    game = FlatTicTacToe(board_size=(3, 4))
+    game.board = board
+    assert game.cells == bytearray([0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1])
+    assert game.move_count == 2
+    assert (2, 3) not in game.legal_moves()
+    assert game.is_grid_occupied(0, 1)
+
+    child = game.branch()
+    child.place(1, 1, 1)
+    assert not game.is_grid_occupied(1, 1)
+    game.reset_board()
+    assert not any(game.cells)
+    assert child.cells.count(0) == 9
+    with pytest.raises(Exception, match="no recursive win engine"):
+        FlatTicTacToe(win_engine="recursive")
+
+
+def test_assigning_a_board_resets_the_hash_and_turn():
+    """Test a loaded board hashes and wins like the same points played on it."""
+    game = FlatTicTacToe(4, 3, win_engine="incremental")
+    game.place(1, 3, 3)
+    game.place(2, 0, 3)
+    board = np.zeros((4, 4))
+    board[0, 0] = board[0, 1] = 1
+    board[2, 2] = 2
+    game.board = board
+    played = TicTacToe(4, 3)
+    for move in [(1, 0, 0), (2, 2, 2), (1, 0, 1)]:
+        played.place(*move)
+    assert game.zobrist_hash == played.zobrist_hash
+    assert game.last_played_by is None and game.player_to_move() is None
+    assert game.place(1, 0, 2) == 1
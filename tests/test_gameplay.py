@@ -1,7 +1,17 @@
 """Module for testing Games of TicTacToe"""
+import random
+
 import pytest
 
-from src.board import TicTacToe
+from src.bitboard import BitboardTicTacToe
+from src.board import DRAW, ONGOING, WIN_ENGINES, TicTacToe, render_move
+
+
+def new_game(win_engine, board_size=3, win_length=3):
+    """Return a game with a win engine, or the bitboard backend for "bitboard"."""
+    if win_engine == "bitboard":
+        return BitboardTicTacToe(board_size, win_length)
+    return TicTacToe(board_size, win_length, win_engine=win_engine)
 
 
 @pytest.mark.parametrize(
@@ -18,14 +28,26 @@ from src.board import TicTacToe
         ),
     ],
 )
-def test_board_size_3_scenarios(player_indexes, x_coordinates, y_coordinates, expected):
+@pytest.mark.parametrize("win_engine", WIN_ENGINES + ("bitboard",))
+def test_board_size_3_scenarios(
+    player_indexes, x_coordinates, y_coordinates, expected, win_engine
+):
     """Test a series of game scenarios in 3x3 board"""
-    board = TicTacToe()
+    board = new_game(win_engine)
+    winning_move = None
     for i, player_index in enumerate(player_indexes):
         result = board.play_one_step(player_index, x_coordinates[i], y_coordinates[i])
         if result > 0:
+            winning_move = i
             break
     assert expected == result
+    assert board.status() == (expected or DRAW)
+    sequence = new_game(win_engine)
+    assert sequence.play_sequence(player_indexes, x_coordinates, y_coordinates) == (
+        expected,
+        winning_move,
+    )
+    assert sequence.board.tolist() == board.board.tolist()
 
 
 @pytest.mark.parametrize(
@@ -105,13 +127,260 @@ def test_board_size_3_scenarios(player_indexes, x_coordinates, y_coordinates, ex
         ),
     ],
 )
+@pytest.mark.parametrize("win_engine", WIN_ENGINES + ("bitboard",))
 def test_board_size_4_scenarios(
-    player_indexes, x_coordinates, y_coordinates, win_length, expected
+    player_indexes, x_coordinates, y_coordinates, win_length, expected, win_engine
 ):
     """Test a series of game scenarios in 4x4 board."""
-    board = TicTacToe(board_size=4, win_length=win_length)
+    # pylint: disable=too-many-arguments
+    board = new_game(win_engine, 4, win_length)
+    winning_move = None
     for i, player_index in enumerate(player_indexes):
         result = board.play_one_step(player_index, x_coordinates[i], y_coordinates[i])
         if result > 0:
+            winning_move = i
             break
     assert expected == result
+    sequence = new_game(win_engine, 4, win_length)
+    assert sequence.play_sequence(player_indexes, x_coordinates, y_coordinates) == (
+        expected,
+        winning_move,
+    )
+    assert sequence.status() == board.status()
+
+
+def test_place_is_quiet(capsys):
+    """Test that place and play_one_step without rendering print nothing."""
+    board = TicTacToe()
+    board.place(1, 0, 0)
+    board.play_one_step(2, 1, 1, render=False)
+    assert capsys.readouterr().out == ""
+
+
+def test_place_raises_with_messages():
+    """Test that a rejected move reports the check_valid_move messages."""
+    board = TicTacToe()
+    board.place(1, 0, 0)
+    with pytest.raises(Exception, match="Player 1 has just been"):
+        board.place(1, 0, 1)
+    with pytest.raises(Exception, match="Position: 0, 0 is already taken!"):
+        board.place(2, 0, 0)
+
+
+def test_observers_are_called_after_each_move(capsys):
+    """Test that observers see every move and render_move prints the board."""
+    board = TicTacToe()
+    moves = []
+    board.add_observer(lambda game, *move: moves.append(move))
+    board.add_observer(render_move)
+    for i, (x_coord, y_coord) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]):
+        board.place(i % 2 + 1, x_coord, y_coord)
+    assert moves[-1] == (1, 0, 2, 1)
+    assert len(moves) == 5
+    assert capsys.readouterr().out.endswith("Game won by 1\n")
+
+
+@pytest.mark.parametrize(
+    "game",
+    [TicTacToe(4, 3), TicTacToe(4, 3, "incremental"), BitboardTicTacToe(4, 3)],
+)
+def test_random_playouts_track_legal_moves(game):
+    """Test the legal move index and the status through random games."""
+    rng = random.Random(7)
+    for _ in range(20):
+        game.reset_board()
+        assert len(game.legal_moves()) == 16
+        player_index = 1
+        while game.status() == ONGOING:
+            x_coord, y_coord = game.random_legal_move(rng)
+            game.place(player_index, x_coord, y_coord)
+            player_index = 3 - player_index
+            assert (x_coord, y_coord) not in game.legal_moves()
+            empty = {tuple(cell) for cell in zip(*(game.board == 0).nonzero())}
+            assert set(game.legal_moves()) == empty
+            assert game.move_count == 16 - len(empty)
+        assert game.status() in (1, 2) or game.move_count == 16
+
+
+def test_legal_moves_index_a_board_in_progress():
+    """Test the index is built from the board on first use and a full board."""
+    board = TicTacToe()
+    for i, (x_coord, y_coord) in enumerate([(1, 0), (0, 0), (0, 1), (0, 2)]):
+        board.place(i % 2 + 1, x_coord, y_coord)
+    assert sorted(board.legal_moves()) == [(1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+    for i, (x_coord, y_coord) in enumerate([(1, 2), (1, 1), (2, 0), (2, 1), (2, 2)]):
+        board.place(i % 2 + 1, x_coord, y_coord)
+    assert board.status() == DRAW
+    assert not board.legal_moves()
+    with pytest.raises(Exception, match="No legal moves left"):
+        board.random_legal_move(random.Random(0))
+
+
+@pytest.mark.parametrize("win_engine", ["iterative", "incremental"])
+@pytest.mark.parametrize("allow_overline,expected", [(True, 1), (False, 0)])
+def test_overline_rule(win_engine, allow_overline, expected):
+    """Test that six in a row wins a five in a row game only with overlines."""
+    board = TicTacToe(9, 5, win_engine=win_engine, allow_overline=allow_overline)
+    for y_coord in [0, 1, 2, 4, 5]:
+        board.place(1, 4, y_coord)
+        board.place(2, 0, y_coord)
+    assert board.place(1, 4, 3) == expected
+    assert board.place(2, 8, 8) == 0
+    assert board.place(1, 5, 6) == 0
+
+
+def test_exact_length_win_is_found_next_to_an_overline():
+    """Test that an exact run wins on another axis than an overline."""
+    board = TicTacToe(7, 3, win_engine="iterative", allow_overline=False)
+    for player_index, x_coord, y_coord in [
+        (1, 3, 0), (2, 0, 6), (1, 3, 1), (2, 1, 6), (1, 3, 3),
+        (2, 6, 6), (1, 2, 2), (2, 6, 0), (1, 4, 2),
+    ]:  # fmt: skip
+        assert board.place(player_index, x_coord, y_coord) == 0
+    assert board.place(2, 5, 0) == 0
+    assert board.place(1, 3, 2) == 1
+
+
+def test_recursive_engine_rejects_exact_length_rule():
+    """Test that only the engines that support it take allow_overline=False."""
+    with pytest.raises(Exception, match="always allows overlines"):
+        TicTacToe(win_engine="recursive", allow_overline=False)
+
+
+def test_iterative_engine_on_a_large_board():
+    """Test a 50x50 ten in a row game won on the anti diagonal."""
+    board = TicTacToe(50, 10, win_engine="iterative")
+    for i in range(9):
+        assert board.place(1, 20 + i, 30 - i) == 0
+        assert board.place(2, 0, i) == 0
+    assert board.place(1, 29, 21) == 1
+
+
+def test_iterative_engine_matches_recursive_engine():
+    """Test both engines agree on the winner of random games."""
+    rng = random.Random(3)
+    for _ in range(50):
+        games = [TicTacToe(6, 4), TicTacToe(6, 4, win_engine="iterative")]
+        player_index = 1
+        while games[0].status() == ONGOING:
+            move = games[0].random_legal_move(rng)
+            results = [game.place(player_index, *move) for game in games]
+            assert results[0] == results[1]
+            player_index = 3 - player_index
+
+
+@pytest.mark.parametrize("win_engine", WIN_ENGINES)
+@pytest.mark.parametrize("rows,cols", [(3, 7), (7, 3)])
+def test_rectangular_board_wins_along_the_long_side(win_engine, rows, cols):
+    """Test a 3x7 (and 7x3) four in a row game is won along its long side."""
+    board = TicTacToe((rows, cols), 4, win_engine=win_engine)
+    assert board.board.shape == (rows, cols)
+    assert len(board.legal_moves()) == 21
+    moves = [(1, 1, 2), (2, 0, 0), (1, 1, 3), (2, 0, 1), (1, 1, 4), (2, 0, 2)]
+    if rows > cols:
+        moves = [(player_index, y, x) for player_index, x, y in moves]
+    for player_index, x_coord, y_coord in moves:
+        assert board.place(player_index, x_coord, y_coord) == 0
+    assert board.place(1, *((1, 5) if cols > rows else (5, 1))) == 1
+
+
+@pytest.mark.parametrize("win_engine", WIN_ENGINES)
+def test_rectangular_board_matches_bitboard(win_engine):
+    """Test every engine agrees with the bitboard on random 4x6 games."""
+    rng = random.Random(7)
+    for _ in range(30):
+        games = [
+            TicTacToe((4, 6), 3, win_engine=win_engine),
+            BitboardTicTacToe((4, 6), 3),
+        ]
+        turn = 0
+        while games[0].status() == ONGOING:
+            move = games[0].random_legal_move(rng)
+            player_index = games[0].player_indexes[turn % 2]
+            results = [game.place(player_index, *move) for game in games]
+            assert results[0] == results[1]
+            turn += 1
+        assert games[1].board.tolist() == games[0].board.tolist()
+
+
+@pytest.mark.parametrize("win_engine", WIN_ENGINES)
+def test_three_players_take_turns(win_engine):
+    """Test three players play in order and the third one can win."""
+    board = TicTacToe(5, 3, win_engine=win_engine, num_players=3)
+    assert board.player_indexes == [1, 2, 3]
+    moves = [(1, 0, 0), (2, 4, 4), (3, 2, 0), (1, 0, 1), (2, 4, 3), (3, 2, 1)]
+    for player_index, x_coord, y_coord in moves:
+        assert board.place(player_index, x_coord, y_coord) == 0
+    with pytest.raises(Exception, match="It is the turn of player 1"):
+        board.place(2, 3, 3)
+    assert board.place(1, 4, 0) == 0
+    assert board.place(2, 1, 4) == 0
+    assert board.place(3, 2, 2) == 3
+    assert board.status() == 3
+
+
+@pytest.mark.parametrize("backend", WIN_ENGINES + ("bitboard",))
+def test_undo_matches_replaying_the_moves(backend):
+    """Test undoing moves leaves the same state as playing fewer moves."""
+    rng = random.Random(11)
+    for _ in range(20):
+        game = new_game(backend, 5, 4)
+        moves = []
+        while game.status() == ONGOING:
+            move = game.random_legal_move(rng)
+            player_index = game.player_indexes[len(moves) % 2]
+            game.place(player_index, *move)
+            moves.append((player_index, *move))
+        keep = rng.randrange(len(moves))
+        for expected in reversed(moves[keep:]):
+            assert game.undo() == expected
+        replayed = new_game(backend, 5, 4)
+        for move in moves[:keep]:
+            replayed.place(*move)
+        assert game.board.tolist() == replayed.board.tolist()
+        assert game.zobrist_hash == replayed.zobrist_hash
+        assert game.status() == replayed.status() == ONGOING
+        assert game.last_played_by == replayed.last_played_by
+        assert sorted(game.legal_moves()) == sorted(replayed.legal_moves())
+        for player_index, x_coord, y_coord in moves[keep:]:
+            assert game.place(player_index, x_coord, y_coord) == replayed.place(
+                player_index, x_coord, y_coord
+            )
+
+
+@pytest.mark.parametrize(
+    "player_indexes,x_coordinates,y_coordinates,message",
+    [
+        ([1, 2, 2], [0, 1, 0], [0, 1, 2], "Move 2 .* Player 2 has just been"),
+        ([1, 2, 1], [0, 1, 0], [0, 1, 0], "Move 2 .* Position: 0, 0 is already taken"),
+        ([1, 2, 1], [0, 1, 3], [0, 1, 0], "Move 2 .* x_coord: 3 is out of bounds"),
+        ([1, 2, 1], [0, 1, 2], [0, -1, 0], "Move 1 .* y_coord: -1 is out of bounds"),
+        ([1, 3, 1], [0, 1, 2], [0, 1, 0], "Move 1 .* Invalid Player index"),
+        ([2, 1], [1, 0], [1, 0], "Move 0 .* Player 2 has just been"),
+        ([1, 2], [2, 0], [2, 0], "Move 0 .* Position: 2, 2 is already taken"),
+    ],
+)
+def test_play_sequence_rejects_the_first_illegal_move(
+    player_indexes, x_coordinates, y_coordinates, message
+):
+    """Test an illegal move anywhere in a sequence rejects all of it."""
+    board = TicTacToe()
+    board.place(2, 2, 2)
+    hash_before = board.zobrist_hash
+    with pytest.raises(Exception, match=message):
+        board.play_sequence(player_indexes, x_coordinates, y_coordinates)
+    assert board.move_count == 1
+    assert board.zobrist_hash == hash_before
+
+
+def test_play_sequence_of_three_players():
+    """Test play_sequence follows the turn order of three players."""
+    board = TicTacToe(4, 3, win_engine="incremental", num_players=3)
+    assert board.play_sequence([], [], []) == (0, None)
+    with pytest.raises(Exception, match="It is the turn of player 3"):
+        board.play_sequence([1, 2, 1], [0, 1, 2], [0, 1, 2])
+    with pytest.raises(Exception, match="same length"):
+        board.play_sequence([1, 2], [0], [0, 1])
+    assert board.play_sequence(
+        [1, 2, 3, 1, 2, 3, 1], [0, 1, 2, 0, 1, 2, 0], [0, 0, 0, 1, 1, 1, 2]
+    ) == (1, 6)
@@ -0,0 +1,97 @@
+"""Test Module for the instrumentation hooks."""
+import numpy as np
+import pytest
+
+from src.bitboard import BitboardTicTacToe
+from src.board import TicTacToe
+from src.instrumentation import instrument, profile, uninstrument
+
+WIN = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+
+
+def play(game):
+    """Play a game won by player 1 on the top row."""
+    for step, (x_coord, y_coord) in enumerate(WIN):
+        game.place(step % 2 + 1, x_coord, y_coord)
+
+
+def test_profile_counts_calls_and_restores_methods():
+    """Test the calls in the block are counted and nothing after it."""
+    place = TicTacToe.place
+    with profile() as metrics:
+        assert TicTacToe.place is not place
+        play(TicTacToe())
+        str(TicTacToe())
+    assert TicTacToe.place is place
+    play(TicTacToe())
+    assert metrics.calls("place") == 5
+    assert metrics.calls("get_winner") == 5
+    assert metrics.calls("_place_point") == 5
+    assert metrics.calls("__str__") == 1
+    assert metrics.calls("check_valid_move") == 0
+    assert metrics.as_dict()["seconds"]["place"]["count"] == 5
+
+
+def test_find_path_depth_and_cells_per_win_check():
+    """Test the recursion depth and board reads of the winning move."""
+    with profile() as metrics:
+        game = TicTacToe()
+        play(game)
+    # The winning move at (0, 2) walks 2 steps along the top row.
+    assert metrics.find_path_depth.count >= 1
+    assert metrics.find_path_depth.as_dict()["buckets"][2] >= 1
+    assert metrics.win_check_cells.count == 5
+    assert type(game.board) is np.ndarray  # pylint: disable=unidiomatic-typecheck
+
+    with profile() as metrics:
+        play(TicTacToe(win_engine="iterative"))
+    assert metrics.find_path_depth.count == 0
+    assert metrics.win_check_cells.total > 0
+
+
+def test_subclasses_and_rejected_moves_are_instrumented():
+    """Test a backend overriding get_winner and check_valid_move on errors."""
+    with profile() as metrics:
+        game = BitboardTicTacToe()
+        play(game)
+        with pytest.raises(Exception):
+            game.place(2, 0, 0)
+    assert metrics.calls("get_winner") == 5
+    assert metrics.calls("check_valid_move") == 1
+    assert metrics.win_check_cells.count == 0
+
+
+def test_overrides_calling_super_are_recorded_once():
+    """Test a subclass wrapping place does not count each move twice."""
+
+    class Wrapping(TicTacToe):
+        """A game whose place calls the place of TicTacToe."""
+
+        __slots__ = ()
+
+        def place(self, player_index, x_coordinate, y_coordinate):
+            """Play through TicTacToe.place with integer coordinates."""
+            return super().place(player_index, int(x_coordinate), int(y_coordinate))
+
+    with profile() as metrics:
+        play(Wrapping())
+        play(TicTacToe())
+    assert metrics.calls("place") == 10
+    assert metrics.calls("get_winner") == 10
+
+
+def test_prometheus_export_and_double_instrument():
+    """Test the text format and that instrumenting twice fails."""
+    metrics = instrument()
+    try:
+        play(TicTacToe())
+        with pytest.raises(Exception, match="already instrumented"):
+            instrument()
+    finally:
+        uninstrument()
+    text = metrics.to_prometheus()
+    assert 'tictactoe_calls_total{method="place"} 5' in text
+    assert 'tictactoe_method_seconds_bucket{method="place",le="+Inf"} 5' in text
+    assert 'tictactoe_method_seconds_count{method="place"} 5' in text
+    assert "# TYPE tictactoe_win_check_cells histogram" in text
+    assert 'tictactoe_win_check_cells_bucket{le="+Inf"} 5' in text
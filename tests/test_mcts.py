@@ -0,0 +1,60 @@
+"""Test Module for the Monte Carlo Tree Search player."""
+import pytest
+
+from src.board import TicTacToe
+from src.mcts import MCTS, best_move
+from src.position import Position
+
+
+def test_takes_immediate_win():
+    """Test that the winning move gets the most visits."""
+    game = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 0), (1, 0, 1), (2, 1, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    assert best_move(game, playouts=2000, seed=0).move == (0, 2)
+
+
+def test_blocks_opponent_win():
+    """Test that the opponent's winning move is blocked."""
+    game = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 1), (1, 0, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    assert best_move(game, playouts=3000, seed=0).move == (0, 2)
+
+
+def test_search_restores_position_and_counts_visits():
+    """Test the position is unchanged and every playout visits a root move."""
+    position = Position(4, 3)
+    position.make(5)
+    before = (list(position.cells), position.to_move, position.key)
+    visits, done, _ = MCTS(capacity=500, seed=1).search(position, playouts=400)
+    assert (list(position.cells), position.to_move, position.key) == before
+    assert sum(visits.values()) == done == 400
+    assert 5 not in visits
+
+
+def test_root_parallel_search_merges_workers():
+    """Test the visit counts of all workers are added up."""
+    result = best_move(TicTacToe(5, 4), playouts=300, workers=2, seed=3)
+    assert result.playouts == 600
+    assert sum(result.visits.values()) == 600
+    assert result.playouts_per_second > 0
+
+
+def test_finished_games_are_not_searched():
+    """Test won and drawn games raise like the alpha-beta search."""
+    game = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 0), (1, 0, 1), (2, 1, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    game.place(1, 0, 2)
+    with pytest.raises(Exception, match="already won"):
+        best_move(game, playouts=10)
+    with pytest.raises(Exception, match="already won"):
+        MCTS().search(Position.from_game(game), playouts=10)
+    drawn = TicTacToe()
+    for step, move in enumerate(
+        [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (2, 0), (2, 1), (1, 2), (2, 2)]
+    ):
+        drawn.place(step % 2 + 1, *move)
+    with pytest.raises(Exception, match="No legal moves left"):
+        best_move(drawn, playouts=10)
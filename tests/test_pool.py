@@ -0,0 +1,65 @@
+"""Test Module for the pool of games sharing one board buffer."""
+import numpy as np
+import pytest
+
+from src.pool import BoardPool
+
+
+def test_games_are_views_into_the_pool():
+    """Test that moves write into the pool buffer and reset clears them."""
+    pool = BoardPool(4, 3, 3)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert pool.slot_of(first) == 0
+    assert pool.slot_of(second) == 1
+    first.place(1, 0, 0)
+    second.place(2, 2, 2)
+    assert pool.boards[0, 0, 0] == 1
+    assert pool.boards[1, 2, 2] == 2
+    first.reset_board()
+    assert not pool.boards[0].any()
+    assert pool.boards[1, 2, 2] == 2
+
+
+def test_released_slots_are_reused_and_cleared():
+    """Test a released slot is handed out again with an empty board."""
+    pool = BoardPool(2, 3, 3, win_engine="incremental")
+    game = pool.acquire()
+    game.place(1, 1, 1)
+    pool.release(game)
+    assert len(pool) == 0
+    again = pool.acquire()
+    assert pool.slot_of(again) == 0
+    assert not again.board.any()
+    assert again.place(1, 0, 0) == 0
+
+
+def test_branched_games_keep_their_slot():
+    """Test a pool game written after branching stays in its slot and is released."""
+    pool = BoardPool(2, 3, 3)
+    game = pool.acquire()
+    game.place(1, 0, 0)
+    first = game.branch()
+    second = game.branch()
+    game.place(2, 1, 1)
+    assert pool.boards[0, 1, 1] == 2
+    assert first.board[1, 1] == second.board[1, 1] == 0
+    first.place(2, 2, 2)
+    assert second.board[2, 2] == 0 and pool.boards[0, 2, 2] == 0
+    assert pool.slot_of(game) == 0
+    pool.release(game)
+    assert len(pool) == 0 and not pool.boards[0].any()
+
+
+def test_pool_errors():
+    """Test a full pool, a double release and a game from elsewhere."""
+    pool = BoardPool(1, 3, 3)
+    game = pool.acquire()
+    with pytest.raises(Exception):
+        pool.acquire()
+    pool.release(game)
+    with pytest.raises(Exception):
+        pool.release(game)
+    with pytest.raises(Exception):
+        pool.slot_of(BoardPool(1).acquire())
+    assert pool.boards.dtype == np.int8
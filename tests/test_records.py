@@ -0,0 +1,98 @@
+"""Test Module for the binary game record format."""
+import io
+
+import pytest
+
+from src.board import TicTacToe
+from src.records import (
+    GameRecord,
+    MoveRecorder,
+    RecordFile,
+    RecordWriter,
+    decode_varint,
+    encode_varint,
+    iter_records,
+    replay,
+)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**40])
+def test_varint_round_trip(value):
+    """Test varints decode to the value they were encoded from."""
+    assert decode_varint(encode_varint(value) + b"\x00", 0)[0] == value
+
+
+def test_records_round_trip_through_a_stream():
+    """Test records read back with the moves they were written with."""
+    stream = io.BytesIO()
+    writer = RecordWriter(stream)
+    small = GameRecord(3, 3, (1, 2), 2, [4, 0, 8, 2, 6])
+    large = GameRecord(19, 5, (1, 2), 1, [0, 360, 180, 255, 256])
+    writer.write(small)
+    writer.write(large)
+
+    records = list(iter_records(stream.getvalue()))
+    assert len(stream.getvalue()) == 5 + (7 + 5) + (7 + 2 * 5)
+    assert [list(record.moves) for record in records] == [small.moves, large.moves]
+    assert records[1][:4] == large[:4]
+
+
+def test_recorded_game_replays_to_the_same_result(tmp_path):
+    """Test a game captured with MoveRecorder replays to the same winner."""
+    game = TicTacToe(4, 3)
+    recorder = MoveRecorder()
+    game.add_observer(recorder)
+    for player_index, x_coord, y_coord in [(2, 1, 1), (1, 0, 0), (2, 2, 2), (1, 0, 3)]:
+        game.place(player_index, x_coord, y_coord)
+    assert game.place(2, 3, 3) == 2
+
+    path = tmp_path / "games.bin"
+    with open(path, "wb") as stream:
+        writer = RecordWriter(stream)
+        writer.write(recorder.record(game))
+        writer.write(GameRecord(3, 3, (1, 2), 1, [0, 1, 2]))
+
+    with RecordFile(str(path)) as records:
+        results = [
+            (replayed.board.tolist(), winner)
+            for replayed, winner in records.final_positions()
+        ]
+    assert results[0] == (game.board.tolist(), 2)
+    assert results[1][1] == 0
+
+
+def test_replay_rejects_other_players():
+    """Test replaying a record for other player indexes fails."""
+    with pytest.raises(Exception, match="do not match"):
+        replay(GameRecord(3, 3, (2, 5), 2, [0]))
+
+
+def test_replay_three_players():
+    """Test a record of three players is replayed with three players."""
+    game, winner = replay(GameRecord(4, 3, (1, 2, 3), 2, [0, 4, 8, 1, 5, 9, 2]))
+    assert game.player_indexes == [1, 2, 3]
+    assert game.board[:, 0].tolist() == [2, 3, 1, 0]
+    assert winner == 2
+
+
+def test_iter_records_rejects_other_files():
+    """Test a buffer without the magic bytes is rejected."""
+    with pytest.raises(Exception, match="Not a game record file."):
+        list(iter_records(b"nope"))
+
+
+def test_record_file_closes_after_an_early_exit(tmp_path):
+    """Test records kept or left half read do not hold the file open."""
+    path = tmp_path / "games.bin"
+    with open(path, "wb") as stream:
+        writer = RecordWriter(stream)
+        for _ in range(3):
+            writer.write(GameRecord(19, 5, (1, 2), 1, [0, 360, 180]))
+
+    with RecordFile(str(path)) as records:
+        for _ in records:
+            break
+        kept = list(records)
+        reader = iter(records)
+        next(reader)
+    assert [list(record.moves) for record in kept] == [[0, 360, 180]] * 3
@@ -0,0 +1,104 @@
+"""Test Module for the full board winner scan."""
+import random
+
+import numpy as np
+import pytest
+
+from src.bitboard import BitboardTicTacToe
+from src.board import TicTacToe
+from src.position import DIRECTIONS
+from src.scan import SEVERAL_WINNERS, scan_boards, winning_lines, winning_runs
+
+
+def naive_runs(board: np.ndarray, win_length: int, allow_overline: bool) -> list:
+    """Every (player, cells) run of a board, one cell and direction at a time."""
+    rows, cols = board.shape
+
+    def owner(x_coord, y_coord):
+        if 0 <= x_coord < rows and 0 <= y_coord < cols:
+            return board[x_coord, y_coord]
+        return 0
+
+    runs = []
+    for x_step, y_step in DIRECTIONS:
+        for x_coord in range(rows):
+            for y_coord in range(cols):
+                cells = tuple(
+                    (x_coord + step * x_step, y_coord + step * y_step)
+                    for step in range(win_length)
+                )
+                player = owner(*cells[0])
+                if not player or any(owner(*cell) != player for cell in cells):
+                    continue
+                if not allow_overline and player in (
+                    owner(x_coord - x_step, y_coord - y_step),
+                    owner(cells[-1][0] + x_step, cells[-1][1] + y_step),
+                ):
+                    continue
+                runs.append((int(player), cells))
+    return sorted(runs)
+
+
+def random_board(rng: random.Random, rows: int, cols: int, players: int):
+    """A board with random points of every player, and empty cells."""
+    return np.array(
+        [[rng.randrange(players + 1) for _ in range(cols)] for _ in range(rows)],
+        dtype=np.int8,
+    )
+
+
+@pytest.mark.parametrize(
+    "shape,win_length", [((3, 3), 3), ((4, 4), 3), ((3, 6), 4), ((7, 5), 5)]
+)
+@pytest.mark.parametrize("allow_overline", [True, False])
+def test_winning_runs_match_a_naive_scan(shape, win_length, allow_overline):
+    """Test the runs found on random boards against a cell by cell scan."""
+    rng = random.Random(sum(shape) * 10 + win_length)
+    boards = np.stack([random_board(rng, *shape, 2) for _ in range(50)])
+    for board in boards:
+        lines = winning_lines(board, win_length, allow_overline)
+        assert sorted(lines) == naive_runs(board, win_length, allow_overline)
+
+    winners, runs = scan_boards(boards, win_length, allow_overline)
+    for board_index, board in enumerate(boards):
+        expected = naive_runs(board, win_length, allow_overline)
+        players = {player for player, _ in expected}
+        winner = SEVERAL_WINNERS if len(players) > 1 else max(players, default=0)
+        assert winners[board_index] == winner
+        assert (runs[:, 0] == board_index).sum() == len(expected)
+
+
+def test_exact_length_rule_and_several_winners():
+    """Test overlines only count when allowed and boards won by two players."""
+    board = np.zeros((4, 5), dtype=np.int8)
+    board[0, :4] = 1
+    board[3, 1:4] = 2
+    assert len(winning_runs(board, 3)) == 3
+    winners, runs = scan_boards(board, 3, allow_overline=False)
+    assert winners.tolist() == [2]
+    assert runs.tolist() == [[0, 2, 3, 1, 0, 1]]
+    winners, _ = scan_boards(board, 3)
+    assert winners.tolist() == [SEVERAL_WINNERS]
+    assert scan_boards(np.zeros((2, 3, 3)), 3)[0].tolist() == [0, 0]
+    with pytest.raises(Exception, match="stack of boards"):
+        winning_runs(np.zeros((1, 1, 3, 3)), 3)
+
+
+@pytest.mark.parametrize("game_class", [TicTacToe, BitboardTicTacToe])
+@pytest.mark.parametrize("board_size,win_length", [(3, 3), (5, 4), ((4, 6), 4)])
+def test_scan_winner_agrees_with_played_games(game_class, board_size, win_length):
+    """Test the scan of the last position of random games finds their winner."""
+    rng = random.Random(7)
+    for _ in range(30):
+        game = game_class(board_size=board_size, win_length=win_length)
+        step = 0
+        while not game.status():
+            x_coord, y_coord = game.random_legal_move(rng)
+            last_move = (x_coord, y_coord)
+            game.place(step % 2 + 1, x_coord, y_coord)
+            step += 1
+        winner, lines = game.scan_winner()
+        assert winner == game.winner
+        assert all(line.player == winner for line in lines)
+        if winner:
+            assert any(last_move in line.cells for line in lines)
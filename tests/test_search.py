@@ -0,0 +1,119 @@
+"""Test Module for the alpha-beta move search."""
+import time
+
+import pytest
+
+from src.board import TicTacToe
+from src.position import Position
+from src.search import Searcher, TranspositionTable, best_move
+
+
+def test_position_make_and_unmake_restore_the_state():
+    """Test unmaking every move gives back the starting position."""
+    position = Position(3, 3)
+    for cell in [4, 0, 8, 2]:
+        position.make(cell)
+    assert position.to_move == 1
+    for _ in range(4):
+        position.unmake()
+    assert position.cells == [0] * 9
+    assert position.key == 0
+    assert not any(any(counts) for counts in position.line_counts)
+
+
+def test_position_detects_win():
+    """Test that completing a line is reported as a win."""
+    position = Position(3, 3)
+    assert not any(position.make(cell) for cell in [0, 3, 1, 4])
+    assert position.make(2)
+    assert position.winner == 1
+
+
+def test_position_without_overlines_only_wins_exact_lines():
+    """Test a move making five in a row is not a win of three in a row."""
+    game = TicTacToe(6, 3, win_engine="incremental", allow_overline=False)
+    moves = [(1, 0, 0), (2, 5, 0), (1, 0, 1), (2, 3, 5), (1, 0, 3), (2, 5, 5)]
+    moves += [(1, 0, 4), (2, 5, 3), (1, 2, 0), (2, 3, 2), (1, 2, 1), (2, 1, 5)]
+    for player_index, x_coord, y_coord in moves:
+        game.place(player_index, x_coord, y_coord)
+    position = Position.from_game(game)
+    assert not position.make(2) and not position.winner
+    position.unmake()
+    assert position.make(14) and position.winner == 1
+    assert game.branch().place(1, *best_move(game, depth=1)) == 1
+    assert game.place(1, 0, 2) == 0
+
+
+def test_empty_3x3_is_a_draw():
+    """Test that solving the empty board gives a drawn score."""
+    searcher = Searcher()
+    searcher.search(TicTacToe())
+    assert searcher.score == 0
+
+
+def test_takes_immediate_win():
+    """Test that a winning move is played at once."""
+    game = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 0), (1, 0, 1), (2, 1, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    assert best_move(game) == (0, 2)
+
+
+def test_blocks_opponent_win():
+    """Test that the opponent's winning move is blocked."""
+    game = TicTacToe()
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 1), (1, 0, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    assert best_move(game) == (0, 2)
+
+
+def test_search_of_a_won_game_raises():
+    """Test a game that is already won has no best move."""
+    game = TicTacToe(4, 3)
+    for player_index, x_coord, y_coord in [(1, 0, 0), (2, 1, 0), (1, 0, 1), (2, 1, 1)]:
+        game.place(player_index, x_coord, y_coord)
+    assert game.place(1, 0, 2) == 1
+    with pytest.raises(Exception, match="already won"):
+        best_move(game)
+
+
+def test_search_does_not_modify_game():
+    """Test the search works on a copy of the game state."""
+    game = TicTacToe(4, 3)
+    game.place(2, 1, 1)
+    before = game.board.copy()
+    best_move(game, depth=3)
+    assert (game.board == before).all()
+    assert game.last_played_by == 2
+
+
+@pytest.mark.parametrize("board_size,win_length", [(4, 4), (5, 4)])
+def test_time_limit_is_respected(board_size, win_length):
+    """Test a time limited search returns a legal move in time."""
+    game = TicTacToe(board_size, win_length)
+    searcher = Searcher()
+    start = time.perf_counter()
+    x_coord, y_coord = searcher.search(game, time_limit=0.2)
+    assert time.perf_counter() - start < 1
+    assert game.is_move_valid(1, x_coord, y_coord)
+    assert searcher.depth_reached >= 3
+
+
+def test_transposition_table_keeps_deeper_entries():
+    """Test the replacement policy within and across searches."""
+    table = TranspositionTable(size_bits=2)
+    table.put(1, 5, 10, 0, 3)
+    table.put(5, 2, 20, 0, 4)
+    assert table.get(1) == (5, 10, 0, 3)
+    assert table.get(5) is None
+    table.new_search()
+    table.put(5, 2, 20, 0, 4)
+    assert table.get(5) == (2, 20, 0, 4)
+
+
+def test_position_key_matches_game_hash():
+    """Test the position and the game use the same Zobrist keys."""
+    game = TicTacToe(4, 3)
+    game.place(1, 0, 3)
+    game.place(2, 2, 1)
+    assert Position.from_game(game).key == game.zobrist_hash
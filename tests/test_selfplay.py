@@ -0,0 +1,56 @@
+"""Test Module for the self-play dataset generator."""
+import numpy as np
+import pytest
+
+from src.selfplay import Samples, augment, generate, load
+
+
+def first_free(game, rng):
+    """A policy playing the first empty point."""
+    # pylint: disable=unused-argument
+    return min(game.legal_moves())
+
+
+def test_generate_writes_int8_shards(tmp_path):
+    """Test the shards hold every position with its move and outcome."""
+    stats = generate(str(tmp_path), 20, seed=1, shard_size=50, chunk=7)
+    samples = load(str(tmp_path))
+    assert stats["samples"] == len(samples.moves)
+    assert stats["shards"] == -(-len(samples.moves) // 50)
+    assert samples.boards.dtype == np.int8
+    assert samples.boards.shape == (len(samples.moves), 3, 3)
+    flat = samples.boards.reshape(len(samples.moves), -1)
+    assert (flat[np.arange(len(samples.moves)), samples.moves] == 0).all()
+    assert set(samples.outcomes.tolist()) <= {-1, 0, 1}
+    assert len(stats["games_per_sec_per_worker"]) == 1
+
+
+def test_generate_is_deterministic_across_workers(tmp_path):
+    """Test a seeded dataset does not depend on the number of workers."""
+    generate(str(tmp_path / "one"), 30, seed=4, chunk=4)
+    generate(str(tmp_path / "two"), 30, seed=4, chunk=4, workers=2)
+    for one, two in zip(load(str(tmp_path / "one")), load(str(tmp_path / "two"))):
+        assert np.array_equal(one, two)
+
+
+def test_generate_with_a_callable_policy(tmp_path):
+    """Test a user policy plays every move after the random opening plies."""
+    generate(str(tmp_path), 1, policy=first_free, seed=0)
+    samples = load(str(tmp_path))
+    assert samples.moves.tolist() == [0, 1, 2, 3, 4, 5, 6]
+    assert samples.outcomes.tolist() == [1, -1, 1, -1, 1, -1, 1]
+    with pytest.raises(Exception, match="Unknown policy"):
+        generate(str(tmp_path), 1, policy="bogus")
+
+
+def test_augment_adds_the_8_symmetries():
+    """Test a corner move is mapped to the 4 corners, twice each."""
+    board = np.zeros((1, 3, 3), dtype=np.int8)
+    board[0, 0, 1] = 2
+    samples = augment(
+        Samples(board, np.array([1]), np.array([0]), np.array([0])), board_size=3
+    )
+    assert sorted(samples.moves.tolist()) == [0, 0, 2, 2, 6, 6, 8, 8]
+    assert (samples.boards.reshape(8, -1).sum(axis=1) == 2).all()
+    flat = samples.boards.reshape(8, -1)
+    assert (flat[np.arange(8), samples.moves] == 0).all()
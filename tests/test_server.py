@@ -0,0 +1,72 @@
+"""Test Module for the asyncio game server."""
+import asyncio
+
+import pytest
+
+from src.server import GameServer, SessionRegistry, shard_for
+
+
+def test_registry_enforces_turn_order():
+    """Test moves are validated against the game of their id."""
+    registry = SessionRegistry()
+    registry.create("a")
+    assert registry.move("a", 1, 0, 0) == 0
+    with pytest.raises(Exception, match="Player 1 has just been"):
+        registry.move("a", 1, 1, 1)
+    with pytest.raises(Exception, match="Unknown game: b"):
+        registry.move("b", 2, 1, 1)
+
+
+def test_registry_evicts_idle_games_only():
+    """Test games idle past the timeout are evicted, active ones are kept."""
+    registry = SessionRegistry(idle_timeout=10)
+    registry.create("old")
+    registry.create("new")
+    registry.move("old", 1, 0, 0)
+    registry._last_active["new"] -= 100  # pylint: disable=protected-access
+    assert registry.evict_idle() == 1
+    assert list(registry.games) == ["old"]
+
+
+def test_registry_rejects_games_of_other_shards():
+    """Test a shard only creates the game ids it owns."""
+    game_id = next(f"g{i}" for i in range(100) if shard_for(f"g{i}", 2) == 1)
+    with pytest.raises(Exception, match="belongs to another shard"):
+        SessionRegistry(shard=0, num_shards=2).create(game_id)
+    SessionRegistry(shard=1, num_shards=2).create(game_id)
+
+
+def test_handle_replies():
+    """Test the replies of the line protocol."""
+    registry = SessionRegistry()
+    assert registry.handle("NEW g 4 3") == "OK"
+    assert registry.handle("MOVE g 2 1 1") == "OK 0"
+    assert registry.handle("BOARD g") == "OK 2 0000020000000000"
+    assert registry.handle("MOVE g 2 1 2").startswith("ERR The move is illegal")
+    assert registry.handle("MOVE g x") == "ERR Bad arguments: MOVE g x"
+    assert registry.handle("JUMP") == "ERR Unknown command: JUMP"
+    assert registry.handle("NEW big 20000") == "ERR Board size above 19 is not served."
+    assert SessionRegistry(max_board_size=25).handle("NEW big 20") == "OK"
+    assert registry.handle("END g") == "OK"
+    assert not registry
+
+
+def test_server_plays_a_game_over_tcp():
+    """Test a game played over a TCP connection."""
+
+    async def play():
+        server = GameServer(SessionRegistry(), port=0)
+        port = await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for line in ["NEW t", "MOVE t 1 0 0", "MOVE t 2 1 0", "MOVE t 1 0 1"]:
+            writer.write(line.encode() + b"\n")
+            replies.append((await reader.readline()).decode().strip())
+        writer.write(b"MOVE t 2 1 1\nMOVE t 1 0 2\n")
+        replies.append((await reader.readline()).decode().strip())
+        replies.append((await reader.readline()).decode().strip())
+        writer.close()
+        await server.stop()
+        return replies
+
+    assert asyncio.run(play()) == ["OK", "OK 0", "OK 0", "OK 0", "OK 0", "OK 1"]
@@ -0,0 +1,121 @@
+"""Test Module for games in shared memory and their seqlock snapshots."""
+import multiprocessing
+import random
+
+import numpy as np
+import pytest
+
+from src.shared import SharedGameRegistry
+
+
+def read_while_written(name: str, reads: int, results) -> None:
+    """Read snapshots from another process and report the torn ones."""
+    registry = SharedGameRegistry.attach(name)
+    torn = 0
+    versions = set()
+    for _ in range(reads):
+        for snapshot in registry.snapshots():
+            versions.add(snapshot.version)
+            torn += np.count_nonzero(snapshot.board) != snapshot.move_count
+            torn += snapshot.version % 2
+    registry.close()
+    results.put((torn, len(versions)))
+
+
+def test_games_are_published_to_readers():
+    """Test moves, undos and releases are seen by a reader attached by name."""
+    with SharedGameRegistry.create(3, board_size=(3, 4)) as registry:
+        game = registry.acquire("first")
+        other = registry.acquire("second")
+        reader = SharedGameRegistry.attach(registry.name)
+        assert reader.board_size == (3, 4) and reader.win_length == 3
+        assert reader.find("second") == 1 and reader.find("third") is None
+
+        game.place(1, 0, 0)
+        game.place(2, 1, 1)
+        snapshot = reader.read(reader.find("first"))
+        assert snapshot.game_id == "first"
+        assert (snapshot.last_played_by, snapshot.move_count) == (2, 2)
+        assert snapshot.board[1, 1] == 2 and snapshot.version % 2 == 0
+
+        token = game.snapshot()
+        game.place(1, 0, 1)
+        game.place(2, 2, 2)
+        game.place(1, 0, 2)
+        assert reader.read(0).winner == 1
+        version = reader.read(0).version
+        game.restore(token)
+        assert reader.read(0).version == version + 2
+        assert (reader.read(0).board == game.board).all()
+
+        child = game.branch()
+        child.place(1, 2, 0)
+        assert reader.read(0).board[2, 0] == 0
+        assert (game.board == reader.boards[0]).all()
+
+        other.play_sequence([1, 2], [0, 1], [3, 3])
+        assert [snapshot.game_id for snapshot in reader.snapshots()] == [
+            "first",
+            "second",
+        ]
+        registry.release("first")
+        assert [snapshot.game_id for snapshot in reader.snapshots()] == ["second"]
+        assert len(reader) == 1 and not reader.boards[0].any()
+        assert registry.acquire("third") is not None and reader.find("third") == 0
+        reader.close()
+
+
+def test_snapshots_are_consistent_while_games_are_played():
+    """Test a reader process never sees a half written game."""
+    with SharedGameRegistry.create(4, win_engine="iterative") as registry:
+        games = [registry.acquire(f"game-{slot}") for slot in range(4)]
+        results = multiprocessing.Queue()
+        reader = multiprocessing.Process(
+            target=read_while_written, args=(registry.name, 2000, results)
+        )
+        reader.start()
+        rng = random.Random(1)
+        while reader.is_alive():
+            for game in games:
+                if game.status():
+                    game.reset_board()
+                else:
+                    game.place(game.player_to_move() or 1, *game.random_legal_move(rng))
+            if games[0].move_count and rng.random() < 0.1:
+                games[0].undo()
+        torn, versions = results.get(timeout=10)
+        reader.join()
+        assert torn == 0
+        assert versions > 10
+
+
+def test_closing_detaches_the_live_games():
+    """Test games acquired or released before closing go on with a private board."""
+    registry = SharedGameRegistry.create(2)
+    game = registry.acquire("live")
+    released = registry.acquire("released")
+    game.place(1, 1, 1)
+    released.place(1, 0, 0)
+    registry.release("released")
+    registry.close()
+    assert game.place(2, 0, 0) == 0 and released.place(2, 2, 2) == 0
+    assert game.board.tolist() == [[2, 0, 0], [0, 1, 0], [0, 0, 0]]
+    assert released.board.tolist() == [[1, 0, 0], [0, 0, 0], [0, 0, 2]]
+
+
+def test_registry_errors():
+    """Test full registries, unknown and duplicate ids, and readers writing."""
+    with SharedGameRegistry.create(1) as registry:
+        registry.acquire("only")
+        with pytest.raises(Exception, match="already in the registry"):
+            registry.acquire("only")
+        with pytest.raises(Exception, match="Registry is full"):
+            registry.acquire("another")
+        with pytest.raises(Exception, match="bytes long"):
+            registry.acquire("x" * 33)
+        with pytest.raises(Exception, match="No game missing"):
+            registry.release("missing")
+        reader = SharedGameRegistry.attach(registry.name)
+        with pytest.raises(Exception, match="Only the process that created"):
+            reader.acquire("reader")
+        reader.close()
@@ -0,0 +1,51 @@
+"""Test Module for the game tree solver and its solution table."""
+import pytest
+
+from src.board import TicTacToe
+from src.solver import DRAW, LOSS, UNKNOWN, WIN, Solution, SolvedTable, build_table
+
+
+@pytest.fixture(name="table_path", scope="module")
+def fixture_table_path(tmp_path_factory):
+    """Build the 3x3 table once for the module."""
+    path = tmp_path_factory.mktemp("tables") / "3x3.bin"
+    assert build_table(3, 3, str(path)) == Solution(DRAW, 9)
+    return str(path)
+
+
+def test_empty_board_is_a_draw(table_path):
+    """Test the empty board is a draw lasting all 9 moves."""
+    with SolvedTable.open(table_path) as table:
+        assert table.lookup(TicTacToe()) == Solution(DRAW, 9)
+
+
+@pytest.mark.parametrize("first_player", [1, 2])
+def test_lookup_does_not_depend_on_player_index(table_path, first_player):
+    """Test a won position is found whichever player index started."""
+    second_player = 3 - first_player
+    game = TicTacToe()
+    game.place(first_player, 0, 0)
+    game.place(second_player, 0, 1)
+    game.place(first_player, 1, 1)
+    with SolvedTable.open(table_path) as table:
+        assert table.lookup(game) == Solution(LOSS, 4)
+        game.place(second_player, 2, 1)
+        assert table.lookup(game) == Solution(WIN, 1)
+
+
+def test_finished_and_unreachable_positions(table_path):
+    """Test a won position is lost for the side to move and others are unknown."""
+    game = TicTacToe()
+    for i, (x_coord, y_coord) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]):
+        game.place(i % 2 + 1, x_coord, y_coord)
+    with SolvedTable.open(table_path) as table:
+        assert table.lookup(game) == Solution(LOSS, 0)
+        game.board[2, :] = 1
+        assert table.lookup(game).value == UNKNOWN
+
+
+def test_table_rejects_other_variants(table_path):
+    """Test looking up a game of another size fails."""
+    with SolvedTable.open(table_path) as table:
+        with pytest.raises(Exception, match="Table is for board size 3"):
+            table.lookup(TicTacToe(4, 3))
@@ -0,0 +1,144 @@
+"""Test Module for the threat index and threat space search."""
+import random
+
+import pytest
+
+from src.board import TicTacToe
+from src.threats import (
+    FIVE,
+    FOUR,
+    OPEN_FOUR,
+    OPEN_THREE,
+    THREE,
+    PatternIndex,
+    find_vcf,
+    window_table,
+)
+
+
+def play(game, first, second):
+    """Play the points of both players in turn."""
+    for first_move, second_move in zip(first, second):
+        game.place(1, *first_move)
+        game.place(2, *second_move)
+
+
+def test_window_table_5():
+    """Test a few window codes of the five in a row table."""
+    table = window_table(5)
+    assert len(table) == 3**5
+    assert table[0] is None
+    assert table[1 + 3 + 9 + 27 + 81] == ((5, ()), None)
+    assert table[2 * (3 + 9 + 27 + 81)] == (None, (4, (0,)))
+    assert table[1 + 3 + 9 + 2 * 27] is None
+
+
+@pytest.mark.parametrize(
+    "points,kind,cells",
+    [
+        ([(7, 5), (7, 6), (7, 7)], OPEN_THREE, [(7, 3), (7, 4), (7, 8), (7, 9)]),
+        ([(7, 0), (7, 1), (7, 2)], THREE, [(7, 3), (7, 4)]),
+        ([(7, 5), (7, 6), (7, 7), (7, 8)], OPEN_FOUR, [(7, 4), (7, 9)]),
+        ([(7, 5), (7, 6), (7, 8), (7, 9)], FOUR, [(7, 7)]),
+        ([(7, 5), (7, 6), (7, 7), (7, 8), (7, 9)], FIVE, []),
+    ],
+)
+def test_threat_classes(points, kind, cells):
+    """Test the class and cells of threats on a row."""
+    index = PatternIndex(15, 5)
+    for x_coord, y_coord in points:
+        index.put(x_coord * 15 + y_coord, 1)
+    assert index.threats(1)[0].kind == kind
+    assert list(index.threats(1)[0].cells) == cells
+    assert not index.threats(2)
+
+
+def test_blocked_four_and_index_following_a_game():
+    """Test a point of the other player blocks a threat and that moves are followed."""
+    game = TicTacToe(15, 5, win_engine="iterative")
+    index = PatternIndex.from_game(game)
+    play(game, [(3, 3), (4, 4), (5, 5)], [(0, 0), (0, 1), (6, 6)])
+    assert [threat.kind for threat in index.threats(1)] == [THREE]
+    assert index.four_moves(1) == {2 * 15 + 2, 15 + 1}
+    assert not index.winning_cells(1)
+
+
+def test_incremental_index_matches_a_rebuilt_one():
+    """Test put and remove keep the same threats as indexing from scratch."""
+    rng = random.Random(5)
+    game = TicTacToe(9, 5, win_engine="iterative")
+    index = PatternIndex.from_game(game)
+    player_index = 1
+    for _ in range(30):
+        game.place(player_index, *game.random_legal_move(rng))
+        player_index = 3 - player_index
+    rebuilt = PatternIndex.from_game(game, follow=False)
+    assert index.codes == rebuilt.codes
+    for player_index in (1, 2):
+        assert index.threats(player_index) == rebuilt.threats(player_index)
+    cell = next(cell for cell, digit in enumerate(index.cells) if not digit)
+    before = index.threats(1)
+    index.put(cell, 1)
+    index.remove(cell)
+    assert index.threats(1) == before
+
+
+def test_index_following_a_game_is_rebuilt_after_undo():
+    """Test undo, restore and reset_board are seen by the index following a game."""
+    rng = random.Random(3)
+    game = TicTacToe(9, 5, win_engine="iterative")
+    index = PatternIndex.from_game(game)
+    play(game, [(4, 1), (4, 2), (4, 3)], [(0, 0), (0, 8), (8, 8)])
+    token = game.snapshot()
+    game.place(1, 4, 4)
+    assert index.threats(1)[0].kind == OPEN_FOUR
+    game.undo()
+    assert index.threats(1)[0].kind == OPEN_THREE
+    game.place(1, 4, 0)
+    game.undo()
+    game.place(1, 4, 4)
+    game.place(2, 4, 5)
+    game.restore(token)
+    game.place(1, 4, 0)
+    assert index.threats(1)[0][::2] == (FOUR, ((4, 4),))
+    for _ in range(10):
+        game.place(game.player_to_move(), *game.random_legal_move(rng))
+        assert index.codes == PatternIndex.from_game(game, follow=False).codes
+    game.reset_board()
+    assert not index.threats(1) and not any(index.cells)
+
+
+def test_find_vcf_plays_a_four_before_the_winning_open_four():
+    """Test a two move win by continuous fours and replay it."""
+    game = TicTacToe(15, 5, win_engine="iterative")
+    play(
+        game,
+        [(7, 1), (7, 2), (7, 3), (5, 2), (6, 3)],
+        [(7, 0), (0, 14), (14, 14), (0, 10), (14, 0)],
+    )
+    line = find_vcf(game)
+    assert line == [(7, 4), (7, 5), (4, 1)]
+    assert find_vcf(game, 2) is None
+    index = PatternIndex.from_game(game)
+    for step, move in enumerate(line):
+        game.place(step % 2 + 1, *move)
+    assert len(index.winning_cells(1)) == 2
+
+
+def test_find_vcf_needs_a_defence_first():
+    """Test no win is found while the defender threatens two fives."""
+    game = TicTacToe(15, 5, win_engine="iterative")
+    play(
+        game,
+        [(7, 1), (7, 2), (7, 3), (5, 2), (6, 3)],
+        [(10, 5), (10, 6), (10, 7), (10, 8), (0, 14)],
+    )
+    assert find_vcf(game) is None
+    assert find_vcf(game, 2) == [(10, 4)]
+
+
+def test_games_without_overlines_are_not_indexed():
+    """Test the threat index refuses games where only exact lines win."""
+    game = TicTacToe(15, 5, win_engine="iterative", allow_overline=False)
+    with pytest.raises(Exception, match="overlines win"):
+        find_vcf(game)
@@ -0,0 +1,134 @@
+"""Test Module for the match runner and tournaments."""
+import sys
+
+import pytest
+
+from src import tournament
+from src.board import TicTacToe
+from src.tournament import (
+    AgentError,
+    GameResult,
+    RandomAgent,
+    elo_difference,
+    fit_elo,
+    main,
+    make_agent,
+    pair_table,
+    play_chunk,
+    run_tournament,
+    schedule,
+    score_interval,
+    standings,
+)
+
+FIRST_FREE = (
+    "import sys\n"
+    "for line in sys.stdin:\n"
+    "    fields = line.split()\n"
+    "    cell = fields[6].index('0')\n"
+    "    print(cell // int(fields[2]), cell % int(fields[2]), flush=True)\n"
+)
+ALWAYS_CENTRE = "import sys\nfor line in sys.stdin:\n    print('1 1', flush=True)\n"
+SLOW = "import sys, time\nfor line in sys.stdin:\n    time.sleep(2)\n"
+ONE_MOVE = FIRST_FREE.replace(
+    "for line in sys.stdin:", "for line in [sys.stdin.readline()]:"
+)
+
+
+def command(script: str) -> str:
+    """The agent spec of a Python script."""
+    return f'cmd:{sys.executable} -c "{script}"'
+
+
+def test_schedule_alternates_the_first_player():
+    """Test every pair plays the same number of games as first player."""
+    pairings = schedule(["a", "b", "c"], 4)
+    assert len(pairings) == 12
+    for one, other in [("a", "b"), ("a", "c"), ("b", "c")]:
+        assert pairings.count((one, other)) == pairings.count((other, one)) == 2
+
+
+def test_search_never_loses_to_random_and_is_deterministic():
+    """Test a seeded match gives the same results with one or two workers."""
+    one = run_tournament(["random", "search"], 20, seed=3)
+    two = run_tournament(["random", "search"], 20, seed=3, workers=2, chunk=3)
+    assert one["results"] == two["results"]
+    assert all(
+        result.reason in ("win", "draw") and result.moves >= 5
+        for result in one["results"]
+    )
+    best, worst = standings(one["results"])
+    assert best.agent == "search" and best.losses == 0
+    assert best.wins == worst.losses and best.games == worst.games == 20
+    assert best.elo == pytest.approx(-worst.elo)
+
+
+def test_external_agents_lose_on_illegal_moves_and_time():
+    """Test agents speaking the line protocol, and their forfeits."""
+    results = run_tournament(
+        [command(FIRST_FREE), "random", command(ALWAYS_CENTRE)], 4, seed=1
+    )["results"]
+    assert {result.reason for result in results} >= {"win", "illegal"}
+    for result in results:
+        if ALWAYS_CENTRE in result.first + result.second:
+            assert result.reason != "draw"
+        if result.reason == "illegal":
+            loser = result.first if result.winner == 2 else result.second
+            assert loser == command(ALWAYS_CENTRE)
+
+    results = run_tournament(["random", command(SLOW)], 2, move_time=0.1, seed=1)
+    assert [result.reason for result in results["results"]] == ["time", "time"]
+    assert [result.winner for result in results["results"]] == [1, 2]
+
+
+def test_crashed_agents_are_restarted_and_bugs_are_raised(monkeypatch):
+    """Test a program exiting after one move loses, and plays again next game."""
+    agent = make_agent(command(ONE_MOVE))
+    game = TicTacToe()
+    for _ in range(2):
+        agent.new_game()
+        assert agent.move(game, None, None) == (0, 0)
+        agent.process.wait()
+        with pytest.raises(AgentError, match="exited"):
+            agent.move(game, None, None)
+    agent.close()
+
+    config = tournament.Config(3, 3, None)
+    spec = command(ONE_MOVE)
+    results = play_chunk(config, [(spec, "random", seed) for seed in range(3)])
+    assert [(result.moves, result.reason) for result in results] == [(2, "illegal")] * 3
+    assert not tournament._agents  # pylint: disable=protected-access
+
+    def broken(*args):
+        raise ZeroDivisionError()
+
+    monkeypatch.setattr(RandomAgent, "move", broken)
+    with pytest.raises(ZeroDivisionError):
+        run_tournament(["random", "search:1"], 2, seed=1)
+
+
+def test_ratings_and_intervals():
+    """Test the Elo curve, score intervals and the fitted ratings."""
+    assert elo_difference(0.5) == 0
+    assert elo_difference(0.76) == pytest.approx(200, abs=1)
+    score, low, high = score_interval([1.0] * 10)
+    assert score == 1.0 and 0.6 < low < 1.0 and high == 1.0
+    results = [GameResult("a", "b", 1, 5, "win")] * 30 + [
+        GameResult("b", "c", 1, 5, "win")
+    ] * 30
+    ratings = fit_elo(results)
+    assert ratings["a"] > ratings["b"] > ratings["c"]
+    assert sum(ratings.values()) == pytest.approx(0)
+    rows = pair_table(results)
+    assert [row.agent for row in rows] == ["a vs b", "b vs c"]
+    assert rows[0].elo_low < rows[0].elo <= rows[0].elo_high
+    with pytest.raises(Exception, match="Unknown agent"):
+        run_tournament(["random", "human"], 1)
+
+
+def test_main_prints_the_tables(capsys):
+    """Test the command line plays a match and prints both tables."""
+    main(["random", "search:1", "--games", "6", "--workers", "1", "--seed", "2"])
+    output = capsys.readouterr().out
+    assert "random vs search:1" in output
+    assert "6 games in" in output